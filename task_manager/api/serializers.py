@@ -0,0 +1,87 @@
+from django.db.models import Prefetch
+
+from task_manager.labels.models import LabelModel
+
+
+class FieldsError(ValueError):
+    pass
+
+
+class Serializer:
+    # name -> columns to load for it
+    fields = {}
+    default_fields = None
+
+    def __init__(self, requested=None):
+        if requested:
+            names = [name.strip() for name in requested.split(",") if name.strip()]
+        else:
+            names = list(self.default_fields or self.fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise FieldsError(", ".join(unknown))
+        self.names = names
+
+    def columns(self, ordering=()):
+        columns = {"id", *ordering}
+        for name in self.names:
+            columns.update(self.fields[name])
+        return columns
+
+    def apply(self, queryset, ordering=()):
+        return queryset.only(*self.columns(ordering))
+
+    def get_value(self, obj, name):
+        return getattr(obj, name)
+
+    def serialize(self, obj):
+        return {name: self.get_value(obj, name) for name in self.names}
+
+
+class TaskSerializer(Serializer):
+    fields = {
+        "id": (),
+        "name": ("name",),
+        "description": ("description",),
+        "status": ("status_id",),
+        "author": ("author_id",),
+        "executor": ("executor_id",),
+        "labels": (),
+        "created_at": ("created_at",),
+        "modified_at": ("modified_at",),
+        "version": ("version",),
+    }
+
+    def apply(self, queryset, ordering=()):
+        queryset = super().apply(queryset, ordering)
+        if "labels" in self.names:
+            queryset = queryset.prefetch_related(
+                Prefetch("labels", queryset=LabelModel.objects.only("id"))
+            )
+        return queryset
+
+    def get_value(self, obj, name):
+        if name == "labels":
+            return [label.pk for label in obj.labels.all()]
+        if name in ("status", "author", "executor"):
+            return getattr(obj, f"{name}_id")
+        return super().get_value(obj, name)
+
+
+class NamedSerializer(Serializer):
+    fields = {
+        "id": (),
+        "name": ("name",),
+        "created_at": ("created_at",),
+        "modified_at": ("modified_at",),
+    }
+
+
+class UserSerializer(Serializer):
+    fields = {
+        "id": (),
+        "username": ("username",),
+        "first_name": ("first_name",),
+        "last_name": ("last_name",),
+        "date_joined": ("date_joined",),
+    }
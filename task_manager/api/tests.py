@@ -0,0 +1,235 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+from django import test
+
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks import counters, search
+from task_manager.tasks.models import TaskActivity, TaskCounter, TaskModel
+from task_manager.utils import SomeFuncsForTestsMixin
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestTaskApi(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user_1 = User.objects.get(pk=1)
+        self.user_2 = User.objects.get(pk=2)
+        self.status_1 = StatusModel.objects.get(pk=1)
+        self.status_2 = StatusModel.objects.get(pk=2)
+        self.label_1 = LabelModel.objects.get(pk=1)
+        self.label_2 = LabelModel.objects.get(pk=2)
+        self.tasks_url = reverse_lazy("api_tasks")
+        self.bulk_url = reverse_lazy("api_tasks_bulk")
+        self.login_user(self.user_1)
+
+    def send(self, method, url, payload):
+        return getattr(self.client, method)(
+            url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def new_tasks(self, count, **extra):
+        return [
+            {
+                "name": f"task {number}",
+                "status": self.status_1.pk,
+                "executor": self.user_2.pk,
+                "labels": [self.label_1.pk, self.label_2.pk],
+                **extra,
+            }
+            for number in range(count)
+        ]
+
+    def test_anonymous(self):
+        self.client.logout()
+        response = self.client.get(self.tasks_url)
+
+        self.assertEquals(response.status_code, 401)
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(self.tasks_url, {"fields": "id,name,labels"})
+
+        self.assertEquals(
+            response.json()["results"], [{"id": 1, "name": "asd", "labels": [1]}]
+        )
+        self.assertEquals(
+            self.client.get(self.tasks_url, {"fields": "password"}).status_code, 400
+        )
+
+    def test_cursor_pagination_with_filter(self):
+        self.send("post", self.bulk_url, {"tasks": self.new_tasks(25)})
+        response = self.client.get(
+            self.tasks_url,
+            {"status": self.status_1.pk, "page_size": 10, "fields": "id"},
+        )
+        ids = [task["id"] for task in response.json()["results"]]
+        while response.json()["next"]:
+            response = self.client.get(self.tasks_url, {"cursor": response.json()["next"]})
+            ids.extend(task["id"] for task in response.json()["results"])
+
+        self.assertEquals(ids, sorted(TaskModel.objects.values_list("id", flat=True)))
+        self.assertEquals(list(response.json()["results"][0]), ["id"])
+
+    def test_other_lists(self):
+        for name in ("api_statuses", "api_labels", "api_users"):
+            response = self.client.get(reverse_lazy(name))
+
+            self.assertEquals(response.status_code, 200)
+            self.assertEquals(len(response.json()["results"]), 2)
+
+    def test_bulk_create_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as few:
+            self.send("post", self.bulk_url, {"tasks": self.new_tasks(2)})
+        with CaptureQueriesContext(connection) as many:
+            response = self.send("post", self.bulk_url, {"tasks": self.new_tasks(40)})
+
+        self.assertEquals(response.status_code, 201)
+        self.assertEquals(len(response.json()["results"]), 40)
+        self.assertEquals(len(many), len(few))
+        self.assertEquals(TaskModel.objects.filter(labels=self.label_2).count(), 42)
+        self.assertEquals(TaskModel.objects.filter(author=self.user_1).count(), 43)
+
+    def test_bulk_create_validation(self):
+        tasks = self.new_tasks(2)
+        tasks[1].update(status=999, name="x" * 51)
+        del tasks[0]["executor"]
+        response = self.send("post", self.bulk_url, {"tasks": tasks})
+
+        self.assertEquals(response.status_code, 400)
+        self.assertEquals(set(response.json()["errors"]["0"]), {"executor"})
+        self.assertEquals(set(response.json()["errors"]["1"]), {"status", "name"})
+        self.assertEquals(TaskModel.objects.count(), 1)
+
+    def test_bulk_create_rejects_repeated_labels(self):
+        tasks = self.new_tasks(1, labels=[self.label_1.pk, self.label_1.pk])
+        response = self.send("post", self.bulk_url, {"tasks": tasks})
+
+        self.assertEquals(response.status_code, 400)
+        self.assertEquals(set(response.json()["errors"]["0"]), {"labels"})
+        self.assertEquals(TaskModel.objects.count(), 1)
+
+    def test_bulk_update(self):
+        created = self.send("post", self.bulk_url, {"tasks": self.new_tasks(2)})
+        ids = [task["id"] for task in created.json()["results"]]
+        response = self.send(
+            "patch",
+            self.bulk_url,
+            {
+                "tasks": [
+                    {"id": ids[0], "status": self.status_2.pk, "labels": []},
+                    {"id": ids[1], "name": "renamed"},
+                ]
+            },
+        )
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(TaskModel.objects.get(pk=ids[0]).status, self.status_2)
+        self.assertFalse(TaskModel.objects.get(pk=ids[0]).labels.exists())
+        self.assertEquals(TaskModel.objects.get(pk=ids[1]).name, "renamed")
+        self.assertEquals(TaskModel.objects.get(pk=ids[1]).labels.count(), 2)
+
+    def test_bulk_update_rejects_repeated_labels(self):
+        response = self.send(
+            "patch",
+            self.bulk_url,
+            {"tasks": [{"id": 1, "labels": [self.label_2.pk, self.label_2.pk]}]},
+        )
+
+        self.assertEquals(response.status_code, 400)
+        self.assertEquals(set(response.json()["errors"]["0"]), {"labels"})
+        self.assertEquals(list(TaskModel.objects.get(pk=1).labels.all()), [self.label_1])
+
+    def test_bulk_update_conflict(self):
+        created = self.send("post", self.bulk_url, {"tasks": self.new_tasks(2)})
+        first, second = created.json()["results"]
+        TaskModel.objects.get(pk=first["id"]).save_versioned()
+
+        response = self.send(
+            "patch",
+            self.bulk_url,
+            {
+                "tasks": [
+                    {"id": first["id"], "name": "mine", "version": first["version"]},
+                    {"id": second["id"], "name": "mine too", "version": 1},
+                ]
+            },
+        )
+
+        self.assertEquals(response.status_code, 409)
+        self.assertEquals(
+            response.json()["errors"]["conflicts"],
+            [
+                {
+                    "id": first["id"],
+                    "version": 2,
+                    "changes": {"name": {"saved": "task 0", "submitted": "mine"}},
+                }
+            ],
+        )
+        self.assertEquals(TaskModel.objects.get(pk=second["id"]).name, "task 1")
+        response = self.send(
+            "patch",
+            self.bulk_url,
+            {"tasks": [{"id": first["id"], "name": "mine", "version": 2}]},
+        )
+        self.assertEquals(response.json()["results"][0]["version"], 3)
+
+    def test_bulk_delete_owner(self):
+        created = self.send("post", self.bulk_url, {"tasks": self.new_tasks(3)})
+        ids = [task["id"] for task in created.json()["results"]]
+        response = self.send("delete", self.bulk_url, {"ids": ids})
+
+        self.assertEquals(response.status_code, 200)
+        self.assertFalse(TaskModel.objects.filter(pk__in=ids).exists())
+
+    def test_bulk_delete_query_count_is_constant(self):
+        created = self.send("post", self.bulk_url, {"tasks": self.new_tasks(20)})
+        ids = [task["id"] for task in created.json()["results"]]
+        with CaptureQueriesContext(connection) as few:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.send("delete", self.bulk_url, {"ids": ids[:2]})
+        with CaptureQueriesContext(connection) as many:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.send("delete", self.bulk_url, {"ids": ids[2:]})
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(len(many), len(few))
+        self.assertEquals(len(many), 14)
+        self.assertEquals(list(TaskModel.objects.values_list("pk", flat=True)), [1])
+        self.assertFalse(TaskModel.labels.through.objects.exclude(taskmodel_id=1).exists())
+        stored = TaskCounter.objects.filter(count__gt=0).values_list(
+            "kind", "object_id", "count"
+        )
+        expected = [(c.kind, c.object_id, c.count) for c in counters.rebuild()]
+        self.assertEquals(sorted(stored), sorted(expected))
+        deleted = TaskActivity.objects.filter(action=TaskActivity.DELETED)
+        self.assertEquals(sorted(deleted.values_list("task_id", flat=True)), ids)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {search.get_backend().pk_column} FROM tasks_search")
+            self.assertEquals([row[0] for row in cursor.fetchall()], [1])
+
+    def test_bulk_delete_betrayer(self):
+        self.login_user(self.user_2)
+        response = self.send("delete", self.bulk_url, {"ids": [1]})
+
+        self.assertEquals(response.status_code, 403)
+        self.assertEquals(response.json()["errors"]["ids"], [1])
+        self.assertTrue(TaskModel.objects.filter(pk=1).exists())
@@ -0,0 +1,12 @@
+from django.urls import path
+from task_manager.api import views
+
+
+urlpatterns = [
+    path("tasks/", views.TaskList.as_view(), name="api_tasks"),
+    path("tasks/bulk/", views.TaskBulk.as_view(), name="api_tasks_bulk"),
+    path("tasks/<int:pk>/", views.TaskDetail.as_view(), name="api_task"),
+    path("statuses/", views.StatusList.as_view(), name="api_statuses"),
+    path("labels/", views.LabelList.as_view(), name="api_labels"),
+    path("users/", views.UserList.as_view(), name="api_users"),
+]
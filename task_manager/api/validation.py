@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.models import TaskModel
+
+RELATIONS = {"status": StatusModel, "executor": User, "labels": LabelModel}
+TEXT_FIELDS = ("name", "description")
+REQUIRED = ("name", "status", "executor")
+
+
+def is_known(value, ids):
+    return isinstance(value, int) and not isinstance(value, bool) and value in ids
+
+
+def referenced(items, field):
+    values = set()
+    for item in items:
+        value = item.get(field)
+        for pk in value if isinstance(value, list) else [value]:
+            if isinstance(pk, int):
+                values.add(pk)
+    return values
+
+
+def existing_relations(items):
+    # One query per related table for the whole batch.
+    return {
+        field: set(
+            model.objects.filter(pk__in=referenced(items, field)).values_list(
+                "pk", flat=True
+            )
+        )
+        for field, model in RELATIONS.items()
+    }
+
+
+def validate_labels(value, existing):
+    if not isinstance(value, list) or not all(is_known(pk, existing) for pk in value):
+        return [_("Select a valid choice.")]
+    # A task holds a label once; the through table rejects repeats.
+    if len(set(value)) != len(value):
+        return [_("Each label can only be listed once.")]
+    return None
+
+
+def validate_relation(item, field, existing):
+    value = item[field]
+    if field == "labels":
+        return validate_labels(value, existing[field])
+    return None if is_known(value, existing[field]) else [_("Select a valid choice.")]
+
+
+def validate_text(item, field):
+    try:
+        TaskModel._meta.get_field(field).clean(item[field], None)
+    except ValidationError as error:
+        return error.messages
+    return None
+
+
+def validate_version(value):
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return None
+    return [_("Expected a positive integer.")]
+
+
+def validate_fields(item, existing):
+    errors = {}
+    for field in RELATIONS:
+        if field in item:
+            errors[field] = validate_relation(item, field, existing)
+    for field in TEXT_FIELDS:
+        if field in item:
+            errors[field] = validate_text(item, field)
+    if "version" in item:
+        errors["version"] = validate_version(item["version"])
+    return errors
+
+
+def validate_item(item, existing, partial=False):
+    if not isinstance(item, dict):
+        return {"non_field_errors": [_("Expected an object.")]}
+    errors = {
+        field: [_("This field is required.")]
+        for field in REQUIRED
+        if not partial and field not in item
+    }
+    errors.update(validate_fields(item, existing))
+    return {field: messages for field, messages in errors.items() if messages}
+
+
+def validate_items(items, partial=False):
+    existing = existing_relations([item for item in items if isinstance(item, dict)])
+    errors = {}
+    for index, item in enumerate(items):
+        item_errors = validate_item(item, existing, partial)
+        if item_errors:
+            errors[str(index)] = item_errors
+    return errors
@@ -0,0 +1,258 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.utils.translation import gettext as _
+from django.views import View
+
+from task_manager.api.serializers import (
+    FieldsError,
+    NamedSerializer,
+    TaskSerializer,
+    UserSerializer,
+)
+from task_manager.api.validation import validate_items
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.bulk import (
+    bulk_create_tasks,
+    bulk_delete_tasks,
+    bulk_update_tasks,
+)
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import TaskModel, VersionConflict
+from task_manager.tasks.pagination import (
+    KeysetPaginationMixin,
+    KeysetPaginator,
+    params_to_querydict,
+)
+from task_manager.tasks.search import SearchOrderingMixin
+
+TASK_WRITABLE_FIELDS = ("name", "description", "status", "executor")
+
+
+class ApiError(Exception):
+    def __init__(self, status, errors):
+        super().__init__(errors)
+        self.status = status
+        self.errors = errors
+
+
+class ApiView(View):
+    serializer_class = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {"errors": {"detail": _("You have to be logged in to access that page")}},
+                status=401,
+            )
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"errors": error.errors}, status=error.status)
+
+    def get_serializer(self, fields=None):
+        try:
+            return self.serializer_class(fields)
+        except FieldsError as error:
+            raise ApiError(400, {"fields": [_("Unknown fields: %s") % error]})
+
+    def read_items(self, key):
+        try:
+            items = json.loads(self.request.body or b"{}").get(key)
+        except (AttributeError, ValueError):
+            raise ApiError(400, {"detail": _("Malformed JSON body.")})
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, {key: [_("Expected a non-empty list.")]})
+        if len(items) > settings.API_BULK_LIMIT:
+            raise ApiError(
+                400, {key: [_("At most %s items per request.") % settings.API_BULK_LIMIT]}
+            )
+        return items
+
+
+class ApiListView(KeysetPaginationMixin, ApiView):
+    model = None
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def filter_queryset(self, queryset, params):
+        return queryset
+
+    def get(self, request):
+        params = params_to_querydict(self.get_cursor_params())
+        serializer = self.get_serializer(params.get("fields"))
+        queryset = self.filter_queryset(self.get_queryset(), params)
+        paginator = KeysetPaginator(
+            serializer.apply(queryset, self.keyset_ordering),
+            self.get_paginate_by(None),
+            self.get_keyset_ordering(),
+            self.get_cursor_params(),
+        )
+        page = paginator.page(self.get_cursor())
+        return JsonResponse(
+            {
+                "results": [serializer.serialize(obj) for obj in page],
+                "next": page.next_cursor or None,
+                "previous": page.previous_cursor or None,
+            }
+        )
+
+
+class TaskList(SearchOrderingMixin, ApiListView):
+    model = TaskModel
+    serializer_class = TaskSerializer
+
+    def filter_queryset(self, queryset, params):
+        filterset = TaskFilter(params, queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise ApiError(400, filterset.errors.get_json_data())
+        return filterset.qs
+
+
+class StatusList(ApiListView):
+    model = StatusModel
+    serializer_class = NamedSerializer
+
+
+class LabelList(ApiListView):
+    model = LabelModel
+    serializer_class = NamedSerializer
+
+
+class UserList(ApiListView):
+    model = User
+    serializer_class = UserSerializer
+    keyset_ordering = ("date_joined", "id")
+
+    def get_queryset(self):
+        return User.objects.filter(is_staff=False)
+
+
+class TaskDetail(ApiView):
+    serializer_class = TaskSerializer
+
+    def get(self, request, pk):
+        serializer = self.get_serializer(request.GET.get("fields"))
+        task = serializer.apply(TaskModel.objects.filter(pk=pk)).first()
+        if task is None:
+            raise ApiError(404, {"detail": _("Not found.")})
+        return JsonResponse(serializer.serialize(task))
+
+
+class TaskBulk(ApiView):
+    serializer_class = TaskSerializer
+
+    def validate(self, items, partial=False):
+        errors = validate_items(items, partial)
+        if errors:
+            raise ApiError(400, errors)
+
+    def respond(self, tasks, status=200):
+        serializer = self.get_serializer()
+        tasks = serializer.apply(TaskModel.objects.filter(pk__in=[t.pk for t in tasks]))
+        return JsonResponse(
+            {"results": [serializer.serialize(task) for task in tasks.order_by("pk")]},
+            status=status,
+        )
+
+    def post(self, request):
+        items = self.read_items("tasks")
+        self.validate(items)
+        tasks = [
+            TaskModel(
+                name=item["name"],
+                description=item.get("description"),
+                status_id=item["status"],
+                executor_id=item["executor"],
+                author_id=request.user.pk,
+            )
+            for item in items
+        ]
+        created = bulk_create_tasks(tasks, [item.get("labels", []) for item in items])
+        return self.respond(created, status=201)
+
+    def load(self, ids):
+        if not all(isinstance(pk, int) for pk in ids):
+            raise ApiError(400, {"id": [_("Expected integer ids.")]})
+        tasks = TaskModel.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in tasks]
+        if missing:
+            raise ApiError(404, {"missing": missing})
+        return tasks
+
+    def patch(self, request):
+        items = self.read_items("tasks")
+        self.validate(items, partial=True)
+        tasks = self.load([item.get("id") for item in items])
+        fields, labels = set(), {}
+        for item in items:
+            task = tasks[item["id"]]
+            fields.update(self.apply(task, item))
+            if "labels" in item:
+                labels[task.pk] = item["labels"]
+        try:
+            bulk_update_tasks(list(tasks.values()), sorted(fields), labels)
+        except VersionConflict as conflict:
+            raise ApiError(409, self.conflicts(items, conflict.ids))
+        return self.respond(tasks.values())
+
+    def apply(self, task, item):
+        fields = [field for field in TASK_WRITABLE_FIELDS if field in item]
+        for field in fields:
+            setattr(task, TaskModel._meta.get_field(field).attname, item[field])
+        # Without a version the update applies over whatever was loaded.
+        if "version" in item:
+            task.version = item["version"]
+        return fields
+
+    def changes(self, saved, item):
+        changes = {}
+        for field in (*TASK_WRITABLE_FIELDS, "labels"):
+            if field not in item:
+                continue
+            old, new = saved[field], item[field]
+            if field == "labels":
+                old, new = sorted(old), sorted(new)
+            if old != new:
+                changes[field] = {"saved": saved[field], "submitted": item[field]}
+        return changes
+
+    def conflicts(self, items, ids):
+        serializer = self.get_serializer()
+        saved = {
+            task.pk: serializer.serialize(task)
+            for task in serializer.apply(TaskModel.objects.filter(pk__in=ids))
+        }
+        conflicts = [
+            {
+                "id": item["id"],
+                "version": saved[item["id"]]["version"],
+                "changes": self.changes(saved[item["id"]], item),
+            }
+            for item in items
+            if item["id"] in saved
+        ]
+        return {
+            "detail": _("Tasks were changed since they were read: %s")
+            % ", ".join(map(str, ids)),
+            "conflicts": conflicts,
+        }
+
+    def delete(self, request):
+        ids = self.read_items("ids")
+        tasks = self.load(ids)
+        foreign = [pk for pk, task in tasks.items() if task.author_id != request.user.pk]
+        if foreign:
+            raise ApiError(
+                403,
+                {
+                    "detail": _("A task can only be deleted by its author."),
+                    "ids": foreign,
+                },
+            )
+        bulk_delete_tasks(tasks)
+        return JsonResponse({"deleted": sorted(tasks)})
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+# Serve the async list and detail views; set ASYNC_VIEWS= to opt out.
+os.environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
@@ -0,0 +1,41 @@
+"""URLs served when ASYNC_VIEWS is set (the ASGI deployment mode).
+
+The read-only list and detail pages are replaced by their async versions;
+everything else is the regular task_manager.urls.
+"""
+from django.urls import path
+
+import task_manager.auth.views
+import task_manager.labels.views
+import task_manager.statuses.views
+import task_manager.tasks.views
+from task_manager import urls
+
+urlpatterns = [
+    path(
+        "users/",
+        task_manager.auth.views.AsyncShowAllUsers.as_view(),
+        name="all_users",
+    ),
+    path(
+        "statuses/",
+        task_manager.statuses.views.AsyncShowAllStatuses.as_view(),
+        name="all_statuses",
+    ),
+    path(
+        "labels/",
+        task_manager.labels.views.AsyncShowAllLabels.as_view(),
+        name="all_labels",
+    ),
+    path(
+        "tasks/",
+        task_manager.tasks.views.AsyncShowAllTasks.as_view(),
+        name="all_tasks",
+    ),
+    path(
+        "tasks/<int:pk>",
+        task_manager.tasks.views.AsyncShowTask.as_view(),
+        name="show_task",
+    ),
+    *urls.urlpatterns,
+]
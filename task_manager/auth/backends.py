@@ -0,0 +1,21 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+from task_manager.auth import records
+
+
+class CachedModelBackend(ModelBackend):
+    # Logging in checks the password as ModelBackend does. The per-request
+    # user lookup reads only the password hash and the account flags, which
+    # are never cached, and takes the names from the record cache.
+    def get_user(self, user_id):
+        security = (
+            User.objects.filter(pk=user_id)
+            .values_list(*records.SECURITY_FIELDS)
+            .first()
+        )
+        record = records.get(int(user_id)) if security else None
+        if record is None:
+            return None
+        user = record.as_user(*security)
+        return user if self.user_can_authenticate(user) else None
@@ -7,3 +7,10 @@ class UserStr(User):
 
     class Meta:
         proxy = True
+
+
+class CachedUser(User):
+    """request.user built from task_manager.auth.records, see backends."""
+
+    class Meta:
+        proxy = True
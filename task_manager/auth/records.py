@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from task_manager.auth.models import CachedUser
+from task_manager.tasks.cache import USERS, get_version
+
+# Display fields only: these may lag behind a change made in another worker.
+FIELDS = ("id", "username", "first_name", "last_name")
+# Read from the database on every request (CachedModelBackend.get_user), so a
+# password change, deactivation or demotion applies to all workers at once.
+SECURITY_FIELDS = ("password", "is_active", "is_staff", "is_superuser")
+
+
+class UserRecord(NamedTuple):
+    id: int
+    username: str
+    first_name: str
+    last_name: str
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def as_user(self, *security):
+        """A CachedUser with these fields and SECURITY_FIELDS set to security.
+
+        The other User fields stay deferred and are loaded on first access.
+        """
+        values = {**self._asdict(), **dict(zip(SECURITY_FIELDS, security))}
+        loaded = [
+            values[field.attname]
+            for field in CachedUser._meta.concrete_fields
+            if field.attname in values
+        ]
+        return CachedUser.from_db("default", list(values), loaded)
+
+
+class LRUCache:
+    """Bounded in-process mapping whose entries also expire after a timeout.
+
+    Entries are tagged with the USERS version of the "default" cache. When
+    that cache is shared (FILE_CACHE_DIR) a user saved or deleted in another
+    worker is reloaded at once; otherwise its new name shows after at most
+    timeout seconds.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, stored_version, expires = entry
+            if stored_version != version or expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, version):
+        with self.lock:
+            self.entries[key] = (value, version, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+RECORDS = LRUCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT)
+
+
+def get_many(ids):
+    """{id: UserRecord} for the existing users among ids, in one query at most."""
+    version = get_version(USERS)
+    found, missing = {}, []
+    for pk in set(ids):
+        if pk is None:
+            continue
+        record = RECORDS.get(pk, version)
+        if record is None:
+            missing.append(pk)
+        else:
+            found[pk] = record
+    if missing:
+        for values in User.objects.filter(pk__in=missing).values_list(*FIELDS):
+            record = UserRecord(*values)
+            RECORDS.set(record.id, record, version)
+            found[record.id] = record
+    return found
+
+
+def get(pk):
+    return get_many([pk]).get(pk)
@@ -3,7 +3,10 @@ from django.urls import reverse_lazy
 from django.contrib.messages import get_messages
 from django.utils.translation import gettext_lazy as _
 from django import test
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from task_manager.auth import records
 from task_manager.auth.models import User
 from task_manager.utils import SomeFuncsForTestsMixin
 
@@ -152,3 +155,119 @@ class TestViews(SomeFuncsForTestsMixin, TestCase):
         self.assertEquals(len(message), 1)
         self.assertEquals(str(message[0]), self.betrayer_message)
         self.assertRedirects(response, self.all_users_url)
+
+    def test_all_users_not_modified(self):
+        response = self.client.get(self.all_users_url)
+        with CaptureQueriesContext(connection) as context:
+            cached = self.client.get(self.all_users_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEquals(cached.status_code, 304)
+        self.assertEquals(len(context), 1)
+
+    def test_all_users_modified_on_rename(self):
+        response = self.client.get(self.all_users_url)
+        self.user_2.first_name = "Renamed"
+        self.user_2.save()
+        changed = self.client.get(self.all_users_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEquals(changed.status_code, 200)
+        self.assertContains(changed, "Renamed")
+
+
+def user_queries(context):
+    return [
+        query for query in context.captured_queries if 'FROM "auth_user"' in query["sql"]
+    ]
+
+
+def name_queries(context):
+    return [
+        query
+        for query in user_queries(context)
+        if '"auth_user"."username"' in query["sql"]
+    ]
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestUserRecords(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self):
+        # Records outlive the rolled back changes of the previous test.
+        records.RECORDS.clear()
+        self.user = User.objects.get(pk=1)
+        self.client = Client()
+        self.login_user(self.user)
+
+    def test_request_user_names_come_from_the_cache(self):
+        self.client.get(reverse_lazy("all_statuses"))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertEquals(response.wsgi_request.user.pk, self.user.pk)
+        [query] = user_queries(context)
+        self.assertIn('"auth_user"."password"', query["sql"])
+        self.assertFalse(name_queries(context))
+
+    def test_changes_from_other_workers_apply_at_once(self):
+        self.client.get(reverse_lazy("all_statuses"))
+        # A write that never reaches this worker's cache or USERS version.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertRedirects(response, "/login/?next=/statuses/")
+
+    def test_task_pages_render_names_from_the_cache(self):
+        self.client.get(reverse_lazy("show_task", kwargs={"pk": 1}))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("show_task", kwargs={"pk": 1}))
+
+        self.assertContains(response, self.user.get_full_name())
+        self.assertFalse(name_queries(context))
+
+    def test_rename_is_shown(self):
+        self.client.get(reverse_lazy("all_tasks"))
+        self.user.last_name = "Renamed"
+        self.user.save()
+
+        self.assertContains(self.client.get(reverse_lazy("all_tasks")), "Renamed")
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.get(reverse_lazy("all_statuses"))
+        self.user.set_password("Qwerty987654")
+        self.user.save()
+        response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertRedirects(response, "/login/?next=/statuses/")
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(reverse_lazy("all_statuses"))
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        User.objects.get(pk=self.user.pk).save(update_fields=["is_active"])
+        response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertRedirects(response, "/login/?next=/statuses/")
+
+    def test_cache_is_bounded_and_expires(self):
+        cache = records.LRUCache(size=2, timeout=60)
+        for key in (1, 2, 3):
+            cache.set(key, key, version=1)
+        expired = records.LRUCache(size=2, timeout=-1)
+        expired.set(1, 1, version=1)
+
+        self.assertIsNone(cache.get(1, version=1))
+        self.assertEquals(cache.get(3, version=1), 3)
+        self.assertIsNone(cache.get(3, version=2))
+        self.assertIsNone(expired.get(1, version=1))
@@ -1,20 +1,28 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import logout
 from django.contrib.auth.views import LogoutView
 from django.utils.translation import gettext_lazy as _
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.models import User
+from django.db.models import Count, Max
 from django.views.generic import CreateView, ListView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth.views import LoginView
 from django.contrib.messages.views import SuccessMessageMixin
 
 
+from task_manager.tasks.cache import USERS, get_version
 from task_manager.utils import (
+    AsyncListViewMixin,
+    ConditionalGetMixin,
     CustomLoginRequiredMixin,
     CustomHandleNoPermissionWithoutForbidden,
     CustomUserPassesTestMixin,
+    ProtectedDeleteMixin,
+    ReplicaReadMixin,
 )
+from task_manager.tasks.models import TaskModel
 from task_manager.auth.forms import (
     UpdateRegUserForm,
     CustomAuthenticationForm,
@@ -35,13 +43,29 @@ class LoginUser(SuccessMessageMixin, LoginView):
     success_message = _("Successfully login")
 
 
-class ShowAllUsers(ListView):
+class ShowAllUsers(ReplicaReadMixin, ConditionalGetMixin, ListView):
     model = User
     template_name = "auth/PageWithUsers.html"
 
     def get_queryset(self):
         return User.objects.filter(is_staff=False)
 
+    def get_validators(self):
+        # auth.User has no modification stamp, renames bump the USERS version.
+        stamp = self.get_queryset().aggregate(
+            count=Count("id"), joined=Max("date_joined")
+        )
+        return (stamp["count"], stamp["joined"], get_version(USERS)), None
+
+
+class AsyncShowAllUsers(AsyncListViewMixin, ShowAllUsers):
+    async def aget_validators(self):
+        stamp = await self.get_queryset().aaggregate(
+            count=Count("id"), joined=Max("date_joined")
+        )
+        version = await sync_to_async(get_version)(USERS)
+        return (stamp["count"], stamp["joined"], version), None
+
 
 class Logout(LogoutView):
     success_message = _("You are logged out")
@@ -74,6 +98,7 @@ class DeleteUser(
     CustomLoginRequiredMixin,
     CustomHandleNoPermissionWithoutForbidden,
     CustomUserPassesTestMixin,
+    ProtectedDeleteMixin,
     SuccessMessageMixin,
     DeleteView,
 ):
@@ -83,14 +108,5 @@ class DeleteUser(
     template_name = "auth/DeletePage.html"
     login_url = reverse_lazy("login")
     permission_denied_message = _("You are betrayer")
-
-    def post(self, request, *args, **kwargs):
-        if (
-            not self.get_object().author.exists()
-            and not self.get_object().executor.exists()
-        ):
-            return super().post(request, *args, **kwargs)
-        messages.add_message(
-            request, messages.ERROR, _("Cannot delete user because it's in use")
-        )
-        return redirect(self.success_url)
+    protected_by = ((TaskModel, "author"), (TaskModel, "executor"))
+    protected_message = _("Cannot delete user because it's in use")
@@ -0,0 +1,72 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from task_manager.auth.models import UserStr
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.cache import CHOICES, get_version
+
+
+def full_name(row):
+    return f"{row[1]} {row[2]}".strip()
+
+
+def name(row):
+    return row[1]
+
+
+# source -> (queryset factory, prefix lookups, columns, label builder)
+SOURCES = {
+    "users": (
+        lambda: UserStr.objects.order_by("first_name", "last_name", "pk"),
+        ("first_name__istartswith", "last_name__istartswith", "username__istartswith"),
+        ("pk", "first_name", "last_name"),
+        full_name,
+    ),
+    "labels": (
+        lambda: LabelModel.objects.order_by("name"),
+        ("name__istartswith",),
+        ("pk", "name"),
+        name,
+    ),
+    "statuses": (
+        lambda: StatusModel.objects.order_by("name"),
+        ("name__istartswith",),
+        ("pk", "name"),
+        name,
+    ),
+}
+
+
+def cache_key(source, term, limit):
+    # Saving a status, label or user bumps CHOICES, so a rename or a new
+    # name shows up at once rather than after AUTOCOMPLETE_CACHE_TIMEOUT.
+    digest = hashlib.md5(term.lower().encode()).hexdigest()
+    return f"autocomplete:{get_version(CHOICES)}:{source}:{limit}:{digest}"
+
+
+def lookup(source, term, limit):
+    get_queryset, lookups, columns, label = SOURCES[source]
+    queryset = get_queryset()
+    if term:
+        condition = Q()
+        for prefix_lookup in lookups:
+            condition |= Q(**{prefix_lookup: term})
+        queryset = queryset.filter(condition)
+    rows = list(queryset.values_list(*columns)[: limit + 1])
+    return {
+        "results": [{"id": row[0], "text": label(row)} for row in rows[:limit]],
+        "more": len(rows) > limit,
+    }
+
+
+def search(source, term, limit):
+    key = cache_key(source, term, limit)
+    result = cache.get(key)
+    if result is None:
+        result = lookup(source, term, limit)
+        cache.set(key, result, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return result
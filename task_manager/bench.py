@@ -0,0 +1,436 @@
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import combinations
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from task_manager.instrumentation import CURRENT, RequestStats
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.bulk import bulk_create_tasks
+from task_manager.tasks.cache import USERS, bump_version
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import TaskModel
+
+SCALES = {
+    "small": {"users": 20, "statuses": 8, "labels": 30, "tasks": 2000, "fan_out": 3},
+    "medium": {
+        "users": 100,
+        "statuses": 20,
+        "labels": 100,
+        "tasks": 20000,
+        "fan_out": 3,
+    },
+    "large": {
+        "users": 500,
+        "statuses": 50,
+        "labels": 300,
+        "tasks": 100000,
+        "fan_out": 4,
+    },
+}
+WORDS = (
+    "deploy",
+    "report",
+    "review",
+    "release",
+    "backup",
+    "design",
+    "meeting",
+    "invoice",
+    "cleanup",
+    "migrate",
+)
+PASSWORD = "Bench12345"
+SEARCH_TERM = "deploy"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def test_database():
+    """A throwaway test database, like the one manage.py test creates."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def session_store(name=None):
+    """Run with one of settings.SESSION_STORES instead of SESSION_ENGINE."""
+    if name is None:
+        return nullcontext()
+    return override_settings(SESSION_ENGINE=settings.SESSION_STORES[name])
+
+
+def timed_templates():
+    """Render with the template backend INSTRUMENTATION turns on, which the
+    template timings need."""
+    return override_settings(
+        TEMPLATES=[
+            {**engine, "BACKEND": "task_manager.instrumentation.DjangoTemplates"}
+            for engine in settings.TEMPLATES
+        ]
+    )
+
+
+def fragment_cache(enabled=True):
+    """Run with or without the {% fragment %} template caches."""
+    if enabled:
+        return nullcontext()
+    return override_settings(FRAGMENT_CACHE=False)
+
+
+def generate(sizes, seed=0):
+    """Fill the (test) database and return the ids the scenarios pick from."""
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(
+            username=f"bench{number}",
+            first_name=f"Bench{number}",
+            last_name="User",
+            password=password,
+        )
+        for number in range(sizes["users"])
+    )
+    # bulk_create sends no post_save: drop cached records of reused ids.
+    bump_version(USERS)
+    StatusModel.objects.bulk_create(
+        StatusModel(name=f"status {number}") for number in range(sizes["statuses"])
+    )
+    LabelModel.objects.bulk_create(
+        LabelModel(name=f"label {number}") for number in range(sizes["labels"])
+    )
+    users = list(User.objects.values_list("pk", flat=True))
+    statuses = list(StatusModel.objects.values_list("pk", flat=True))
+    labels = list(LabelModel.objects.values_list("pk", flat=True))
+    fan_out = min(sizes["fan_out"], len(labels))
+    for start in range(0, sizes["tasks"], 5000):
+        count = min(5000, sizes["tasks"] - start)
+        tasks = [
+            TaskModel(
+                name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {start + number}",
+                description=" ".join(rng.choices(WORDS, k=6)),
+                status_id=rng.choice(statuses),
+                author_id=rng.choice(users),
+                executor_id=rng.choice(users),
+            )
+            for number in range(count)
+        ]
+        task_labels = [rng.sample(labels, rng.randint(0, fan_out)) for _ in tasks]
+        bulk_create_tasks(tasks, task_labels, batch_size=1000)
+    return {
+        "users": users,
+        "statuses": statuses,
+        "labels": labels,
+        "tasks": list(TaskModel.objects.values_list("pk", flat=True)),
+    }
+
+
+class Bench:
+    """Drives the views through the test Client and times every request."""
+
+    def __init__(self, data, repeat=20, warmup=2, seed=0, cold=False):
+        self.data = data
+        self.repeat = repeat
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.cold = cold
+        self.user = User.objects.get(pk=data["users"][0])
+        self.client = self.login(self.user)
+
+    def login(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def pick(self, key):
+        return self.rng.choice(self.data[key])
+
+    def filter_values(self):
+        return {
+            "status": lambda: self.pick("statuses"),
+            "executor": lambda: self.pick("users"),
+            "label": lambda: self.pick("labels"),
+            "self_task": lambda: "on",
+            "search": lambda: SEARCH_TERM,
+        }
+
+    def own_task(self):
+        status = self.pick("statuses")
+        return TaskModel.objects.create(
+            name="bench task", status_id=status, author=self.user, executor=self.user
+        )
+
+    def scenarios(self):
+        # name -> callable doing the untimed preparation and returning
+        # (client, method, url, data, expected status codes)
+        values = self.filter_values()
+        names = [name for name in TaskFilter.base_filters if name in values]
+        for size in range(len(names) + 1):
+            for combo in combinations(names, size):
+                yield f"task_list[{'+'.join(combo) or 'all'}]", self.task_list(
+                    combo, values
+                )
+        yield "task_detail", lambda: (
+            self.client,
+            "get",
+            reverse("show_task", kwargs={"pk": self.pick("tasks")}),
+            None,
+            (200,),
+        )
+        yield "task_create", lambda: (
+            self.client,
+            "post",
+            reverse("create_task"),
+            self.task_form(),
+            (302,),
+        )
+        yield "task_update", self.task_update
+        yield "task_delete", self.task_delete
+        yield "status_delete", self.named_delete(StatusModel, "delete_status")
+        yield "label_delete", self.named_delete(LabelModel, "delete_label")
+        yield "user_list", lambda: (self.client, "get", reverse("all_users"), None, (200,))
+        yield "user_delete", self.user_delete
+        yield "login_page", lambda: (Client(), "get", reverse("login"), None, (200,))
+        yield "login", lambda: (
+            Client(),
+            "post",
+            reverse("login"),
+            {"username": self.user.username, "password": PASSWORD},
+            (302,),
+        )
+        yield "logout", lambda: (self.login(self.user), "get", reverse("logout"), None, (302,))
+        yield "register", self.register
+
+    def task_list(self, combo, values):
+        def prepare():
+            params = {name: values[name]() for name in combo}
+            return self.client, "get", reverse("all_tasks"), params, (200,)
+
+        return prepare
+
+    def task_form(self):
+        return {
+            "name": "bench task",
+            "description": "created by manage.py bench",
+            "status": self.pick("statuses"),
+            "executor": self.pick("users"),
+            "labels": self.rng.sample(self.data["labels"], 2),
+        }
+
+    def task_update(self):
+        task = self.own_task()
+        url = reverse("update_task", kwargs={"pk": task.pk})
+        return self.client, "post", url, self.task_form(), (302,)
+
+    def task_delete(self):
+        task = self.own_task()
+        url = reverse("delete_task", kwargs={"pk": task.pk})
+        return self.client, "post", url, None, (302,)
+
+    def named_delete(self, model, url_name):
+        def prepare():
+            obj = model.objects.create(name=f"bench {time.perf_counter_ns()}")
+            url = reverse(url_name, kwargs={"pk": obj.pk})
+            return self.client, "post", url, None, (302,)
+
+        return prepare
+
+    def user_delete(self):
+        user = User.objects.create(username=f"gone{time.perf_counter_ns()}")
+        url = reverse("delete_user", kwargs={"pk": user.pk})
+        return self.login(user), "post", url, None, (302,)
+
+    def register(self):
+        data = {
+            "username": f"new{time.perf_counter_ns()}",
+            "first_name": "New",
+            "last_name": "User",
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        }
+        return Client(), "post", reverse("register"), data, (302,)
+
+    def measure(self, prepare):
+        client, method, url, data, expected = prepare()
+        if self.cold:
+            caches["default"].clear()
+        # Template render time, as InstrumentationMiddleware measures it.
+        stats = RequestStats()
+        token = CURRENT.set(stats)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                elapsed = time.perf_counter() - started
+        finally:
+            CURRENT.reset(token)
+        if response.status_code not in expected:
+            raise AssertionError(f"{method.upper()} {url}: {response.status_code}")
+        return elapsed * 1000, len(queries), stats.template_seconds * 1000
+
+    def run_scenario(self, prepare):
+        for _ in range(self.warmup):
+            self.measure(prepare)
+        timings, queries, renders = [], [], []
+        for _ in range(self.repeat):
+            elapsed, count, rendered = self.measure(prepare)
+            timings.append(elapsed)
+            queries.append(count)
+            renders.append(rendered)
+        return {
+            "p50_ms": round(percentile(timings, 0.5), 3),
+            "p90_ms": round(percentile(timings, 0.9), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "template_p50_ms": round(percentile(renders, 0.5), 3),
+            "queries": statistics.median_low(queries),
+            "max_queries": max(queries),
+        }
+
+    def run(self, only=None):
+        with timed_templates():
+            return {
+                name: self.run_scenario(prepare)
+                for name, prepare in self.scenarios()
+                if not only or any(name.startswith(prefix) for prefix in only)
+            }
+
+
+def compare(report, baseline, tolerance=0.25, slack_ms=1.0):
+    """Regressions of report against baseline as human readable lines.
+
+    Latency compares p50 with a relative tolerance plus an absolute slack
+    that absorbs timer noise on very fast views; query counts must not grow.
+    """
+    regressions = []
+    for name, old in baseline.get("scenarios", {}).items():
+        new = report["scenarios"].get(name)
+        if new is None:
+            continue
+        limit = old["p50_ms"] * (1 + tolerance) + slack_ms
+        if new["p50_ms"] > limit:
+            regressions.append(
+                f"{name}: p50 {new['p50_ms']:.2f} ms > {limit:.2f} ms "
+                f"(baseline {old['p50_ms']:.2f} ms)"
+            )
+        if new["queries"] > old["queries"]:
+            regressions.append(
+                f"{name}: {new['queries']} queries > baseline {old['queries']}"
+            )
+    return regressions
+
+
+LOAD_PAGES = ("all_tasks", "show_task", "all_statuses", "all_labels", "all_users")
+URLCONFS = {"wsgi": "task_manager.urls", "asgi": "task_manager.async_urls"}
+
+
+def load_urls(data, pages, total, seed=0):
+    rng = random.Random(seed)
+    urls = []
+    for number in range(total):
+        name = pages[number % len(pages)]
+        kwargs = {"pk": rng.choice(data["tasks"])} if name == "show_task" else {}
+        urls.append(reverse(name, kwargs=kwargs))
+    return urls
+
+
+def summarize(timings, errors, elapsed):
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 0.5), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def load_wsgi(user, urls, concurrency):
+    """Threads sharing the WSGI handler, like gunicorn --threads."""
+    clients = [Client() for _ in range(concurrency)]
+    for client in clients:
+        client.force_login(user)
+
+    def worker(index):
+        timings, errors = [], 0
+        for url in urls[index::concurrency]:
+            started = time.perf_counter()
+            response = clients[index].get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            errors += response.status_code != 200
+        connection.close()
+        return timings, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings = [value for result in results for value in result[0]]
+    return summarize(timings, sum(result[1] for result in results), elapsed)
+
+
+def load_asgi(user, urls, concurrency):
+    """Coroutines sharing one event loop and the ASGI handler, like uvicorn."""
+    clients = [AsyncClient() for _ in range(concurrency)]
+    for client in clients:
+        client.force_login(user)
+
+    async def worker(index):
+        timings, errors = [], 0
+        for url in urls[index::concurrency]:
+            started = time.perf_counter()
+            response = await clients[index].get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            errors += response.status_code != 200
+        return timings, errors
+
+    async def run():
+        return await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    timings = [value for result in results for value in result[0]]
+    return summarize(timings, sum(result[1] for result in results), elapsed)
+
+
+LOADERS = {"wsgi": load_wsgi, "asgi": load_asgi}
+
+
+def load_test(data, modes, pages=LOAD_PAGES, total=400, concurrency=8, seed=0):
+    user = User.objects.get(pk=data["users"][0])
+    results = {}
+    for mode in modes:
+        with override_settings(ROOT_URLCONF=URLCONFS[mode]):
+            caches["default"].clear()
+            urls = load_urls(data, pages, total, seed)
+            results[mode] = LOADERS[mode](user, urls, concurrency)
+    return results
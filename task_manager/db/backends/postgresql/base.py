@@ -0,0 +1,60 @@
+from django.db.backends.postgresql import base
+
+from task_manager.db.pool import ConnectionPool, get_pool
+
+
+def is_alive(connection):
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        # Leave the connection as Django expects a fresh one.
+        connection.rollback()
+    except Exception:
+        return False
+    return True
+
+
+def reset(connection):
+    # Connections closed inside an atomic block come back mid-transaction.
+    if connection.closed:
+        raise base.Database.InterfaceError("connection already closed")
+    connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL with a per-process pool of connections (settings "POOL").
+
+    Django "closes" the connection at the end of each request (CONN_MAX_AGE
+    is 0 in pool mode); here that returns it to the pool instead.
+    """
+
+    def get_pool(self, conn_params=None):
+        def factory():
+            options = self.settings_dict["POOL"]
+            return ConnectionPool(
+                lambda: base.DatabaseWrapper.get_new_connection(self, conn_params),
+                size=options["SIZE"],
+                overflow=options["OVERFLOW"],
+                max_lifetime=options["MAX_LIFETIME"],
+                timeout=options["TIMEOUT"],
+                check=is_alive if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                reset=reset,
+                name=self.alias,
+            )
+
+        return get_pool(self.alias, factory)
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).checkout()
+        # Set on whichever wrapper opened the connection; mirror it here.
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().checkin(self.connection)
@@ -0,0 +1,20 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite running the settings "PRAGMAS" on every new connection.
+
+    "TRANSACTION_MODE": "IMMEDIATE" takes the write lock when an atomic
+    block starts. A deferred transaction that has already read cannot wait
+    for the lock and fails with "database is locked" at its first write.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get("PRAGMAS", {}).items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get("TRANSACTION_MODE")
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from task_manager.utils import iscoroutinefunction, markcoroutinefunction
+
+PIN_COOKIE = "pin_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+class PrimaryPinMiddleware:
+    """Read from the primary for REPLICA_PIN_SECONDS after a write.
+
+    Replicas lag behind the primary; a client that just posted a form
+    would not find its change on the page it is redirected to.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.pinned_to_primary = PIN_COOKIE in request.COOKIES
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        request.pinned_to_primary = PIN_COOKIE in request.COOKIES
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from task_manager.metrics import CONNECTIONS
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """DB-API connections shared by the threads of one worker process.
+
+    Up to size connections are kept open while idle and up to overflow more
+    are opened under load, then closed as soon as they are returned. A
+    checkout waits at most timeout seconds for a free connection. Before
+    reuse a connection is closed if it is older than max_lifetime seconds or
+    fails check(connection); reset(connection) runs when it comes back.
+    """
+
+    def __init__(
+        self,
+        connect,
+        size=4,
+        overflow=4,
+        max_lifetime=1800,
+        timeout=5.0,
+        check=None,
+        reset=None,
+        name="default",
+    ):
+        self.connect = connect
+        self.size = size
+        self.overflow = overflow
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check = check
+        self.reset = reset
+        self.name = name
+        # Idle connections, most recently returned last; reusing those first
+        # lets the others age out under light load.
+        self.idle = deque()
+        self.created = {}
+        self.opening = 0
+        self.condition = threading.Condition()
+
+    @property
+    def open_count(self):
+        return len(self.created) + self.opening
+
+    def in_use(self):
+        return self.open_count - len(self.idle)
+
+    def checkout(self):
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection = self.take(deadline)
+            if connection is None:
+                connection = self.open()
+                break
+            if self.usable(connection):
+                break
+            self.discard(connection)
+        waited = (time.perf_counter() - started) * 1000
+        CONNECTIONS.observe(
+            self.name, {"checkout_wait_ms": waited, "in_use": self.in_use()}
+        )
+        return connection
+
+    def take(self, deadline):
+        # An idle connection, or None once a slot to open one is reserved.
+        with self.condition:
+            while True:
+                if self.idle:
+                    return self.idle.pop()
+                if self.open_count < self.size + self.overflow:
+                    self.opening += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No connection of pool {self.name!r} free within "
+                        f"{self.timeout} seconds ({self.open_count} open)"
+                    )
+                self.condition.wait(remaining)
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opening -= 1
+            self.created[id(connection)] = time.monotonic()
+        return connection
+
+    def expired(self, connection):
+        created = self.created.get(id(connection), 0)
+        return time.monotonic() - created > self.max_lifetime
+
+    def usable(self, connection):
+        if self.expired(connection):
+            return False
+        return self.check is None or self.check(connection)
+
+    def checkin(self, connection):
+        if id(connection) in self.created and self.restore(connection):
+            with self.condition:
+                if len(self.idle) < self.size and not self.expired(connection):
+                    self.idle.append(connection)
+                    self.condition.notify()
+                    return
+        self.discard(connection)
+
+    def restore(self, connection):
+        if self.reset is None:
+            return True
+        try:
+            self.reset(connection)
+        except Exception:
+            return False
+        return True
+
+    def discard(self, connection):
+        close_quietly(connection)
+        with self.condition:
+            self.created.pop(id(connection), None)
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+        for connection in idle:
+            self.discard(connection)
+
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """The pool of a database alias in this process, created by factory()."""
+    with POOLS_LOCK:
+        if alias not in POOLS:
+            POOLS[alias] = factory()
+        return POOLS[alias]
@@ -0,0 +1,93 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger("task_manager.db")
+
+
+class ReadOnlyRouter:
+    """Reads go to the read-only "readonly" alias, everything else to default.
+
+    Both aliases open the same SQLite file. Inside an atomic block reads stay
+    on default, so they see the block's own uncommitted writes.
+    """
+
+    write_alias = DEFAULT_DB_ALIAS
+    read_alias = "readonly"
+
+    def db_for_read(self, model, **hints):
+        if connections[self.write_alias].in_atomic_block:
+            return self.write_alias
+        return self.read_alias
+
+    def db_for_write(self, model, **hints):
+        return self.write_alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.write_alias
+
+
+# Alias of the replica the current request reads from, see replica_reads().
+REPLICA = ContextVar("task_manager_replica", default=None)
+# Replicas that failed to connect, skipped until the given monotonic time.
+DOWN = {}
+
+
+def pick_replica():
+    """A reachable replica alias, or None to read from the primary."""
+    now = time.monotonic()
+    replicas = [
+        alias for alias in settings.DATABASE_REPLICAS if DOWN.get(alias, 0) <= now
+    ]
+    random.shuffle(replicas)
+    for alias in replicas:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            logger.warning("Replica %s is unavailable, reading from the primary", alias)
+            DOWN[alias] = now + settings.REPLICA_RETRY_SECONDS
+            continue
+        return alias
+    return None
+
+
+@contextmanager
+def replica_reads(alias):
+    token = REPLICA.set(alias)
+    try:
+        yield
+    finally:
+        REPLICA.reset(token)
+
+
+class ReplicaRouter:
+    """Reads of views marked with ReplicaReadMixin go to a replica.
+
+    Everything else, including all writes and sessions, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = REPLICA.get()
+        if alias is None or model._meta.app_label == "sessions":
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica would otherwise be saved back there.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
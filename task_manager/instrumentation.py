@@ -0,0 +1,154 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+from task_manager.metrics import REQUESTS
+from task_manager.utils import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger("task_manager.instrumentation")
+CURRENT = ContextVar("task_manager_request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+    @contextmanager
+    def template(self):
+        # Included templates (crispy forms, widgets) render inside their
+        # parent; only the outermost render is timed.
+        self.template_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.template_depth -= 1
+            if not self.template_depth:
+                self.template_seconds += time.perf_counter() - started
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        stats = CURRENT.get()
+        if stats is None:
+            return super().render(context, request)
+        with stats.template():
+            return super().render(context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """DjangoTemplates whose renders are timed by InstrumentationMiddleware."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+def get_budget(view_name):
+    budget = {
+        "queries": settings.INSTRUMENTATION_QUERY_BUDGET,
+        "latency_ms": settings.INSTRUMENTATION_LATENCY_BUDGET_MS,
+    }
+    budget.update(settings.INSTRUMENTATION_BUDGETS.get(view_name, {}))
+    return budget
+
+
+class InstrumentationMiddleware:
+    """Per-view histograms of queries, SQL/template/total time and size.
+
+    Enabled with the INSTRUMENTATION setting; results are served to staff
+    users by task_manager.views.MetricsView.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        started = time.perf_counter()
+        with self.collect(stats):
+            response = self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        started = time.perf_counter()
+        with self.collect(stats):
+            response = await self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    @contextmanager
+    def collect(self, stats):
+        # The context, and with it the connections, is shared with the
+        # threads sync_to_async runs the queries of async views in.
+        token = CURRENT.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.execute))
+                yield
+        finally:
+            CURRENT.reset(token)
+
+    def record(self, request, response, stats, elapsed):
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        values = {
+            "queries": stats.queries,
+            "sql_ms": stats.sql_seconds * 1000,
+            "template_ms": stats.template_seconds * 1000,
+            "total_ms": elapsed * 1000,
+        }
+        # Streaming bodies are produced after the middleware returns.
+        if not response.streaming:
+            values["response_bytes"] = len(response.content)
+        REQUESTS.observe(view_name, values)
+        budget = get_budget(view_name)
+        if (
+            values["queries"] > budget["queries"]
+            or values["total_ms"] > budget["latency_ms"]
+        ):
+            logger.warning(
+                "%s %s over budget: %d queries, %.1f ms (budget %d queries, %d ms)",
+                request.method,
+                view_name,
+                values["queries"],
+                values["total_ms"],
+                budget["queries"],
+                budget["latency_ms"],
+            )
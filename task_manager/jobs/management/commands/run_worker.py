@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.jobs.worker import work, work_in_processes
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (task_manager.jobs.queue.enqueue)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=settings.JOB_WORKER_PROCESSES
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=settings.JOB_WORKER_THREADS,
+            help="Jobs each process runs at the same time.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds to wait when no job is due.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        pool = (options["threads"], options["poll_interval"], options["burst"])
+        if options["processes"] > 1:
+            exitcodes = work_in_processes(options["processes"], *pool)
+            self.stdout.write(f"{len(exitcodes)} worker processes stopped")
+            return
+        done, failed = work(*pool)
+        self.stdout.write(f"{done} jobs done, {failed} failed")
@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    # A call to a module-level function, run by `manage.py run_worker`
+    # (task_manager.jobs.worker). Jobs that succeed are deleted; those out of
+    # attempts stay behind as FAILED with their last error.
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, _("Queued")),
+        (RUNNING, _("Running")),
+        (FAILED, _("Failed")),
+    ]
+
+    # Dotted path of the function.
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not before; pushed back after each failed attempt.
+    run_at = models.DateTimeField(default=timezone.now)
+    # Claim token of the worker running the job, see queue.claim().
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"], name="jobs_due_idx")]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
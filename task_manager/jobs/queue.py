@@ -0,0 +1,109 @@
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from task_manager.jobs.models import Job
+
+logger = logging.getLogger("task_manager.jobs")
+
+
+def job_name(func):
+    return func if isinstance(func, str) else f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, *args, **kwargs):
+    """Queue func(*args, **kwargs) for the workers.
+
+    func is a module-level function or its dotted path; args and kwargs must
+    be JSON serialisable. The job is saved in the caller's transaction, so
+    workers see it only once that commits and never if it rolls back.
+    """
+    return enqueue_at(timezone.now(), func, *args, **kwargs)
+
+
+def enqueue_at(run_at, func, *args, **kwargs):
+    """Like enqueue(), for a job that is not due before run_at."""
+    return Job.objects.create(
+        name=job_name(func), args=list(args), kwargs=kwargs, run_at=run_at
+    )
+
+
+def due(now):
+    # Queued jobs whose time has come, and running ones whose worker has held
+    # them for longer than JOB_TIMEOUT, presumably because it died.
+    stale = now - timedelta(seconds=settings.JOB_TIMEOUT)
+    return Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING, locked_at__lt=stale
+    )
+
+
+def mark_running(jobs, now, token, limit):
+    ids = list(
+        jobs.filter(due(now))
+        .order_by("run_at", "id")
+        .values_list("pk", flat=True)[:limit]
+    )
+    jobs.filter(due(now), pk__in=ids).update(
+        status=Job.RUNNING,
+        locked_by=token,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+
+
+def claim(worker, limit):
+    """Marks up to limit due jobs as running for worker and returns them."""
+    now = timezone.now()
+    token = f"{worker}/{uuid.uuid4().hex[:8]}"
+    using = router.db_for_write(Job)
+    jobs = Job.objects.using(using)
+    if connections[using].features.has_select_for_update_skip_locked:
+        # Concurrent workers skip each other's rows instead of waiting.
+        with transaction.atomic(using=using):
+            mark_running(jobs.select_for_update(skip_locked=True), now, token, limit)
+    else:
+        # SQLite has no row locks, and a transaction that reads before it
+        # writes fails while another worker writes. Without one, two workers
+        # may pick the same ids, but only one still finds a job due when its
+        # UPDATE runs.
+        mark_running(jobs, now, token, limit)
+    return list(jobs.filter(locked_by=token).order_by("run_at", "id"))
+
+
+def backoff(attempts):
+    delay = settings.JOB_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.JOB_RETRY_MAX_DELAY))
+
+
+def failed(job, error):
+    logger.warning("Job %s failed (attempt %d): %r", job.name, job.attempts, error)
+    jobs = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    last_error = "".join(traceback.format_exception(error))
+    if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+        jobs.update(status=Job.FAILED, locked_by="", last_error=last_error)
+    else:
+        jobs.update(
+            status=Job.QUEUED,
+            locked_by="",
+            run_at=timezone.now() + backoff(job.attempts),
+            last_error=last_error,
+        )
+
+
+def run(job):
+    """Runs a claimed job; True if it succeeded."""
+    try:
+        import_string(job.name)(*job.args, **job.kwargs)
+    except Exception as error:
+        failed(job, error)
+        return False
+    # Unless it timed out and another worker has taken it over meanwhile.
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()
+    return True
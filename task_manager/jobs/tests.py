@@ -0,0 +1,136 @@
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from task_manager.jobs import queue
+from task_manager.jobs.models import Job
+from task_manager.jobs.worker import Worker
+from task_manager.tests import sqlite_production_profile
+
+CALLS = []
+
+
+def remember(*args, **kwargs):
+    CALLS.append((args, kwargs))
+
+
+def explode():
+    raise ValueError("boom")
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_RETRY_MAX_DELAY=30, JOB_MAX_ATTEMPTS=3)
+class TestJobQueue(TestCase):
+    def setUp(self) -> None:
+        CALLS.clear()
+
+    def run_due(self):
+        return Worker(burst=True).run()
+
+    def test_job_runs_and_is_deleted(self):
+        queue.enqueue(remember, 1, "two", three=3)
+
+        self.assertEquals(self.run_due(), (1, 0))
+        self.assertEquals(CALLS, [((1, "two"), {"three": 3})])
+        self.assertFalse(Job.objects.exists())
+
+    def test_rolled_back_job_is_dropped(self):
+        try:
+            with transaction.atomic():
+                queue.enqueue(remember)
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertFalse(Job.objects.exists())
+
+    def test_failures_are_retried_with_backoff(self):
+        job = queue.enqueue("task_manager.jobs.tests.explode")
+        delays = []
+        for _ in range(3):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            before = timezone.now()
+            with self.assertLogs("task_manager.jobs", "WARNING"):
+                self.assertEquals(self.run_due(), (0, 1))
+            job.refresh_from_db()
+            delays.append(round((job.run_at - before).total_seconds()))
+
+        self.assertEquals(delays[:2], [10, 20])
+        self.assertEquals((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertIn("ValueError: boom", job.last_error)
+        self.assertEquals(self.run_due(), (0, 0))
+
+    def test_claims_do_not_overlap(self):
+        for number in range(5):
+            queue.enqueue(remember, number)
+
+        first = queue.claim("one", 3)
+        second = queue.claim("two", 3)
+
+        self.assertEquals(len(first), 3)
+        self.assertEquals(len(second), 2)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_lost_job_is_claimed_again(self):
+        queue.enqueue(remember)
+        [lost] = queue.claim("dead", 1)
+        self.assertEquals(queue.claim("alive", 1), [])
+
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertEquals(self.run_due(), (1, 0))
+        self.assertEquals(len(CALLS), 1)
+        self.assertEquals(lost.attempts, 1)
+
+    def test_future_jobs_wait(self):
+        job = queue.enqueue(remember)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now() + timedelta(hours=1))
+
+        self.assertEquals(self.run_due(), (0, 0))
+
+    def test_run_worker_command(self):
+        queue.enqueue(remember)
+        queue.enqueue(explode)
+        out = StringIO()
+
+        with self.assertLogs("task_manager.jobs", "WARNING"):
+            call_command("run_worker", "--burst", "--threads", "1", stdout=out)
+
+        self.assertEquals(out.getvalue().strip(), "1 jobs done, 1 failed")
+
+
+class TestConcurrentWorkers(TransactionTestCase):
+    workers = 4
+    jobs = 40
+
+    def work(self):
+        try:
+            Worker(threads=2, burst=True).run()
+        finally:
+            connections.close_all()
+
+    def test_each_job_runs_once(self):
+        CALLS.clear()
+        with tempfile.TemporaryDirectory() as directory:
+            with sqlite_production_profile(os.path.join(directory, "db.sqlite3")):
+                for number in range(self.jobs):
+                    queue.enqueue(remember, number)
+                workers = [
+                    threading.Thread(target=self.work) for _ in range(self.workers)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                left = Job.objects.count()
+
+        self.assertEquals(sorted(args[0] for args, kwargs in CALLS), list(range(self.jobs)))
+        self.assertEquals(left, 0)
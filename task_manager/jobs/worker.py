@@ -0,0 +1,96 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+
+from task_manager.jobs import queue
+
+logger = logging.getLogger("task_manager.jobs")
+
+
+def run_in_thread(job):
+    try:
+        return queue.run(job)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """Claims due jobs in batches and runs them on a pool of threads.
+
+    With a single thread jobs run in the calling thread. burst stops the
+    worker once no job is due instead of polling every poll_interval seconds.
+    """
+
+    def __init__(self, threads=1, poll_interval=None, burst=False):
+        self.threads = threads
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self.burst = burst
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop = threading.Event()
+        self.done = self.failed = 0
+
+    def run_batch(self, pool):
+        try:
+            jobs = queue.claim(self.name, self.threads * 2)
+        except DatabaseError:
+            # Locked or unreachable; try again after poll_interval.
+            logger.exception("Could not claim jobs")
+            close_old_connections()
+            return 0
+        if pool is None:
+            results = [queue.run(job) for job in jobs]
+        else:
+            results = list(pool.map(run_in_thread, jobs))
+        self.done += results.count(True)
+        self.failed += results.count(False)
+        return len(jobs)
+
+    def run(self):
+        pool = ThreadPoolExecutor(self.threads) if self.threads > 1 else None
+        try:
+            while not self.stop.is_set():
+                if self.run_batch(pool):
+                    continue
+                if self.burst:
+                    break
+                self.stop.wait(self.poll_interval)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.done, self.failed
+
+
+def work(threads, poll_interval, burst):
+    worker = Worker(threads, poll_interval, burst)
+    # SIGTERM and Ctrl-C finish the running batch first.
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop.set())
+    return worker.run()
+
+
+def work_in_processes(processes, threads, poll_interval, burst):
+    # Children must not share the parent's database connections.
+    connections.close_all()
+    children = [
+        multiprocessing.Process(target=work, args=(threads, poll_interval, burst))
+        for _ in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def stop(*args):
+        for child in children:
+            child.terminate()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, stop)
+    for child in children:
+        child.join()
+    return [child.exitcode for child in children]
@@ -4,6 +4,10 @@ from django.urls import reverse_lazy
 from django.contrib.messages import get_messages
 from django.utils.translation import gettext_lazy as _
 from django import test
+from django.db import connection
+from django.db.models import Value
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
 
 from task_manager.labels.models import LabelModel
 from task_manager.utils import SomeFuncsForTestsMixin
@@ -105,3 +109,98 @@ class TestView(SomeFuncsForTestsMixin, TestCase):
         self.assertEquals(len(message), 1)
         self.assertEquals(str(message[0]), _("Can't delete label because it's in use"))
         self.assertRedirects(response, self.all_labels_url)
+
+    def test_label_attached_after_the_check_is_not_deleted(self):
+        self.login_user(self.user)
+        # The in_use annotation ran before a task got the label.
+        missed = mock.patch(
+            "task_manager.utils.annotate_in_use",
+            lambda queryset, protected_by: queryset.annotate(in_use=Value(False)),
+        )
+        with missed:
+            response = self.client.post(
+                reverse_lazy("delete_label", kwargs={"pk": self.label_in_use.pk})
+            )
+            self.client.post(
+                reverse_lazy("bulk_delete_labels"), {"ids": [self.label_in_use.pk]}
+            )
+        message = list(get_messages(response.wsgi_request))
+
+        self.assertEquals(str(message[0]), _("Can't delete label because it's in use"))
+        self.assertTrue(LabelModel.objects.filter(pk=self.label_in_use.pk).exists())
+        self.assertTrue(self.label_in_use.taskmodel_set.exists())
+
+    def test_all_labels_not_modified(self):
+        self.login_user(self.user)
+        response = self.client.get(self.all_labels_url)
+        with CaptureQueriesContext(connection) as context:
+            cached = self.client.get(
+                self.all_labels_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        rows = [
+            query
+            for query in context.captured_queries
+            if '"labels_labelmodel"."name"' in query["sql"]
+        ]
+
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertEquals(cached.status_code, 304)
+        self.assertFalse(rows)
+
+    def test_all_labels_modified(self):
+        self.login_user(self.user)
+        response = self.client.get(self.all_labels_url)
+        LabelModel.objects.create(name="new_label")
+        changed = self.client.get(self.all_labels_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEquals(changed.status_code, 200)
+        self.assertContains(changed, "new_label")
+
+    def test_delete_label_POST_in_use_single_lookup(self):
+        self.login_user(self.user)
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(
+                reverse_lazy("delete_label", kwargs={"pk": self.label_in_use.pk})
+            )
+        lookups = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "EXISTS" in query["sql"]
+        ]
+
+        self.assertEquals(len(lookups), 1)
+        self.assertTrue(LabelModel.objects.filter(pk=self.label_in_use.pk).exists())
+
+    def test_bulk_delete_labels_POST(self):
+        self.login_user(self.user)
+        extra = LabelModel.objects.create(name="extra_label")
+        ids = [self.label_in_use.pk, self.label_unused.pk, extra.pk]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse_lazy("bulk_delete_labels"), {"ids": ids}
+            )
+        message = [str(m) for m in get_messages(response.wsgi_request)]
+        lookups = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "EXISTS" in query["sql"]
+        ]
+
+        self.assertRedirects(response, self.all_labels_url)
+        self.assertEquals(len(lookups), 1)
+        self.assertEquals(
+            list(LabelModel.objects.filter(pk__in=ids).values_list("pk", flat=True)),
+            [self.label_in_use.pk],
+        )
+        self.assertIn(_("Labels deleted: %(count)d") % {"count": 2}, message)
+        self.assertIn(
+            _("Can't delete labels because they're in use: %(names)s")
+            % {"names": self.label_in_use.name},
+            message,
+        )
+
+    def test_bulk_delete_labels_GET_not_allowed(self):
+        self.login_user(self.user)
+        response = self.client.get(reverse_lazy("bulk_delete_labels"))
+
+        self.assertEquals(response.status_code, 405)
@@ -1,20 +1,41 @@
-from django.contrib import messages
-from django.shortcuts import redirect
+from django.db.models import Count, Max
 from django.views.generic import CreateView, ListView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.contrib.messages.views import SuccessMessageMixin
 
 from task_manager.labels.forms import LabelForm
-from task_manager.utils import CustomLoginRequiredMixin
+from task_manager.tasks.models import TaskModel
+from task_manager.utils import (
+    AsyncListViewMixin,
+    BulkDeleteView,
+    ConditionalGetMixin,
+    CustomLoginRequiredMixin,
+    ProtectedDeleteMixin,
+    ReplicaReadMixin,
+)
 from task_manager.labels.models import LabelModel
 
 
-class ShowAllLabels(CustomLoginRequiredMixin, ListView):
+class ShowAllLabels(
+    CustomLoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, ListView
+):
     model = LabelModel
     template_name = "labels/PageWithAll.html"
     login_url = reverse_lazy("login")
 
+    def get_validators(self):
+        stamp = LabelModel.objects.aggregate(count=Count("id"), last=Max("modified_at"))
+        return (stamp["count"], stamp["last"]), stamp["last"]
+
+
+class AsyncShowAllLabels(AsyncListViewMixin, ShowAllLabels):
+    async def aget_validators(self):
+        stamp = await LabelModel.objects.aaggregate(
+            count=Count("id"), last=Max("modified_at")
+        )
+        return (stamp["count"], stamp["last"]), stamp["last"]
+
 
 class CreateLabel(CustomLoginRequiredMixin, SuccessMessageMixin, CreateView):
     model = LabelModel
@@ -38,6 +59,7 @@ class UpdateLabel(CustomLoginRequiredMixin, SuccessMessageMixin, UpdateView):
 
 class DeleteLabel(
     CustomLoginRequiredMixin,
+    ProtectedDeleteMixin,
     SuccessMessageMixin,
     DeleteView,
 ):
@@ -46,14 +68,14 @@ class DeleteLabel(
     success_url = reverse_lazy("all_labels")
     template_name = "labels/DeletePage.html"
     login_url = reverse_lazy("login")
+    protected_by = ((TaskModel.labels.through, "labelmodel"),)
+    protected_message = _("Can't delete label because it's in use")
 
-    def post(self, request, *args, **kwargs):
-        if self.get_object().taskmodel_set.exists():
-            messages.add_message(
-                request,
-                messages.ERROR,
-                _("Can't delete label because it's in use"),
-            )
-            return redirect(self.success_url)
-        else:
-            return super(DeleteLabel, self).post(request, *args, **kwargs)
+
+class BulkDeleteLabels(BulkDeleteView):
+    model = LabelModel
+    success_url = reverse_lazy("all_labels")
+    login_url = reverse_lazy("login")
+    protected_by = ((TaskModel.labels.through, "labelmodel"),)
+    deleted_message = _("Labels deleted: %(count)d")
+    protected_message = _("Can't delete labels because they're in use: %(names)s")
@@ -0,0 +1,122 @@
+import json
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from task_manager.bench import (
+    SCALES,
+    Bench,
+    compare,
+    fragment_cache,
+    generate,
+    session_store,
+    test_database,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the views against a synthetic dataset in a throwaway test "
+        "database; optionally fail on regressions against a baseline report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+        for name in ("users", "statuses", "labels", "tasks", "fan-out"):
+            parser.add_argument(f"--{name}", type=int, help="Override the scale.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--cold", action="store_true", help="Clear the cache before every request."
+        )
+        parser.add_argument(
+            "--only", nargs="*", help="Run only scenarios starting with these names."
+        )
+        parser.add_argument(
+            "--session-store",
+            choices=sorted(settings.SESSION_STORES),
+            help="Session store to run with instead of SESSION_ENGINE.",
+        )
+        parser.add_argument(
+            "--no-fragment-cache",
+            action="store_true",
+            help="Render the navbar, filter form and task rows every time.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--baseline", help="JSON report to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.25)
+
+    def get_sizes(self, options):
+        sizes = dict(SCALES[options["scale"]])
+        for name in sizes:
+            if options[name] is not None:
+                sizes[name] = options[name]
+        return sizes
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+        sizes = self.get_sizes(options)
+        report = self.run(sizes, options)
+        self.print_report(report)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2, sort_keys=True)
+        if baseline is not None:
+            regressions = compare(report, baseline, options["tolerance"])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against the baseline")
+            self.stdout.write("No regressions against the baseline")
+
+    def run(self, sizes, options):
+        with test_database(), session_store(
+            options["session_store"]
+        ), fragment_cache(not options["no_fragment_cache"]):
+            started = time.perf_counter()
+            data = generate(sizes, options["seed"])
+            generated = time.perf_counter() - started
+            bench = Bench(
+                data,
+                options["repeat"],
+                options["warmup"],
+                options["seed"],
+                options["cold"],
+            )
+            scenarios = bench.run(options["only"])
+            engine = settings.SESSION_ENGINE
+        return {
+            "meta": {
+                "sizes": sizes,
+                "repeat": options["repeat"],
+                "seed": options["seed"],
+                "cold_cache": options["cold"],
+                "session_engine": engine,
+                "fragment_cache": not options["no_fragment_cache"],
+                "generate_seconds": round(generated, 2),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "scenarios": scenarios,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{'scenario':<48} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+            f"{'tmpl ms':>8} {'queries':>8}"
+        )
+        for name, result in report["scenarios"].items():
+            self.stdout.write(
+                f"{name:<48} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['template_p50_ms']:>8.2f} "
+                f"{result['queries']:>8}"
+            )
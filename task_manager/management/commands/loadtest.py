@@ -0,0 +1,68 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.bench import (
+    LOAD_PAGES,
+    LOADERS,
+    SCALES,
+    generate,
+    load_test,
+    session_store,
+    test_database,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the WSGI (sync views) and ASGI (async views) "
+        "handlers at a given concurrency, in process, on a throwaway database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+        parser.add_argument("--tasks", type=int, help="Override the scale.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--mode", choices=sorted(LOADERS), nargs="*", default=["wsgi", "asgi"]
+        )
+        parser.add_argument("--pages", nargs="*", default=list(LOAD_PAGES))
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--session-store",
+            choices=sorted(settings.SESSION_STORES),
+            help="Session store to run with instead of SESSION_ENGINE.",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        sizes = dict(SCALES[options["scale"]])
+        if options["tasks"] is not None:
+            sizes["tasks"] = options["tasks"]
+        with test_database(), session_store(options["session_store"]):
+            data = generate(sizes, options["seed"])
+            results = load_test(
+                data,
+                options["mode"],
+                options["pages"],
+                options["requests"],
+                options["concurrency"],
+                options["seed"],
+            )
+        self.stdout.write(
+            f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<6} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['errors']:>7}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(
+                    {"sizes": sizes, "concurrency": options["concurrency"], **results},
+                    file,
+                    indent=2,
+                )
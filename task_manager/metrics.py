@@ -0,0 +1,89 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets; values above the last bound land in
+# an overflow bucket.
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the requested rank; the overflow
+        # bucket reports the largest value seen.
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, hits in zip((*self.bounds, self.max), self.buckets):
+            seen += hits
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class Registry:
+    # {group: {metric: Histogram}}, shared by all threads of the process.
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.groups = {}
+        self.lock = threading.Lock()
+
+    def observe(self, group, values):
+        with self.lock:
+            histograms = self.groups.setdefault(group, {})
+            for metric, value in values.items():
+                if metric not in histograms:
+                    histograms[metric] = Histogram(self.bounds[metric])
+                histograms[metric].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                group: {metric: hist.as_dict() for metric, hist in histograms.items()}
+                for group, histograms in sorted(self.groups.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.groups.clear()
+
+
+REQUESTS = Registry(
+    {
+        "queries": COUNT_BUCKETS,
+        "sql_ms": MS_BUCKETS,
+        "template_ms": MS_BUCKETS,
+        "total_ms": MS_BUCKETS,
+        "response_bytes": BYTES_BUCKETS,
+    }
+)
+
+# Connection pools (task_manager/db/pool.py), grouped by database alias.
+CONNECTIONS = Registry({"checkout_wait_ms": MS_BUCKETS, "in_use": COUNT_BUCKETS})
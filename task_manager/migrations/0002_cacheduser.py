@@ -0,0 +1,28 @@
+# Generated by Django 4.1.1 on 2026-10-18 20:51
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("task_manager", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedUser",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("auth.user",),
+            managers=[
+                ("objects", django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
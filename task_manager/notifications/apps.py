@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class NotificationsConfig(AppConfig):
+    name = "task_manager.notifications"
+
+    def ready(self):
+        from task_manager.notifications import digest
+        from task_manager.tasks import activity
+
+        activity.events_saved.connect(digest.queue_fan_out)
@@ -0,0 +1,159 @@
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from task_manager.jobs import queue
+from task_manager.jobs.models import Job
+from task_manager.notifications.models import Notification, NotificationPreference
+from task_manager.tasks.models import TaskActivity, TaskModel
+
+
+class Preference(NamedTuple):
+    kinds: int
+    window: timedelta
+
+
+def preferences(user_ids):
+    """{user id: Preference} for user_ids, defaults included."""
+    default = Preference(
+        NotificationPreference.ALL, timedelta(minutes=settings.NOTIFICATION_WINDOW)
+    )
+    found = dict.fromkeys(user_ids, default)
+    for user_id, kinds, window in NotificationPreference.objects.filter(
+        user_id__in=found
+    ).values_list("user_id", "kinds", "window"):
+        found[user_id] = Preference(kinds, timedelta(minutes=window))
+    return found
+
+
+def queue_fan_out(sender, events, **kwargs):
+    # Runs as the activity log is written, so in the request; the rest
+    # happens in a worker.
+    changes = [
+        {
+            "task": event.task_id,
+            "actor": event.actor_id,
+            "assigned": "executor" in event.changes,
+        }
+        for event in events
+        if event.action != TaskActivity.DELETED
+        and {"executor", "status"} & event.changes.keys()
+    ]
+    if changes:
+        queue.enqueue(fan_out, changes)
+
+
+def schedule_digests(run_at):
+    # Some send_digests job must run by run_at; it reschedules itself for
+    # the recipients it finds not due yet.
+    waiting = Job.objects.filter(
+        name=queue.job_name(send_digests), status=Job.QUEUED, run_at__lte=run_at
+    )
+    if not waiting.exists():
+        queue.enqueue_at(run_at, send_digests)
+
+
+def fan_out(changes):
+    """Job: turns task changes into notifications for their executors."""
+    tasks = TaskModel.objects.only("executor_id", "status_id").in_bulk(
+        [change["task"] for change in changes]
+    )
+    notifications = []
+    for change in changes:
+        task = tasks.get(change["task"])
+        # Nobody is told about their own changes.
+        if task is None or task.executor_id in (None, change["actor"]):
+            continue
+        kind = Notification.ASSIGNED if change["assigned"] else Notification.STATUS
+        notifications.append(
+            Notification(
+                recipient_id=task.executor_id,
+                task_id=task.pk,
+                kind=kind,
+                status_id=task.status_id,
+            )
+        )
+    wanted = preferences({item.recipient_id for item in notifications})
+    notifications = [
+        item for item in notifications if wanted[item.recipient_id].kinds & item.kind
+    ]
+    Notification.objects.bulk_create(notifications)
+    now = timezone.now()
+    for window in {wanted[item.recipient_id].window for item in notifications}:
+        schedule_digests(now + window)
+
+
+def claimable(now):
+    stale = now - timedelta(seconds=settings.JOB_TIMEOUT)
+    return Q(claimed_at=None) | Q(claimed_at__lt=stale)
+
+
+def claim(now):
+    """Claims the notifications of every recipient whose window is over.
+
+    Returns the claim token and when the next recipient will be due, if any.
+    """
+    firsts = dict(
+        Notification.objects.filter(claimable(now))
+        .values_list("recipient_id")
+        .annotate(Min("created_at"))
+    )
+    windows = preferences(firsts)
+    due, later = [], []
+    for recipient, first in firsts.items():
+        ready = first + windows[recipient].window
+        if ready <= now:
+            due.append(recipient)
+        else:
+            later.append(ready)
+    token = uuid.uuid4().hex
+    Notification.objects.filter(claimable(now), recipient_id__in=due).update(
+        claimed_by=token, claimed_at=now
+    )
+    return token, min(later, default=None)
+
+
+def messages(notifications):
+    # One message per recipient with an address, one line per task.
+    tasks = defaultdict(dict)
+    for item in notifications:
+        entry = tasks[item.recipient].setdefault(item.task, {"kinds": []})
+        if item.get_kind_display() not in entry["kinds"]:
+            entry["kinds"].append(item.get_kind_display())
+        entry["status"] = item.status
+    return [
+        EmailMessage(
+            _("Changes to your tasks"),
+            render_to_string(
+                "notifications/digest.txt", {"recipient": recipient, "tasks": changes}
+            ),
+            to=[recipient.email],
+        )
+        for recipient, changes in tasks.items()
+        if recipient.email
+    ]
+
+
+def send_digests():
+    """Job: mails each recipient whose window is over one digest of it."""
+    token, next_due = claim(timezone.now())
+    claimed = Notification.objects.filter(claimed_by=token)
+    try:
+        notifications = list(
+            claimed.select_related("recipient", "task", "status").order_by("created_at")
+        )
+        get_connection().send_messages(messages(notifications))
+    except Exception:
+        claimed.update(claimed_by="", claimed_at=None)
+        raise
+    claimed.delete()
+    if next_due is not None:
+        schedule_digests(next_due)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django import forms
+from django.conf import settings
+from django.utils import timezone
+from django.utils.timesince import timesince
+from django.utils.translation import gettext_lazy as _
+
+from task_manager.notifications.models import Notification, NotificationPreference
+
+
+class PreferenceForm(forms.ModelForm):
+    email = forms.EmailField(label=_("Email"), required=False)
+    kinds = forms.TypedMultipleChoiceField(
+        label=_("Notify me when"),
+        choices=Notification.KINDS,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    window = forms.TypedChoiceField(label=_("At most one email per"), coerce=int)
+
+    class Meta:
+        model = NotificationPreference
+        fields = ("kinds", "window")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        now = timezone.now()
+        self.fields["window"].choices = [
+            (minutes, timesince(now - timedelta(minutes=minutes), now))
+            for minutes in settings.NOTIFICATION_WINDOWS
+        ]
+        self.initial["email"] = self.instance.user.email
+        self.initial["kinds"] = [
+            kind for kind, label in Notification.KINDS if self.instance.kinds & kind
+        ]
+
+    def clean_kinds(self):
+        return sum(set(self.cleaned_data["kinds"]))
+
+    def save(self, commit=True):
+        preference = super().save(commit=False)
+        preference.user.email = self.cleaned_data["email"]
+        if commit:
+            self.save_preference(preference)
+        return preference
+
+    def save_preference(self, preference):
+        user = preference.user
+        user.save(update_fields=["email"])
+        # The defaults need no row.
+        default = NotificationPreference(user=user)
+        if (preference.kinds, preference.window) == (default.kinds, default.window):
+            NotificationPreference.objects.filter(user=user).delete()
+        else:
+            preference.save()
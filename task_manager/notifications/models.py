@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.models import TaskModel
+
+
+def default_window():
+    return settings.NOTIFICATION_WINDOW
+
+
+class Notification(models.Model):
+    # A task change waiting for its recipient's next digest
+    # (task_manager.notifications.digest), deleted once that is sent.
+    ASSIGNED = 1
+    STATUS = 2
+    KINDS = [
+        (ASSIGNED, _("Assigned to you")),
+        (STATUS, _("Status changed")),
+    ]
+
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    task = models.ForeignKey(TaskModel, on_delete=models.CASCADE, related_name="+")
+    kind = models.PositiveSmallIntegerField(choices=KINDS)
+    # The status of the task when the change was recorded.
+    status = models.ForeignKey(
+        StatusModel, null=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    # Token of the digest being sent, see digest.claim().
+    claimed_by = models.CharField(max_length=40, blank=True)
+    claimed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["recipient", "created_at"], name="notifications_recipient_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.task_id} for {self.recipient_id}"
+
+
+class NotificationPreference(models.Model):
+    # Only users who changed the defaults have a row. kinds is a bit set of
+    # the Notification kinds they want, window the minutes changes are
+    # collected for before a digest goes out.
+    ALL = Notification.ASSIGNED | Notification.STATUS
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    kinds = models.PositiveSmallIntegerField(default=ALL)
+    window = models.PositiveSmallIntegerField(default=default_window)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.kinds} every {self.window} min"
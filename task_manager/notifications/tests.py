@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django import test
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import Client, TestCase
+from django.urls import reverse_lazy
+from django.utils import timezone
+
+from task_manager.jobs.models import Job
+from task_manager.jobs.worker import Worker
+from task_manager.notifications.forms import PreferenceForm
+from task_manager.notifications.models import Notification, NotificationPreference
+from task_manager.utils import SomeFuncsForTestsMixin
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestDigests(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        User.objects.filter(pk=2).update(email="second@example.com")
+        self.login_user(self.user)
+
+    def update(self, status=1, executor=2):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse_lazy("update_task", kwargs={"pk": 1}),
+                {"name": "asd", "status": status, "executor": executor, "labels": [1]},
+            )
+
+    def run_jobs(self):
+        Worker(burst=True).run()
+
+    def pass_window(self):
+        past = timezone.now() - timedelta(hours=1)
+        Notification.objects.update(created_at=past)
+        Job.objects.update(run_at=past)
+        self.run_jobs()
+
+    def test_changes_are_coalesced_into_one_digest(self):
+        self.update(executor=2)
+        self.update(status=2, executor=2)
+        self.run_jobs()
+
+        self.assertEquals(Notification.objects.count(), 2)
+        self.assertEquals(mail.outbox, [])
+
+        self.pass_window()
+
+        self.assertEquals(len(mail.outbox), 1)
+        self.assertEquals(mail.outbox[0].to, ["second@example.com"])
+        self.assertIn("asd (status2)", mail.outbox[0].body)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_no_work_in_request(self):
+        self.update(executor=2)
+
+        self.assertEquals(
+            list(Job.objects.values_list("name", flat=True)),
+            ["task_manager.notifications.digest.fan_out"],
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_own_changes_are_not_notified(self):
+        self.update(status=2, executor=1)
+        self.run_jobs()
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test_preferences(self):
+        response = self.client.post(
+            reverse_lazy("notification_preferences"),
+            {"email": "first@example.com", "kinds": [2], "window": 60},
+        )
+
+        self.assertRedirects(response, reverse_lazy("notification_preferences"))
+        self.assertEquals(
+            NotificationPreference.objects.values_list("user_id", "kinds", "window").get(),
+            (1, Notification.STATUS, 60),
+        )
+        self.assertEquals(User.objects.get(pk=1).email, "first@example.com")
+
+        self.client.post(
+            reverse_lazy("notification_preferences"),
+            {"email": "first@example.com", "kinds": [1, 2], "window": 15},
+        )
+        self.assertFalse(NotificationPreference.objects.exists())
+
+    def test_preferences_form_without_commit_writes_nothing(self):
+        NotificationPreference.objects.create(user=self.user, kinds=Notification.STATUS)
+        preference = NotificationPreference.objects.get(user=self.user)
+        form = PreferenceForm(
+            {"email": "first@example.com", "kinds": [1, 2], "window": 15},
+            instance=preference,
+        )
+
+        self.assertTrue(form.is_valid())
+        form.save(commit=False)
+
+        self.assertEquals(User.objects.get(pk=1).email, "")
+        self.assertTrue(NotificationPreference.objects.exists())
+
+    def test_unwanted_kinds_are_dropped(self):
+        NotificationPreference.objects.create(user_id=2, kinds=Notification.STATUS)
+        self.update(executor=2)
+        self.run_jobs()
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test_recipient_waits_for_own_window(self):
+        NotificationPreference.objects.create(user_id=2, window=60)
+        self.update(executor=2)
+        self.run_jobs()
+        half_way = timezone.now() - timedelta(minutes=30)
+        Notification.objects.update(created_at=half_way)
+        Job.objects.update(run_at=half_way)
+
+        self.run_jobs()
+
+        self.assertEquals(mail.outbox, [])
+        self.assertEquals(Job.objects.get().run_at, half_way + timedelta(minutes=60))
@@ -0,0 +1,7 @@
+from django.urls import path
+from task_manager.notifications import views
+
+
+urlpatterns = [
+    path("", views.UpdatePreferences.as_view(), name="notification_preferences"),
+]
@@ -0,0 +1,21 @@
+from django.contrib.messages.views import SuccessMessageMixin
+from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
+from django.views.generic import UpdateView
+
+from task_manager.notifications.forms import PreferenceForm
+from task_manager.notifications.models import NotificationPreference
+from task_manager.utils import CustomLoginRequiredMixin
+
+
+class UpdatePreferences(CustomLoginRequiredMixin, SuccessMessageMixin, UpdateView):
+    form_class = PreferenceForm
+    template_name = "notifications/PreferencesPage.html"
+    success_url = reverse_lazy("notification_preferences")
+    success_message = _("Notification settings saved")
+    login_url = reverse_lazy("login")
+
+    def get_object(self, queryset=None):
+        user = self.request.user
+        preference = NotificationPreference.objects.filter(user=user).first()
+        return preference or NotificationPreference(user=user)
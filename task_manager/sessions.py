@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.sessions.backends import db
+from django.core.cache import caches
+
+
+class SessionStore(db.SessionStore):
+    """Database sessions behind a write-through cache.
+
+    Reads are served from the SESSION_CACHE_ALIAS cache and go to the
+    database on a miss; every write and delete goes to the database first and
+    then to the cache. That cache must be shared by the workers, so that a
+    session changed, flushed or rotated by one of them is seen by all.
+    Entries live at most SESSION_CACHE_TIMEOUT seconds. A save is skipped
+    when the data is what was last loaded or saved, even if the session was
+    marked as modified.
+    """
+
+    cache_key_prefix = "task_manager.sessions."
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = caches[settings.SESSION_CACHE_ALIAS]
+        self._persisted = None
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def cache_timeout(self, expiry):
+        return min(self.get_expiry_age(expiry=expiry), settings.SESSION_CACHE_TIMEOUT)
+
+    def remember(self, data):
+        self._persisted = (self.session_key, self.serializer().dumps(data))
+
+    def load(self):
+        data = self._cache.get(self.cache_key) if self.session_key else None
+        if data is None:
+            session = self._get_session_from_db()
+            data = self.decode(session.session_data) if session else {}
+            if session:
+                timeout = self.cache_timeout(session.expire_date)
+                self._cache.set(self.cache_key, data, timeout)
+        self.remember(data)
+        return data
+
+    def exists(self, session_key):
+        return (
+            self._cache.get(self.cache_key_prefix + session_key) is not None
+            or super().exists(session_key)
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if not must_create and self._persisted == (
+            self.session_key,
+            self.serializer().dumps(data),
+        ):
+            return
+        super().save(must_create)
+        self._cache.set(self.cache_key, data, self.cache_timeout(self.get_expiry_date()))
+        self.remember(data)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(self.cache_key_prefix + session_key)
@@ -58,29 +58,48 @@ INSTALLED_APPS = [
     "task_manager.tasks",
     "task_manager.statuses",
     "task_manager.labels",
+    "task_manager.jobs",
+    "task_manager.notifications",
 ]
 
 MIDDLEWARE = [
+    "task_manager.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "task_manager.db.middleware.PrimaryPinMiddleware",
+    "task_manager.tasks.activity.ActivityMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Sync only: under ASGI the chain runs in a thread (see README, section 8).
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
 ]
 
-ROOT_URLCONF = "task_manager.urls"
+# task_manager/asgi.py turns ASYNC_VIEWS on: list and detail pages are then
+# served by async views (see task_manager/async_urls.py).
+ASYNC_VIEWS = bool(os.getenv("ASYNC_VIEWS"))
+ROOT_URLCONF = "task_manager.async_urls" if ASYNC_VIEWS else "task_manager.urls"
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Templates are parsed once per worker process; runserver's
+            # autoreloader resets the cache when a template changes.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -104,6 +123,172 @@ DATABASES = {
 }
 db_from_env = dj_database_url.config(conn_max_age=600)
 DATABASES["default"].update(db_from_env)
+# Persistent connections are checked before being reused after a request.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# DB_POOL=1: on PostgreSQL the threads of a worker share a pool of at most
+# DB_POOL_SIZE + DB_POOL_OVERFLOW connections (task_manager/db/pool.py); on
+# SQLite connections stay per thread and switch to WAL with a busy timeout.
+DB_POOL = bool(os.getenv("DB_POOL"))
+# SQLITE_PRODUCTION=1: the SQLite profile for production, see README. Tests
+# run without it, the read-only alias can't see a test case's transaction.
+SQLITE_PRODUCTION = bool(os.getenv("SQLITE_PRODUCTION"))
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative: KiB rather than pages.
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+}
+DATABASE_ENGINE = DATABASES["default"]["ENGINE"]
+DATABASE_ROUTERS = []
+if DB_POOL and DATABASE_ENGINE == "django.db.backends.postgresql":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "task_manager.db.backends.postgresql",
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "SIZE": int(os.getenv("DB_POOL_SIZE", 4)),
+                "OVERFLOW": int(os.getenv("DB_POOL_OVERFLOW", 4)),
+                "MAX_LIFETIME": int(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+                "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            },
+        }
+    )
+elif SQLITE_PRODUCTION and DATABASE_ENGINE == "django.db.backends.sqlite3":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "task_manager.db.backends.sqlite3",
+            "PRAGMAS": SQLITE_PRODUCTION_PRAGMAS,
+            "TRANSACTION_MODE": "IMMEDIATE",
+        }
+    )
+    DATABASES["readonly"] = {
+        **DATABASES["default"],
+        "PRAGMAS": {**SQLITE_PRODUCTION_PRAGMAS, "query_only": "ON"},
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS.append("task_manager.db.routers.ReadOnlyRouter")
+elif DB_POOL and DATABASE_ENGINE == "django.db.backends.sqlite3":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "task_manager.db.backends.sqlite3",
+            "PRAGMAS": {"journal_mode": "WAL", "busy_timeout": 5000},
+        }
+    )
+
+# DATABASE_REPLICA_URLS: comma-separated database URLs of read replicas, as
+# in DATABASE_URL. Read-only pages query one of them (task_manager/db).
+DATABASE_REPLICAS = []
+for number, url in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), start=1
+):
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **dj_database_url.parse(url.strip(), conn_max_age=600),
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS.insert(0, "task_manager.db.routers.ReplicaRouter")
+# Seconds a client keeps reading from the primary after a write, long enough
+# for the replicas to catch up.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+# Seconds an unreachable replica is skipped before being tried again.
+REPLICA_RETRY_SECONDS = 30
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.getenv("FILE_CACHE_DIR"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("FILE_CACHE_DIR"),
+    }
+
+# Rendered task list tables, invalidated by task_manager.tasks.signals
+TASK_LIST_CACHE_ALIAS = "default"
+TASK_LIST_CACHE_TIMEOUT = 300
+# Template fragments ({% fragment %} in task_manager/templatetags): the
+# navbar, the task filter form and task table rows. FRAGMENT_CACHE=0 renders
+# them every time, e.g. to benchmark against.
+FRAGMENT_CACHE = os.getenv("FRAGMENT_CACHE", "1") != "0"
+FRAGMENT_CACHE_TIMEOUT = 300
+
+# Task activity log (task_manager.tasks.activity): the changes of a
+# transaction are written together once it commits ("commit"), or collected
+# across requests and written every ACTIVITY_FLUSH_INTERVAL seconds or
+# ACTIVITY_BATCH_SIZE events ("timer"), which may lose the last events if the
+# process is killed.
+ACTIVITY_FLUSH = os.getenv("ACTIVITY_FLUSH", "commit")
+ACTIVITY_FLUSH_INTERVAL = 2.0
+ACTIVITY_BATCH_SIZE = 200
+# Events shown on the task page.
+ACTIVITY_TIMELINE_SIZE = 50
+
+# Background jobs (task_manager.jobs), queued in the database and run by
+# `manage.py run_worker`. A failed job is retried JOB_RETRY_DELAY seconds
+# later, doubling up to JOB_RETRY_MAX_DELAY, until JOB_MAX_ATTEMPTS; a job
+# still running after JOB_TIMEOUT seconds is assumed lost and run again.
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", 1))
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", 4))
+JOB_POLL_INTERVAL = 1.0
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_RETRY_MAX_DELAY = 3600
+JOB_TIMEOUT = 600
+
+# Task notifications (task_manager.notifications): assignments and status
+# changes are mailed to the executor, collected into one digest per
+# NOTIFICATION_WINDOW minutes unless they picked another of
+# NOTIFICATION_WINDOWS. The mails are sent by the job workers.
+NOTIFICATION_WINDOW = 15
+NOTIFICATION_WINDOWS = (5, 15, 60, 1440)
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = bool(os.getenv("EMAIL_USE_TLS"))
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+
+# Sessions: "cached" keeps them in the database behind a write-through cache
+# (task_manager.sessions), "cookie" keeps them in a signed cookie and never
+# touches the database, "db" is Django's default. The cache must be shared by
+# the workers or a logout is missed by the others, so "cached" is only the
+# default when the "default" cache is (FILE_CACHE_DIR).
+SESSION_STORES = {
+    "cached": "task_manager.sessions",
+    "cookie": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}
+SESSION_ENGINE = SESSION_STORES[
+    os.getenv("SESSION_STORE", "cached" if os.getenv("FILE_CACHE_DIR") else "db")
+]
+SESSION_CACHE_ALIAS = "default"
+# Lifetime of a cached session; a session idle longer is read from the table.
+SESSION_CACHE_TIMEOUT = 60
+
+# Flash messages travel in a signed cookie only, so showing one neither
+# loads nor saves the session.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+
+# The names of request.user and of task authors/executors come from a
+# per-process cache of user records (task_manager/auth/records.py); the
+# password hash and account flags are read from the database every request.
+AUTHENTICATION_BACKENDS = ["task_manager.auth.backends.CachedModelBackend"]
+USER_CACHE_SIZE = 1024
+USER_CACHE_TIMEOUT = 300
 
 
 # Password validation
@@ -158,6 +343,25 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Choice widgets of task forms and filters load options from /autocomplete/
+AUTOCOMPLETE_RESULTS = 20
+AUTOCOMPLETE_MAX_RESULTS = 50
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+# Largest batch accepted by the /api/v1/tasks/bulk/ endpoints
+API_BULK_LIMIT = 500
+
+# Per-view query/latency histograms served at /metrics/ to staff users.
+# Budgets are logged when exceeded; INSTRUMENTATION_BUDGETS overrides them per
+# URL name, e.g. {"all_tasks": {"queries": 10, "latency_ms": 200}}.
+INSTRUMENTATION = bool(os.getenv("INSTRUMENTATION"))
+INSTRUMENTATION_QUERY_BUDGET = 20
+INSTRUMENTATION_LATENCY_BUDGET_MS = 300
+INSTRUMENTATION_BUDGETS = {}
+if INSTRUMENTATION:
+    # DjangoTemplates with render timing for InstrumentationMiddleware
+    TEMPLATES[0]["BACKEND"] = "task_manager.instrumentation.DjangoTemplates"
+
 
 ROLLBAR = {
     "access_token": ACCESS_TOKEN,
@@ -12,6 +12,9 @@ class StatusModel(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name=_("Creation date")
     )
+    modified_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Modification date")
+    )
 
     def __str__(self):
         return self.name
@@ -4,6 +4,8 @@ from django.urls import reverse_lazy
 from django.contrib.messages import get_messages
 from django.utils.translation import gettext_lazy as _
 from django import test
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from task_manager.statuses.models import StatusModel
 from task_manager.utils import SomeFuncsForTestsMixin
@@ -105,3 +107,78 @@ class TestView(SomeFuncsForTestsMixin, TestCase):
         self.assertEquals(len(message), 1)
         self.assertEquals(str(message[0]), _("Can't delete status because it's in use"))
         self.assertRedirects(response, self.all_statuses_url)
+
+    def test_all_statuses_not_modified(self):
+        self.login_user(self.user)
+        response = self.client.get(self.all_statuses_url)
+        with CaptureQueriesContext(connection) as context:
+            cached = self.client.get(
+                self.all_statuses_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        rows = [
+            query
+            for query in context.captured_queries
+            if '"statuses_statusmodel"."name"' in query["sql"]
+        ]
+
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertEquals(cached.status_code, 304)
+        self.assertFalse(rows)
+
+    def test_all_statuses_modified(self):
+        self.login_user(self.user)
+        response = self.client.get(self.all_statuses_url)
+        StatusModel.objects.create(name="new_status")
+        changed = self.client.get(self.all_statuses_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEquals(changed.status_code, 200)
+        self.assertContains(changed, "new_status")
+
+    def test_delete_status_POST_in_use_single_lookup(self):
+        self.login_user(self.user)
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(
+                reverse_lazy("delete_status", kwargs={"pk": self.status_in_use.pk})
+            )
+        lookups = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "EXISTS" in query["sql"]
+        ]
+
+        self.assertEquals(len(lookups), 1)
+        self.assertTrue(StatusModel.objects.filter(pk=self.status_in_use.pk).exists())
+
+    def test_bulk_delete_statuses_POST(self):
+        self.login_user(self.user)
+        extra = StatusModel.objects.create(name="extra_status")
+        ids = [self.status_in_use.pk, self.status_unused.pk, extra.pk]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse_lazy("bulk_delete_statuses"), {"ids": ids}
+            )
+        message = [str(m) for m in get_messages(response.wsgi_request)]
+        lookups = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "EXISTS" in query["sql"]
+        ]
+
+        self.assertRedirects(response, self.all_statuses_url)
+        self.assertEquals(len(lookups), 1)
+        self.assertEquals(
+            list(StatusModel.objects.filter(pk__in=ids).values_list("pk", flat=True)),
+            [self.status_in_use.pk],
+        )
+        self.assertIn(_("Statuses deleted: %(count)d") % {"count": 2}, message)
+        self.assertIn(
+            _("Can't delete statuses because they're in use: %(names)s")
+            % {"names": self.status_in_use.name},
+            message,
+        )
+
+    def test_bulk_delete_statuses_GET_not_allowed(self):
+        self.login_user(self.user)
+        response = self.client.get(reverse_lazy("bulk_delete_statuses"))
+
+        self.assertEquals(response.status_code, 405)
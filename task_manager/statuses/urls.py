@@ -4,6 +4,7 @@ from task_manager.statuses import views
 
 urlpatterns = [
     path("", views.ShowAllStatuses.as_view(), name="all_statuses"),
+    path("delete/", views.BulkDeleteStatuses.as_view(), name="bulk_delete_statuses"),
     path("create/", views.CreateStatus.as_view(), name="create_status"),
     path("<int:pk>/update/", views.UpdateStatus.as_view(), name="update_status"),
     path("<int:pk>/delete/>", views.DeleteStatus.as_view(), name="delete_status"),
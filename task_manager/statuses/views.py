@@ -1,20 +1,41 @@
-from django.contrib import messages
-from django.shortcuts import redirect
+from django.db.models import Count, Max
 from django.views.generic import CreateView, ListView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.contrib.messages.views import SuccessMessageMixin
 
 from task_manager.statuses.forms import StatusForm
-from task_manager.utils import CustomLoginRequiredMixin
+from task_manager.tasks.models import TaskModel
+from task_manager.utils import (
+    AsyncListViewMixin,
+    BulkDeleteView,
+    ConditionalGetMixin,
+    CustomLoginRequiredMixin,
+    ProtectedDeleteMixin,
+    ReplicaReadMixin,
+)
 from task_manager.statuses.models import StatusModel
 
 
-class ShowAllStatuses(CustomLoginRequiredMixin, ListView):
+class ShowAllStatuses(
+    CustomLoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, ListView
+):
     model = StatusModel
     template_name = "statuses/PageWithAll.html"
     login_url = reverse_lazy("login")
 
+    def get_validators(self):
+        stamp = StatusModel.objects.aggregate(count=Count("id"), last=Max("modified_at"))
+        return (stamp["count"], stamp["last"]), stamp["last"]
+
+
+class AsyncShowAllStatuses(AsyncListViewMixin, ShowAllStatuses):
+    async def aget_validators(self):
+        stamp = await StatusModel.objects.aaggregate(
+            count=Count("id"), last=Max("modified_at")
+        )
+        return (stamp["count"], stamp["last"]), stamp["last"]
+
 
 class CreateStatus(CustomLoginRequiredMixin, SuccessMessageMixin, CreateView):
     model = StatusModel
@@ -38,6 +59,7 @@ class UpdateStatus(CustomLoginRequiredMixin, SuccessMessageMixin, UpdateView):
 
 class DeleteStatus(
     CustomLoginRequiredMixin,
+    ProtectedDeleteMixin,
     SuccessMessageMixin,
     DeleteView,
 ):
@@ -46,14 +68,14 @@ class DeleteStatus(
     success_url = reverse_lazy("all_statuses")
     template_name = "statuses/DeletePage.html"
     login_url = reverse_lazy("login")
+    protected_by = ((TaskModel, "status"),)
+    protected_message = _("Can't delete status because it's in use")
 
-    def post(self, request, *args, **kwargs):
-        if self.get_object().taskmodel_set.exists():
-            messages.add_message(
-                request,
-                messages.ERROR,
-                _("Can't delete status because it's in use"),
-            )
-            return redirect(self.success_url)
-        else:
-            return super(DeleteStatus, self).post(request, *args, **kwargs)
+
+class BulkDeleteStatuses(BulkDeleteView):
+    model = StatusModel
+    success_url = reverse_lazy("all_statuses")
+    login_url = reverse_lazy("login")
+    protected_by = ((TaskModel, "status"),)
+    deleted_message = _("Statuses deleted: %(count)d")
+    protected_message = _("Can't delete statuses because they're in use: %(names)s")
@@ -0,0 +1,357 @@
+import atexit
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+
+from task_manager.auth import records
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.models import TaskActivity, TaskModel
+from task_manager.utils import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger("task_manager.activity")
+# The request whose user made the changes being recorded.
+ACTOR = ContextVar("task_manager_activity_actor", default=None)
+BATCH_SIZE = 500
+# Sent with events=[TaskActivity] once they are in the database.
+events_saved = Signal()
+
+
+class ActivityMiddleware:
+    """Attributes the task changes made while handling a request to its user."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = ACTOR.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            ACTOR.reset(token)
+
+    async def __acall__(self, request):
+        # Sync views run under sync_to_async, which copies the context.
+        token = ACTOR.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            ACTOR.reset(token)
+
+
+def get_actor_id():
+    user = getattr(ACTOR.get(), "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def saved_state(task):
+    # Only what is loaded: reading a deferred field would cost a query.
+    return {
+        attname: task.__dict__[attname]
+        for attname in TaskModel.tracked_fields
+        if attname in task.__dict__
+    }
+
+
+def diff(old, new, created=False):
+    """{name: [old, new]} of the tracked fields that changed."""
+    changes = {}
+    for attname, name in TaskModel.tracked_fields.items():
+        if attname not in new or not (created or attname in old):
+            continue
+        if old.get(attname) != new[attname]:
+            changes[name] = [old.get(attname), new[attname]]
+    return changes
+
+
+def label_changes(added=(), removed=()):
+    return {"labels": {"added": sorted(added), "removed": sorted(removed)}}
+
+
+def merge_labels(first, second):
+    added = set(first["added"]) - set(second["removed"])
+    added |= set(second["added"]) - set(first["removed"])
+    removed = set(first["removed"]) - set(second["added"])
+    removed |= set(second["removed"]) - set(first["added"])
+    return label_changes(added, removed)["labels"]
+
+
+def merge(event, action, changes):
+    # Later changes of a task in the same transaction join its first event.
+    if action == TaskActivity.DELETED:
+        event.action = action
+    for name, change in changes.items():
+        if name not in event.changes:
+            event.changes[name] = change
+            continue
+        if name == "labels":
+            merged = merge_labels(event.changes[name], change)
+            changed = merged["added"] or merged["removed"]
+        else:
+            merged = [event.changes[name][0], change[1]]
+            changed = merged[0] != merged[1]
+        if changed:
+            event.changes[name] = merged
+        else:
+            del event.changes[name]
+
+
+class ActivityBuffer:
+    """Committed events shared by the threads of a worker process.
+
+    They are written once size of them are waiting or interval seconds after
+    the first one arrived, whichever comes first, and when the process exits.
+    Events still waiting are lost if the process is killed.
+    """
+
+    def __init__(self, size, interval):
+        self.size = size
+        self.interval = interval
+        self.events = []
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def add(self, events):
+        with self.lock:
+            self.events.extend(events)
+            full = len(self.events) >= self.size
+            if not full and self.timer is None:
+                self.timer = threading.Timer(self.interval, self.flush_on_timer)
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if events:
+            save(events)
+
+    def flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's own connections.
+            connections.close_all()
+
+
+BUFFER = ActivityBuffer(settings.ACTIVITY_BATCH_SIZE, settings.ACTIVITY_FLUSH_INTERVAL)
+atexit.register(BUFFER.flush)
+
+
+def save(events):
+    try:
+        TaskActivity.objects.bulk_create(events, batch_size=BATCH_SIZE)
+    except Exception:
+        logger.exception("Dropped %d task activity events", len(events))
+        return
+    events_saved.send(sender=TaskActivity, events=events)
+
+
+def write(events):
+    events = [
+        event
+        for event in events
+        if event.changes or event.action != TaskActivity.UPDATED
+    ]
+    if not events:
+        return
+    if settings.ACTIVITY_FLUSH == "timer":
+        BUFFER.add(events)
+    else:
+        save(events)
+
+
+class TransactionEvents:
+    """{task pk: event} of one transaction or savepoint, written by the single
+    on_commit hook registered when it was created.
+
+    Only the hook holds it; the connection keeps a weak reference keyed by
+    savepoint id. A rollback discards the hook, and the reference dies with it.
+    """
+
+    def __init__(self, registry, sid):
+        self.registry = registry
+        self.sid = sid
+        self.events = {}
+
+    def __call__(self):
+        self.registry.pop(self.sid, None)
+        write(self.events.values())
+
+
+def current_savepoint(connection):
+    # atomic(savepoint=False) adds None; its changes belong to the enclosing
+    # savepoint, or to the transaction itself.
+    return next((sid for sid in reversed(connection.savepoint_ids) if sid), None)
+
+
+def transaction_events(connection):
+    registry = connection.__dict__.setdefault("task_activity", {})
+    sid = current_savepoint(connection)
+    ref = registry.get(sid)
+    pending = ref() if ref is not None else None
+    if pending is None:
+        pending = TransactionEvents(registry, sid)
+        registry[sid] = weakref.ref(pending)
+        transaction.on_commit(pending, using=connection.alias)
+    return pending.events
+
+
+def record(task_id, action, changes, using):
+    event = TaskActivity(
+        task_id=task_id, actor_id=get_actor_id(), action=action, changes=changes
+    )
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        # Autocommit: the change is already committed.
+        write([event])
+        return
+    pending = transaction_events(connection)
+    if task_id in pending:
+        merge(pending[task_id], action, changes)
+    else:
+        pending[task_id] = event
+
+
+def log_saved_task(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    old = instance.__dict__.get("_loaded", {})
+    new = saved_state(instance)
+    action = TaskActivity.CREATED if created else TaskActivity.UPDATED
+    record(instance.pk, action, diff(old, new, created), using)
+    instance._loaded = {**old, **new}
+
+
+def log_deleted_task(sender, instance, using=None, **kwargs):
+    record(instance.pk, TaskActivity.DELETED, {}, using)
+
+
+def log_labels(sender, instance, action, reverse, pk_set, using=None, **kwargs):
+    if action == "post_add":
+        added, removed = pk_set, ()
+    elif action in ("post_remove", "post_clear"):
+        # Rows that really existed, read by count_labels before the removal.
+        added, removed = (), instance.__dict__.get("_removed_labels", ())
+    else:
+        return
+    if not reverse:
+        record(instance.pk, TaskActivity.UPDATED, label_changes(added, removed), using)
+        return
+    # From the label's side pk_set holds tasks; clearing a label's tasks
+    # (pk_set None) is not logged.
+    label = [instance.pk]
+    changes = label_changes(label if added else (), label if removed else ())
+    for task_pk in pk_set or ():
+        record(task_pk, TaskActivity.UPDATED, changes, using)
+
+
+def log_bulk_created(tasks, labels):
+    # labels: one list of label ids per task, as for bulk_create_tasks().
+    using = router.db_for_write(TaskModel)
+    for task, label_pks in zip(tasks, labels):
+        state = saved_state(task)
+        changes = {**diff({}, state, created=True), **label_changes(label_pks)}
+        if not label_pks:
+            del changes["labels"]
+        record(task.pk, TaskActivity.CREATED, changes, using)
+        task._loaded = state
+
+
+def log_bulk_updated(tasks, labels):
+    # Runs before the label rows are replaced; labels as for bulk_update_tasks().
+    using = router.db_for_write(TaskModel)
+    current = defaultdict(set)
+    rows = TaskModel.labels.through.objects.filter(taskmodel_id__in=labels)
+    for task_pk, label_pk in rows.values_list("taskmodel_id", "labelmodel_id"):
+        current[task_pk].add(label_pk)
+    for task in tasks:
+        old = task.__dict__.get("_loaded", {})
+        new = saved_state(task)
+        changes = diff(old, new)
+        if task.pk in labels:
+            wanted = set(labels[task.pk])
+            changes.update(
+                label_changes(wanted - current[task.pk], current[task.pk] - wanted)
+            )
+        record(task.pk, TaskActivity.UPDATED, changes, using)
+        task._loaded = {**old, **new}
+
+
+def log_bulk_deleted(task_ids):
+    using = router.db_for_write(TaskModel)
+    for task_pk in task_ids:
+        record(task_pk, TaskActivity.DELETED, {}, using)
+
+
+def referenced_ids(events):
+    ids = defaultdict(set)
+    for event in events:
+        for field, change in event.changes.items():
+            values = change["added"] + change["removed"] if field == "labels" else change
+            ids[field].update(value for value in values if value is not None)
+    return ids
+
+
+def display_names(events):
+    """{field: {id: name}} for the statuses, labels and users events refer
+    to, in three queries at most."""
+    ids = referenced_ids(events)
+    users = records.get_many([*ids["executor"], *(e.actor_id for e in events)])
+    return {
+        "status": StatusModel.objects.in_bulk(ids["status"]),
+        "labels": LabelModel.objects.in_bulk(ids["labels"]),
+        "executor": {pk: record.full_name for pk, record in users.items()},
+    }
+
+
+def describe(events):
+    """Adds (field, old, new) display lines to events."""
+    names = display_names(events)
+
+    def show(field, value):
+        if value is None or field not in names:
+            return value or ""
+        return str(names[field].get(value, f"#{value}"))
+
+    for event in events:
+        event.lines = []
+        for field, change in event.changes.items():
+            if field == "labels":
+                old, new = (
+                    ", ".join(show(field, value) for value in change[key])
+                    for key in ("removed", "added")
+                )
+            else:
+                old, new = (show(field, value) for value in change)
+            verbose_name = TaskModel._meta.get_field(field).verbose_name
+            event.lines.append((verbose_name, old, new))
+    return events
+
+
+def timeline(task_id, limit=None):
+    """The latest events of a task, newest first, read through the
+    (task, timestamp) index."""
+    events = TaskActivity.objects.filter(task_id=task_id).order_by("-timestamp")
+    return describe(list(events[: limit or settings.ACTIVITY_TIMELINE_SIZE]))
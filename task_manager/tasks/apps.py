@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class TasksConfig(AppConfig):
+    name = "task_manager.tasks"
+
+    def ready(self):
+        from task_manager.tasks import signals  # noqa: F401
@@ -0,0 +1,109 @@
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from task_manager.tasks import activity, counters, search
+from task_manager.tasks.cache import TASK_LIST, bump_version
+from task_manager.tasks.models import TaskModel, VersionConflict
+
+BATCH_SIZE = 500
+
+
+def label_rows(labels):
+    through = TaskModel.labels.through
+    return [
+        through(taskmodel_id=task_pk, labelmodel_id=label_pk)
+        for task_pk, label_pks in labels.items()
+        for label_pk in label_pks
+    ]
+
+
+def bulk_create_tasks(tasks, labels, batch_size=BATCH_SIZE):
+    # labels: one list of label ids per task, in the same order as tasks.
+    # Importers call this in their own transaction, where a savepoint would
+    # only cost two more queries per batch.
+    with transaction.atomic(savepoint=False):
+        created = TaskModel.objects.bulk_create(tasks, batch_size=batch_size)
+        rows = label_rows({task.pk: pks for task, pks in zip(created, labels)})
+        TaskModel.labels.through.objects.bulk_create(rows, batch_size=batch_size)
+        # bulk_create sends no signals, so the counters are updated here.
+        deltas = counters.task_deltas(
+            (task.status_id, task.executor_id) for task in created
+        )
+        deltas.update(counters.label_deltas(row.labelmodel_id for row in rows))
+        counters.apply(deltas)
+        search.get_backend().index((task.pk for task in created), new=True)
+        activity.log_bulk_created(created, labels)
+    bump_version(TASK_LIST)
+    return created
+
+
+def stale_tasks(tasks):
+    current = dict(
+        TaskModel.objects.filter(pk__in=[task.pk for task in tasks]).values_list(
+            "pk", "version"
+        )
+    )
+    return [task.pk for task in tasks if current.get(task.pk) != task.version]
+
+
+def save_updates(tasks, fields, labels, batch_size):
+    through = TaskModel.labels.through
+    counted = labels or {"status", "executor"} & set(fields)
+    ids = [task.pk for task in tasks]
+    before = counters.snapshot(ids) if counted else None
+    activity.log_bulk_updated(tasks, labels)
+    TaskModel.objects.bulk_update(tasks, [*fields, "modified_at"], batch_size=batch_size)
+    if labels:
+        through.objects.filter(taskmodel_id__in=labels).delete()
+        through.objects.bulk_create(label_rows(labels), batch_size=batch_size)
+    if counted:
+        deltas = counters.snapshot(ids)
+        deltas.subtract(before)
+        counters.apply(deltas)
+    if {"name", "description"} & set(fields):
+        search.get_backend().index(ids)
+
+
+def bulk_update_tasks(tasks, fields, labels, batch_size=BATCH_SIZE):
+    # labels: {task pk: label ids} for the tasks whose labels are replaced.
+    # Raises VersionConflict, and changes nothing, if any task's version is
+    # no longer current.
+    now = timezone.now()
+    for task in tasks:
+        task.modified_at = now
+    try:
+        with transaction.atomic():
+            TaskModel.objects.claim_versions(tasks, batch_size)
+            save_updates(tasks, fields, labels, batch_size)
+    except VersionConflict:
+        # Rolled back by now, so the versions read are the saved ones.
+        raise VersionConflict(stale_tasks(tasks))
+    bump_version(TASK_LIST)
+    return tasks
+
+
+def delete_dependents(ids):
+    # What the deletion collector would cascade to, one DELETE per table:
+    # the label rows and any CASCADE foreign key from another app.
+    for rel in TaskModel._meta.get_fields(include_hidden=True):
+        if rel.one_to_many and rel.auto_created and rel.on_delete is models.CASCADE:
+            rel.related_model._base_manager.filter(
+                **{f"{rel.field.name}__in": ids}
+            ).delete()
+
+
+def bulk_delete_tasks(ids):
+    # QuerySet.delete() loads every task and sends pre/post_delete for each
+    # one, so the per-row signal handlers' work is done here once instead.
+    ids = list(ids)
+    with transaction.atomic():
+        before = counters.snapshot(ids)
+        activity.log_bulk_deleted(ids)
+        delete_dependents(ids)
+        deleted = TaskModel.objects.filter(pk__in=ids)._raw_delete(
+            router.db_for_write(TaskModel)
+        )
+        counters.apply({key: -delta for key, delta in before.items()})
+        search.get_backend().remove(ids)
+    bump_version(TASK_LIST)
+    return deleted
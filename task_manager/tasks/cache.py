@@ -0,0 +1,72 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+
+TASK_LIST = "tasks"
+USERS = "users"
+# Names that rendered fragments show: statuses, labels and users.
+CHOICES = "choices"
+
+
+def get_cache():
+    return caches[settings.TASK_LIST_CACHE_ALIAS]
+
+
+def version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_version(namespace):
+    cache = get_cache()
+    version = cache.get(version_key(namespace))
+    if version is None:
+        # Start from the clock rather than 1 so an evicted counter can never
+        # bring back fragments stored under an old version.
+        cache.add(version_key(namespace), time.time_ns(), None)
+        version = cache.get(version_key(namespace))
+    return version
+
+
+def bump_version(namespace):
+    cache = get_cache()
+    try:
+        cache.incr(version_key(namespace))
+    except ValueError:
+        cache.add(version_key(namespace), time.time_ns(), None)
+
+
+def normalise_params(params):
+    """Query string of {name: [values]} that ignores order and empty values."""
+    normalised = sorted(
+        (name, sorted(value for value in values if value))
+        for name, values in params.items()
+    )
+    return urlencode([item for item in normalised if item[1]], doseq=True)
+
+
+def task_list_key(user_pk, language, params, stamp=()):
+    # stamp: what the database the table is read from has seen, see
+    # ShowAllTasks.get_list_stamp().
+    parts = [normalise_params(params), *map(str, stamp)]
+    digest = hashlib.md5(":".join(parts).encode()).hexdigest()
+    return f"tasks:list:{get_version(TASK_LIST)}:{user_pk}:{language}:{digest}"
+
+
+def fragment_key(name, parts):
+    digest = hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+    return f"fragments:{name}:{digest}"
+
+
+def get_or_render(key, render, timeout=None):
+    cache = get_cache()
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = render()
+        if timeout is None:
+            timeout = settings.TASK_LIST_CACHE_TIMEOUT
+        cache.set(key, fragment, timeout)
+    return mark_safe(fragment)
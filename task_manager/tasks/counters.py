@@ -0,0 +1,132 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from task_manager.auth.models import UserStr
+from task_manager.db.routers import REPLICA
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.cache import TASK_LIST, bump_version, get_cache, get_version
+from task_manager.tasks.models import TaskCounter, TaskModel
+
+STATUS = TaskCounter.STATUS
+EXECUTOR = TaskCounter.EXECUTOR
+LABEL = TaskCounter.LABEL
+SOURCES = {STATUS: StatusModel, EXECUTOR: UserStr, LABEL: LabelModel}
+
+
+def task_deltas(rows, sign=1):
+    # rows: (status_id, executor_id) pairs.
+    deltas = Counter()
+    for status_id, executor_id in rows:
+        deltas[STATUS, status_id] += sign
+        deltas[EXECUTOR, executor_id] += sign
+    return deltas
+
+
+def label_deltas(label_ids, sign=1):
+    deltas = Counter()
+    for label_id in label_ids:
+        deltas[LABEL, label_id] += sign
+    return deltas
+
+
+def snapshot(task_ids):
+    # What the given tasks currently contribute to the counters.
+    rows = TaskModel.objects.filter(pk__in=task_ids).values_list(
+        "status_id", "executor_id"
+    )
+    labels = TaskModel.labels.through.objects.filter(
+        taskmodel_id__in=task_ids
+    ).values_list("labelmodel_id", flat=True)
+    deltas = task_deltas(rows)
+    deltas.update(label_deltas(labels))
+    return deltas
+
+
+def apply(deltas):
+    # Two queries whatever the number of counters: insert the missing rows,
+    # then one UPDATE ... SET count = count + CASE ... END.
+    changes = {key: delta for key, delta in deltas.items() if delta}
+    if not changes:
+        return
+    condition = Q()
+    increments = []
+    for (kind, pk), delta in changes.items():
+        condition |= Q(kind=kind, object_id=pk)
+        increments.append(When(kind=kind, object_id=pk, then=Value(delta)))
+    # Callers are usually in a transaction already; a savepoint would cost
+    # two more queries.
+    with transaction.atomic(savepoint=False):
+        TaskCounter.objects.bulk_create(
+            [TaskCounter(kind=kind, object_id=pk) for kind, pk in changes],
+            ignore_conflicts=True,
+        )
+        TaskCounter.objects.filter(condition).update(
+            count=F("count") + Case(*increments, default=Value(0))
+        )
+
+
+def rebuild():
+    through = TaskModel.labels.through.objects
+    groups = (
+        (STATUS, TaskModel.objects, "status_id"),
+        (EXECUTOR, TaskModel.objects, "executor_id"),
+        (LABEL, through, "labelmodel_id"),
+    )
+    counters = [
+        TaskCounter(kind=kind, object_id=pk, count=count)
+        for kind, manager, field in groups
+        for pk, count in manager.values_list(field).annotate(Count("pk")).order_by()
+    ]
+    with transaction.atomic():
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create(counters)
+    bump_version(TASK_LIST)
+    return counters
+
+
+def summary():
+    # Counts come from the counter table only; names are looked up in the
+    # (small) status, user and label tables.
+    counters = {kind: {} for kind in SOURCES}
+    for kind, pk, count in TaskCounter.objects.filter(count__gt=0).values_list(
+        "kind", "object_id", "count"
+    ):
+        counters[kind][pk] = count
+    result = {}
+    for kind, counts in counters.items():
+        objects = SOURCES[kind].objects.in_bulk(list(counts))
+        result[kind] = sorted(
+            ((objects[pk], count) for pk, count in counts.items() if pk in objects),
+            key=lambda item: (-item[1], str(item[0])),
+        )
+    return result
+
+
+def cached_summary():
+    # Every change to tasks, statuses, labels or users bumps the TASK_LIST
+    # version. A summary read from a replica may be behind the primary, so it
+    # is not stored.
+    if REPLICA.get() is not None:
+        return summary()
+    cache = get_cache()
+    key = f"tasks:counters:{get_version(TASK_LIST)}"
+    result = cache.get(key)
+    if result is None:
+        result = summary()
+        cache.set(key, result, settings.TASK_LIST_CACHE_TIMEOUT)
+    return result
+
+
+class TaskCountersMixin:
+    def get_task_counters(self):
+        counters = cached_summary()
+        return [(title, counters[kind]) for kind, title in TaskCounter.KINDS]
+
+    def get_context_data(self, **kwargs):
+        if self.request.user.is_authenticated:
+            kwargs.setdefault("task_counters", self.get_task_counters())
+        return super().get_context_data(**kwargs)
@@ -0,0 +1,77 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from task_manager.tasks.models import TaskModel
+
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "author",
+    "executor",
+    "created_at",
+)
+HEADER = (*COLUMNS, "labels")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def labels_for(task_ids):
+    labels = defaultdict(list)
+    rows = TaskModel.labels.through.objects.filter(taskmodel_id__in=task_ids)
+    for task_id, name in rows.values_list("taskmodel_id", "labelmodel__name"):
+        labels[task_id].append(name)
+    return labels
+
+
+def task_rows(queryset, chunk_size=2000):
+    # A server-side cursor on Postgres (a chunked fetch on SQLite) streams the
+    # tasks; labels are fetched with one query per chunk.
+    rows = (
+        queryset.order_by("id")
+        .values_list(
+            "id",
+            "name",
+            "description",
+            "status__name",
+            "author__username",
+            "executor__username",
+            "created_at",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        labels = labels_for([row[0] for row in chunk])
+        for row in chunk:
+            yield (*row, sorted(labels.get(row[0], ())))
+
+
+def as_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow((*row[:-1], ";".join(row[-1])))
+
+
+def as_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+RENDERERS = {"csv": as_csv, "ndjson": as_ndjson}
+
+
+def export(queryset, fmt="csv", chunk_size=2000):
+    return RENDERERS[fmt](task_rows(queryset, chunk_size))
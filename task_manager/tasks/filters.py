@@ -6,26 +6,37 @@ from task_manager.labels.models import LabelModel
 from task_manager.statuses.models import StatusModel
 from task_manager.auth.models import UserStr
 from task_manager.tasks.forms import TaskModel
+from task_manager.tasks import search as task_search
+from task_manager.widgets import AutocompleteSelect
 
 
 class TaskFilter(django_filters.FilterSet):
+    search = django_filters.CharFilter(
+        method="search_tasks",
+        label=_("Search"),
+        widget=forms.TextInput(attrs={"class": "form-control mr-3 ml-2"}),
+    )
     label = django_filters.ModelChoiceFilter(
         field_name="labels",
         queryset=LabelModel.objects.all(),
         label=_("Label"),
-        widget=forms.Select(attrs={"class": "form-control mr-3 ml-2"}),
+        widget=AutocompleteSelect("labels", attrs={"class": "form-control mr-3 ml-2"}),
     )
     status = django_filters.ModelChoiceFilter(
         field_name="status",
         queryset=StatusModel.objects.all(),
         label=_("Status"),
-        widget=forms.Select(attrs={"class": "form-control mr-3 ml-2"}),
+        widget=AutocompleteSelect(
+            "statuses", attrs={"class": "form-control mr-3 ml-2"}
+        ),
     )
     executor = django_filters.ModelChoiceFilter(
         field_name="executor",
         queryset=UserStr.objects.all(),
         label=_("Executor"),
-        widget=forms.Select(attrs={"class": "form-control mr-3 ml-2"}),
+        widget=AutocompleteSelect(
+            "users", attrs={"class": "form-control mr-3 ml-2"}
+        ),
     )
 
     self_task = django_filters.BooleanFilter(
@@ -38,6 +49,9 @@ class TaskFilter(django_filters.FilterSet):
         model = TaskModel
         fields = ()
 
+    def search_tasks(self, queryset, name, value):
+        return task_search.search(queryset, value)
+
     def show_self_task(self, queryset, name, value):
         if value is True:
             return queryset.filter(author_id=self.request.user.pk)
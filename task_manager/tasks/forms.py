@@ -2,6 +2,8 @@ from django import forms
 from task_manager.tasks.models import TaskModel
 from django.utils.translation import gettext_lazy as _
 
+from task_manager.widgets import AutocompleteSelect, AutocompleteSelectMultiple
+
 
 class TaskForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
@@ -9,18 +11,55 @@ class TaskForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields["status"].empty_label = _("Status not selected")
         self.fields["executor"].empty_label = _("Executor not selected")
+        # The version an update was started from, see TaskModel.save_versioned().
+        if self.instance._state.adding:
+            del self.fields["version"]
+        else:
+            self.fields["version"].required = False
+
+    def clean_version(self):
+        # A form posted without it updates whatever version is current.
+        return self.cleaned_data["version"] or self.instance.version
+
+    def save(self, commit=True):
+        task = super().save(commit=False)
+        if commit:
+            task.save_versioned()
+            self.save_m2m()
+        return task
 
     def __str__(self):
         return self.name
 
+    def display(self, name, value):
+        if name == "labels":
+            return ", ".join(sorted(str(label) for label in value))
+        return "" if value is None else str(value)
+
+    def conflicts(self, current):
+        """(label, saved value, submitted value) of the fields that differ."""
+        rows = []
+        for name, field in self.fields.items():
+            if name == "version":
+                continue
+            saved = current.labels.all() if name == "labels" else getattr(current, name)
+            saved = self.display(name, saved)
+            submitted = self.display(name, self.cleaned_data.get(name))
+            if saved != submitted:
+                rows.append((field.label, saved, submitted))
+        return rows
+
     class Meta:
         model = TaskModel
-        fields = ("name", "description", "status", "executor", "labels")
+        fields = ("name", "description", "status", "executor", "labels", "version")
         widgets = {
+            "version": forms.HiddenInput(),
             "author": forms.HiddenInput(attrs={"class": "form-control"}),
             "name": forms.TextInput(attrs={"class": "form-control"}),
             "description": forms.Textarea(attrs={"class": "form-control"}),
-            "status": forms.Select(attrs={"class": "form-control"}),
-            "executor": forms.Select(attrs={"class": "form-control"}),
-            "labels": forms.SelectMultiple(attrs={"class": "form-control"}),
+            "status": AutocompleteSelect("statuses", attrs={"class": "form-control"}),
+            "executor": AutocompleteSelect("users", attrs={"class": "form-control"}),
+            "labels": AutocompleteSelectMultiple(
+                "labels", attrs={"class": "form-control"}
+            ),
         }
@@ -0,0 +1,145 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.bulk import BATCH_SIZE, bulk_create_tasks
+from task_manager.tasks.models import TaskModel
+
+TEXT_FIELDS = ("name", "description")
+
+
+# Readers yield (file line number, row) pairs.
+
+
+def read_csv(stream):
+    # Same layout as export_tasks: labels are joined with ";". line_num counts
+    # the header, blank lines and newlines inside quoted values.
+    reader = csv.DictReader(stream)
+    for row in reader:
+        labels = row.get("labels") or ""
+        row["labels"] = [name for name in labels.split(";") if name]
+        yield reader.line_num, row
+
+
+def read_ndjson(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            # Reported against its line number like any other invalid row.
+            yield number, error
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def clean_field(model, field, value, label):
+    try:
+        return model._meta.get_field(field).clean(value, None)
+    except ValidationError as error:
+        raise ValueError(f"{label}: {' '.join(error.messages)}")
+
+
+class TaskImporter:
+    def __init__(self, default_author=None, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        # name -> id lookup tables, loaded once and extended as rows arrive.
+        self.users = dict(User.objects.values_list("username", "id"))
+        self.statuses = dict(StatusModel.objects.values_list("name", "id"))
+        self.labels = dict(LabelModel.objects.values_list("name", "id"))
+        self.default_author = default_author
+        self.created = {"tasks": 0, "statuses": 0, "labels": 0}
+        self.skipped = []
+
+    def user_id(self, row, field):
+        username = row.get(field) or (self.default_author if field == "author" else None)
+        if not username:
+            raise ValueError(f"{field}: this field is required")
+        if username not in self.users:
+            raise ValueError(f"{field}: unknown user {username!r}")
+        return self.users[username]
+
+    def parse(self, row):
+        if isinstance(row, ValueError):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError("expected an object")
+        values = {
+            field: clean_field(TaskModel, field, row.get(field) or None, field)
+            for field in TEXT_FIELDS
+        }
+        values["author_id"] = self.user_id(row, "author")
+        values["executor_id"] = self.user_id(row, "executor")
+        status = clean_field(StatusModel, "name", row.get("status"), "status")
+        labels = row.get("labels") or []
+        if not isinstance(labels, list):
+            raise ValueError("labels: expected a list")
+        labels = list(
+            dict.fromkeys(
+                clean_field(LabelModel, "name", name, "labels") for name in labels
+            )
+        )
+        return values, status, labels
+
+    def ensure(self, model, lookup, names, counter):
+        missing = set(names) - lookup.keys()
+        if not missing:
+            return
+        # Names another import created since the lookup tables were loaded
+        # are not counted as created here.
+        lookup.update(model.objects.filter(name__in=missing).values_list("name", "id"))
+        missing -= lookup.keys()
+        if not missing:
+            return
+        model.objects.bulk_create(
+            [model(name=name) for name in missing], ignore_conflicts=True
+        )
+        # ignore_conflicts does not return ids.
+        lookup.update(model.objects.filter(name__in=missing).values_list("name", "id"))
+        self.created[counter] += len(missing)
+
+    def import_batch(self, batch):
+        parsed = []
+        for line, row in batch:
+            try:
+                parsed.append(self.parse(row))
+            except ValueError as error:
+                self.skipped.append((line, str(error)))
+        if not parsed:
+            return
+        with transaction.atomic():
+            self.ensure(
+                StatusModel,
+                self.statuses,
+                {status for _, status, _ in parsed},
+                "statuses",
+            )
+            self.ensure(
+                LabelModel,
+                self.labels,
+                {name for _, _, labels in parsed for name in labels},
+                "labels",
+            )
+            tasks = [
+                TaskModel(status_id=self.statuses[status], **values)
+                for values, status, _ in parsed
+            ]
+            labels = [[self.labels[name] for name in names] for _, _, names in parsed]
+            bulk_create_tasks(tasks, labels, self.batch_size)
+        self.created["tasks"] += len(tasks)
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return self.created
+            self.import_batch(batch)
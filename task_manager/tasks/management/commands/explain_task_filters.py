@@ -0,0 +1,84 @@
+import re
+from itertools import combinations
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import TaskModel
+
+TASK_TABLE = TaskModel._meta.db_table
+INDEX_NAME = re.compile(
+    r"(?:USING (?:COVERING )?INDEX|Index (?:Only )?Scan using|Bitmap Index Scan on) (\w+)"
+)
+
+
+def table_lines(plan):
+    pattern = re.compile(rf"\b{TASK_TABLE}\b(?!_)")
+    return [line for line in plan.splitlines() if pattern.search(line)]
+
+
+def uses_index(plan):
+    # SQLite: "SCAN tasks_taskmodel" is a full scan, "SEARCH/SCAN ... USING
+    # INDEX" is not. Postgres: anything but "Seq Scan on tasks_taskmodel".
+    lines = table_lines(plan)
+    if any("Seq Scan" in line for line in lines):
+        return False
+    return all("USING" in line or "Index" in line for line in lines if "SCAN" in line)
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN for every TaskFilter combination and report index usage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail if any combination is planned without an index.",
+        )
+        parser.add_argument("--verbose-plan", action="store_true")
+
+    def sample_data(self):
+        status = StatusModel.objects.order_by("pk").first()
+        label = LabelModel.objects.order_by("pk").first()
+        user = User.objects.order_by("pk").first()
+        if not (status and label and user):
+            raise CommandError("At least one status, label and user are required.")
+        data = {
+            "status": status.pk,
+            "label": label.pk,
+            "executor": user.pk,
+            "self_task": True,
+        }
+        return data, SimpleNamespace(user=user)
+
+    def explain(self, names, data, request):
+        filterset = TaskFilter(
+            {name: data[name] for name in names},
+            queryset=TaskModel.objects.for_list(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filter data: {filterset.errors.as_text()}")
+        return filterset.qs.order_by("created_at", "id")[:20].explain()
+
+    def handle(self, *args, **options):
+        data, request = self.sample_data()
+        missing = []
+        for size in range(len(data) + 1):
+            for names in combinations(data, size):
+                plan = self.explain(names, data, request)
+                title = "+".join(names) or "no filters"
+                indexes = ", ".join(sorted(set(INDEX_NAME.findall(plan))))
+                if uses_index(plan):
+                    self.stdout.write(f"{title}: index ({indexes or 'primary key'})")
+                else:
+                    missing.append(title)
+                    self.stdout.write(self.style.WARNING(f"{title}: full table scan"))
+                if options["verbose_plan"]:
+                    self.stdout.write(plan)
+        if missing and options["strict"]:
+            raise CommandError(f"No index used for: {', '.join(missing)}")
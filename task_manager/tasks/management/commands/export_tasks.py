@@ -0,0 +1,73 @@
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.tasks.export import RENDERERS, export
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import TaskModel
+
+
+class Command(BaseCommand):
+    help = "Stream tasks matching TaskFilter parameters as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(RENDERERS), default="csv")
+        parser.add_argument("--output", help="File to write, stdout by default.")
+        parser.add_argument("--status", type=int)
+        parser.add_argument("--executor", type=int)
+        parser.add_argument("--label", type=int)
+        parser.add_argument("--author", type=int, help="Only tasks of this user.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Report rows/sec and peak Python memory on stderr.",
+        )
+
+    def get_queryset(self, options):
+        data = {
+            name: options[name]
+            for name in ("status", "executor", "label")
+            if options[name] is not None
+        }
+        user = None
+        if options["author"] is not None:
+            data["self_task"] = True
+            user = User(pk=options["author"])
+        filterset = TaskFilter(
+            data, queryset=TaskModel.objects.all(), request=SimpleNamespace(user=user)
+        )
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+        return filterset.qs
+
+    def write(self, stream, chunks):
+        rows = 0
+        for chunk in chunks:
+            stream.write(chunk)
+            rows += 1
+        return rows
+
+    def handle(self, *args, **options):
+        chunks = export(self.get_queryset(options), options["format"], options["chunk_size"])
+        if options["benchmark"]:
+            tracemalloc.start()
+        started = time.perf_counter()
+        if options["output"]:
+            with open(options["output"], "w", newline="") as stream:
+                rows = self.write(stream, chunks)
+        else:
+            rows = self.write(self.stdout, chunks)
+        if options["benchmark"]:
+            self.report(rows - (options["format"] == "csv"), time.perf_counter() - started)
+
+    def report(self, rows, elapsed):
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stderr.write(
+            f"{rows} rows in {elapsed:.2f}s, {rows / max(elapsed, 1e-9):.0f} rows/sec, "
+            f"peak memory {peak / 1024 / 1024:.1f} MiB"
+        )
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.tasks.bulk import BATCH_SIZE
+from task_manager.tasks.importer import READERS, TaskImporter
+
+
+class Command(BaseCommand):
+    help = "Bulk import tasks from CSV or NDJSON, creating missing statuses and labels"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format, guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--author", help="Username used for rows without an author."
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def get_format(self, options):
+        if options["format"]:
+            return options["format"]
+        extension = os.path.splitext(options["path"])[1].lstrip(".").lower()
+        if extension not in READERS:
+            raise CommandError("Cannot guess the input format, pass --format.")
+        return extension
+
+    def handle(self, *args, **options):
+        reader = READERS[self.get_format(options)]
+        importer = TaskImporter(options["author"], options["batch_size"])
+        started = time.perf_counter()
+        if options["path"] == "-":
+            created = importer.run(reader(sys.stdin))
+        else:
+            with open(options["path"], newline="") as stream:
+                created = importer.run(reader(stream))
+        elapsed = time.perf_counter() - started
+        for line, error in importer.skipped:
+            self.stderr.write(f"line {line}: {error}")
+        self.stdout.write(
+            f"{created['tasks']} tasks imported in {elapsed:.2f}s "
+            f"({created['tasks'] / max(elapsed, 1e-9):.0f} rows/sec), "
+            f"{created['statuses']} statuses and {created['labels']} labels created, "
+            f"{len(importer.skipped)} rows skipped"
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.tasks import counters
+from task_manager.tasks.models import TaskCounter
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-status, per-executor and per-label task counters"
+
+    def handle(self, *args, **options):
+        stale = {
+            (kind, pk): count
+            for kind, pk, count in TaskCounter.objects.values_list(
+                "kind", "object_id", "count"
+            )
+            if count
+        }
+        rebuilt = {
+            (counter.kind, counter.object_id): counter.count
+            for counter in counters.rebuild()
+        }
+        drifted = {
+            key
+            for key in stale.keys() | rebuilt.keys()
+            if stale.get(key) != rebuilt.get(key)
+        }
+        for kind, pk in sorted(drifted):
+            self.stdout.write(
+                f"{kind} {pk}: {stale.get((kind, pk), 0)} -> {rebuilt.get((kind, pk), 0)}"
+            )
+        self.stdout.write(f"{len(rebuilt)} counters rebuilt, {len(drifted)} corrected")
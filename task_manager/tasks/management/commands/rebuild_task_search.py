@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from task_manager.tasks.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of task names and descriptions"
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with transaction.atomic():
+            indexed = backend.rebuild()
+        self.stdout.write(
+            f"{indexed} tasks indexed with {type(backend).__name__} ({connection.vendor})"
+        )
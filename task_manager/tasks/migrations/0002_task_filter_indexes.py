@@ -0,0 +1,46 @@
+# Generated by Django 4.1.1 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskmodel",
+            index=models.Index(fields=["created_at", "id"], name="tasks_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="taskmodel",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="tasks_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskmodel",
+            index=models.Index(
+                fields=["executor", "created_at", "id"],
+                name="tasks_executor_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskmodel",
+            index=models.Index(
+                fields=["author", "created_at", "id"], name="tasks_author_created_idx"
+            ),
+        ),
+        # The auto-created labels through table only has a unique
+        # (taskmodel_id, labelmodel_id) index; filtering by label needs the
+        # reverse order.
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX tasks_labels_label_task_idx "
+                "ON tasks_taskmodel_labels (labelmodel_id, taskmodel_id)"
+            ),
+            reverse_sql="DROP INDEX tasks_labels_label_task_idx",
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.1 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmodel",
+            name="modified_at",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Modification date"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.1.1 on 2026-10-18 20:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    TaskModel = apps.get_model("tasks", "TaskModel")
+    TaskCounter = apps.get_model("tasks", "TaskCounter")
+    db = schema_editor.connection.alias
+    groups = (
+        ("status", TaskModel.objects.using(db), "status_id"),
+        ("executor", TaskModel.objects.using(db), "executor_id"),
+        ("label", TaskModel.labels.through.objects.using(db), "labelmodel_id"),
+    )
+    TaskCounter.objects.using(db).bulk_create(
+        TaskCounter(kind=kind, object_id=pk, count=count)
+        for kind, manager, field in groups
+        for pk, count in manager.values_list(field).annotate(Count("pk")).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_modified_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("status", "Status"),
+                            ("executor", "Executor"),
+                            ("label", "Label"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("object_id", models.IntegerField()),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="taskcounter",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "object_id"), name="tasks_counter_kind_object_uniq"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
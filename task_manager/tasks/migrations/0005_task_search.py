@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Created outside of the ORM: the index is an FTS5 virtual table on SQLite and
+# a tsvector table with a GIN index on Postgres (see task_manager.tasks.search).
+CREATE = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE tasks_search USING fts5("
+        "name, description, tokenize = 'unicode61 remove_diacritics 2')",
+        "INSERT INTO tasks_search (rowid, name, description) "
+        "SELECT id, name, coalesce(description, '') FROM tasks_taskmodel",
+    ],
+    "postgresql": [
+        "CREATE TABLE tasks_search ("
+        "task_id bigint PRIMARY KEY REFERENCES tasks_taskmodel (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX tasks_search_document_idx ON tasks_search USING GIN (document)",
+        "INSERT INTO tasks_search (task_id, document) "
+        "SELECT id, setweight(to_tsvector('simple', name), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B') "
+        "FROM tasks_taskmodel",
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in CREATE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        schema_editor.execute("DROP TABLE tasks_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmodel",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
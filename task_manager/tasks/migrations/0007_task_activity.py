@@ -0,0 +1,71 @@
+# Generated by Django 4.1.1 on 2026-10-18 21:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_manager", "0002_cacheduser"),
+        ("tasks", "0006_task_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("changes", models.JSONField(default=dict)),
+                (
+                    "timestamp",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="task_manager.userstr",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="activity",
+                        to="tasks.taskmodel",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="taskactivity",
+            index=models.Index(
+                fields=["task", "timestamp"], name="tasks_activity_task_idx"
+            ),
+        ),
+    ]
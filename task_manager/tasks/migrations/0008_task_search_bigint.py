@@ -0,0 +1,21 @@
+from django.db import migrations
+
+# 0005 created tasks_search.task_id as integer on Postgres, while task ids are
+# bigint (BigAutoField); a no-op where 0005 already created it as bigint.
+WIDEN = "ALTER TABLE tasks_search ALTER COLUMN task_id TYPE bigint"
+
+
+def widen_task_id(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(WIDEN)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_task_activity"),
+    ]
+
+    operations = [
+        migrations.RunPython(widen_task_id, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,65 @@
-from django.db import models
+import operator
+from functools import reduce
+
+from django.db import DatabaseError, models
+from django.db.models import F, Q
+from django.utils import timezone
 from task_manager.statuses.models import StatusModel
 from task_manager.auth.models import UserStr
 from task_manager.labels.models import LabelModel
 from django.utils.translation import gettext_lazy as _
 
 
+class VersionConflict(DatabaseError):
+    """Tasks that were saved by someone else since they were loaded."""
+
+    def __init__(self, ids):
+        super().__init__(f"Tasks changed concurrently: {', '.join(map(str, ids))}")
+        self.ids = ids
+
+
+class TaskQuerySet(models.QuerySet):
+    # Author and executor names are rendered from the cached user records
+    # (task_manager/auth/records.py), so only their ids are loaded.
+    list_fields = (
+        "id",
+        "name",
+        "created_at",
+        "modified_at",
+        "status",
+        "status__name",
+        "author",
+        "executor",
+    )
+
+    def for_list(self):
+        return self.select_related("status").only(*self.list_fields)
+
+    def for_detail(self):
+        return self.select_related("status").prefetch_related("labels")
+
+    def for_update(self):
+        return self.prefetch_related("labels")
+
+    def for_delete(self):
+        return self.only("id", "name", "author_id")
+
+    def claim_versions(self, tasks, batch_size):
+        # Moves every task on by one version, provided none was saved since its
+        # version was read (see TaskModel.save_versioned()); must run in a
+        # transaction.
+        for start in range(0, len(tasks), batch_size):
+            batch = tasks[start:start + batch_size]
+            expected = reduce(
+                operator.or_, (Q(pk=task.pk, version=task.version) for task in batch)
+            )
+            claimed = self.filter(expected).update(version=F("version") + 1)
+            if claimed != len(batch):
+                raise VersionConflict([task.pk for task in batch])
+        for task in tasks:
+            task.version += 1
+
+
 class TaskModel(models.Model):
     name = models.CharField(max_length=50, verbose_name=_("Name"))
     description = models.CharField(
@@ -26,7 +81,155 @@ class TaskModel(models.Model):
         verbose_name=_("Executor"),
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Modification date")
+    )
     labels = models.ManyToManyField(LabelModel, blank=True, verbose_name=_("Labels"))
+    # Incremented by versioned updates, see save_versioned().
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TaskQuerySet.as_manager()
+
+    # attname -> name of the fields whose changes go to the activity log.
+    tracked_fields = {
+        "name": "name",
+        "description": "description",
+        "status_id": "status",
+        "executor_id": "executor",
+    }
+
+    class Meta:
+        # Matches TaskFilter lookups combined with the (created_at, id) keyset
+        # ordering of the task list.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="tasks_created_idx"),
+            models.Index(
+                fields=["status", "created_at", "id"], name="tasks_status_created_idx"
+            ),
+            models.Index(
+                fields=["executor", "created_at", "id"],
+                name="tasks_executor_created_idx",
+            ),
+            models.Index(
+                fields=["author", "created_at", "id"], name="tasks_author_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The saved state task_manager.tasks.activity diffs a save against.
+        instance._loaded = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.tracked_fields
+        }
+        return instance
+
+    def save_versioned(self, *args, **kwargs):
+        """save() that only updates the task if it is still at the version this
+        instance was loaded or submitted with, and raises VersionConflict
+        otherwise. Creating a task is not checked."""
+        self._versioned = True
+        try:
+            self.save(*args, **kwargs)
+        finally:
+            del self._versioned
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Optimistic concurrency: UPDATE ... WHERE id = %s AND version = %s. No
+        # row is locked beforehand; the extra query only runs on a conflict.
+        # Plain saves leave the version alone, so they never write back a
+        # stale one.
+        field = self._meta.get_field("version")
+        values = [value for value in values if value[0] is not field]
+        if not self.__dict__.get("_versioned"):
+            return super()._do_update(
+                base_qs, using, pk_val, values, update_fields, forced_update
+            )
+        expected = self.version
+        values.append((field, None, expected + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=expected),
+            using,
+            pk_val,
+            values,
+            update_fields,
+            forced_update,
+        )
+        if updated:
+            self.version = expected + 1
+        elif base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict([pk_val])
+        return updated
+
+
+class TaskCounter(models.Model):
+    # Denormalised task counts, kept in sync by task_manager.tasks.signals and
+    # the bulk helpers; rebuild_task_counters recomputes them from scratch.
+    STATUS = "status"
+    EXECUTOR = "executor"
+    LABEL = "label"
+    KINDS = [
+        (STATUS, _("Status")),
+        (EXECUTOR, _("Executor")),
+        (LABEL, _("Label")),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="tasks_counter_kind_object_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.count}"
+
+
+class TaskActivity(models.Model):
+    # Append-only history of tasks, written in batches by
+    # task_manager.tasks.activity. Rows outlive their task and the user who
+    # made the change, hence no foreign key constraints.
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTIONS = [
+        (CREATED, _("Created")),
+        (UPDATED, _("Updated")),
+        (DELETED, _("Deleted")),
+    ]
+
+    task = models.ForeignKey(
+        TaskModel,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="activity",
+    )
+    actor = models.ForeignKey(
+        UserStr,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    # {field: [old, new]} with ids for status and executor, and
+    # {"labels": {"added": [ids], "removed": [ids]}}.
+    changes = models.JSONField(default=dict)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "timestamp"], name="tasks_activity_task_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} {self.action} at {self.timestamp}"
@@ -0,0 +1,189 @@
+from datetime import date
+
+from django.core import signing
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+CURSOR_SALT = "task_manager.tasks.pagination.cursor"
+NEXT = "next"
+PREVIOUS = "prev"
+
+
+def encode_cursor(values, direction, params, page_size):
+    payload = {"k": values, "d": direction, "p": params, "s": page_size}
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, ordering):
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if payload.get("d") not in (NEXT, PREVIOUS) or len(payload.get("k", ())) != len(ordering):
+        return None
+    return payload
+
+
+def keyset_filter(ordering, values, lookup):
+    # (a, b) > (x, y) spelled as a > x OR (a = x AND b > y): row-value
+    # comparison is not portable between SQLite and Postgres.
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        condition |= Q(**equal, **{f"{field}__{lookup}": value})
+        equal[field] = value
+    return condition
+
+
+def params_to_querydict(params):
+    data = QueryDict(mutable=True)
+    for key, values in params.items():
+        data.setlist(key, values)
+    return data
+
+
+class KeysetPage:
+    def __init__(self, paginator, cursor):
+        self.paginator = paginator
+        self.cursor = cursor
+        self.page_size = paginator.page_size
+
+    def _query(self):
+        # One row past the page tells whether there is another page.
+        queryset = self.paginator.queryset
+        ordering = self.paginator.ordering
+        size = self.page_size + 1
+        if self.cursor is None:
+            return queryset.order_by(*ordering)[:size]
+        if self.cursor["d"] == NEXT:
+            condition = keyset_filter(ordering, self.cursor["k"], "gt")
+            return queryset.filter(condition).order_by(*ordering)[:size]
+        condition = keyset_filter(ordering, self.cursor["k"], "lt")
+        reverse = [f"-{field}" for field in ordering]
+        return queryset.filter(condition).order_by(*reverse)[:size]
+
+    def _build(self, rows):
+        size = self.page_size
+        if self.cursor is None:
+            return rows[:size], False, len(rows) > size
+        if self.cursor["d"] == NEXT:
+            return rows[:size], True, len(rows) > size
+        return rows[:size][::-1], len(rows) > size, True
+
+    @cached_property
+    def _window(self):
+        return self._build(list(self._query()))
+
+    async def aload(self):
+        # Fetches the rows with the async ORM; later accesses use the cache.
+        if "_window" not in self.__dict__:
+            rows = [obj async for obj in self._query()]
+            self.__dict__["_window"] = self._build(rows)
+        return self
+
+    @property
+    def object_list(self):
+        return self._window[0]
+
+    def has_previous(self):
+        return self._window[1] and bool(self.object_list)
+
+    def has_next(self):
+        return self._window[2] and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return ""
+        return self.paginator.cursor_for(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return ""
+        return self.paginator.cursor_for(self.object_list[0], PREVIOUS)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, page_size, ordering=("created_at", "id"), params=None):
+        self.queryset = queryset
+        self.page_size = page_size
+        self.ordering = tuple(ordering)
+        self.params = params or {}
+
+    def page(self, cursor=None):
+        return KeysetPage(self, cursor)
+
+    def cursor_for(self, obj, direction):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field)
+            values.append(value.isoformat() if isinstance(value, date) else value)
+        return encode_cursor(values, direction, self.params, self.page_size)
+
+
+class KeysetPaginationMixin:
+    paginate_by = 20
+    max_paginate_by = 100
+    keyset_ordering = ("created_at", "id")
+    cursor_kwarg = "cursor"
+    page_size_kwarg = "page_size"
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_cursor(self):
+        if not hasattr(self, "_cursor"):
+            token = self.request.GET.get(self.cursor_kwarg)
+            self._cursor = decode_cursor(token, self.keyset_ordering)
+        return self._cursor
+
+    def get_cursor_params(self):
+        cursor = self.get_cursor()
+        if cursor is not None:
+            return cursor["p"]
+        ignored = (self.cursor_kwarg, self.page_size_kwarg)
+        return {
+            key: self.request.GET.getlist(key)
+            for key in self.request.GET
+            if key not in ignored
+        }
+
+    def get_filterset_kwargs(self, filterset_class):
+        kwargs = super().get_filterset_kwargs(filterset_class)
+        if self.get_cursor() is not None:
+            kwargs["data"] = params_to_querydict(self.get_cursor_params()) or None
+        return kwargs
+
+    def get_paginate_by(self, queryset):
+        cursor = self.get_cursor()
+        value = self.request.GET.get(self.page_size_kwarg) or (cursor or {}).get("s")
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            size = self.paginate_by
+        return max(1, min(size, self.max_paginate_by))
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, self.get_keyset_ordering(), self.get_cursor_params()
+        )
+        page = paginator.page(self.get_cursor())
+        # Rows are fetched lazily, the first time the page is iterated.
+        return paginator, page, page, True
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault("max_page_size", self.max_paginate_by)
+        return super().get_context_data(**kwargs)
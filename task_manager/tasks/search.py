@@ -0,0 +1,172 @@
+import re
+
+from django.db import connections, router
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+from task_manager.tasks.models import TaskModel
+
+TABLE = "tasks_search"
+RANK = "search_rank"
+TERM = re.compile(r"\w+")
+MAX_TERMS = 8
+
+
+def write_connection():
+    # The index is written with raw SQL, which database routers don't see.
+    return connections[router.db_for_write(TaskModel)]
+
+
+def search_terms(value):
+    return TERM.findall(value or "")[:MAX_TERMS]
+
+
+class Rank(Func):
+    # Correlated lookup of the rank of the outer task; lower is better, so
+    # (search_rank, id) works as an ascending keyset ordering.
+    output_field = FloatField()
+
+    def __init__(self, sql, match):
+        self.rank_sql = sql
+        super().__init__(Value(match), F("id"))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        match_sql, match_params = compiler.compile(self.source_expressions[0])
+        pk_sql, pk_params = compiler.compile(self.source_expressions[1])
+        sql = self.rank_sql % {"match": match_sql, "pk": pk_sql}
+        return sql, (*match_params, *pk_params)
+
+
+class ContainsSearchBackend:
+    # Databases without a full-text index: every term must appear in the name
+    # or the description, and nothing needs indexing.
+    def filter(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.annotate(**{RANK: Value(0.0, output_field=FloatField())})
+
+    def index(self, ids, new=False):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class IndexedSearchBackend(ContainsSearchBackend):
+    # index_sql copies documents from the task table, so indexing only needs
+    # the task ids. Each term becomes term_format, joined by term_separator.
+    pk_column = None
+    index_sql = None
+    ids_sql = None
+    rank_sql = None
+    term_format = None
+    term_separator = None
+
+    def match(self, terms):
+        return self.term_separator.join(self.term_format % term for term in terms)
+
+    def filter(self, queryset, terms):
+        match = self.match(terms)
+        return queryset.filter(id__in=RawSQL(self.ids_sql, [match])).annotate(
+            **{RANK: Rank(self.rank_sql, match)}
+        )
+
+    def index(self, ids, new=False):
+        # new: the tasks were just created and have no documents to replace.
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ", ".join(["%s"] * len(ids))
+        with write_connection().cursor() as cursor:
+            if not new:
+                cursor.execute(
+                    f"DELETE FROM {TABLE} WHERE {self.pk_column} IN ({placeholders})",
+                    ids,
+                )
+            cursor.execute(f"{self.index_sql} WHERE id IN ({placeholders})", ids)
+
+    def remove(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ", ".join(["%s"] * len(ids))
+        with write_connection().cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TABLE} WHERE {self.pk_column} IN ({placeholders})", ids
+            )
+
+    def rebuild(self):
+        with write_connection().cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+            cursor.execute(self.index_sql)
+            return cursor.rowcount
+
+
+class SqliteSearchBackend(IndexedSearchBackend):
+    # FTS5 table keyed by the task id (rowid); the name counts ten times as
+    # much as the description in bm25.
+    pk_column = "rowid"
+    index_sql = (
+        f"INSERT INTO {TABLE} (rowid, name, description) "
+        "SELECT id, name, coalesce(description, '') FROM tasks_taskmodel"
+    )
+    ids_sql = f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s"
+    rank_sql = (
+        f"(SELECT bm25({TABLE}, 10.0, 1.0) FROM {TABLE} "
+        f"WHERE {TABLE} MATCH %(match)s AND {TABLE}.rowid = %(pk)s)"
+    )
+    term_format = '"%s"*'
+    term_separator = " "
+
+
+class PostgresSearchBackend(IndexedSearchBackend):
+    # tsvector side table with a GIN index; "simple" keeps it language
+    # agnostic, as tasks are written in both English and Russian.
+    pk_column = "task_id"
+    index_sql = (
+        f"INSERT INTO {TABLE} (task_id, document) "
+        "SELECT id, setweight(to_tsvector('simple', name), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B') "
+        "FROM tasks_taskmodel"
+    )
+    ids_sql = f"SELECT task_id FROM {TABLE} WHERE document @@ to_tsquery('simple', %s)"
+    rank_sql = (
+        f"(SELECT -ts_rank(document, to_tsquery('simple', %(match)s)) "
+        f"FROM {TABLE} WHERE task_id = %(pk)s)"
+    )
+    term_format = "%s:*"
+    term_separator = " & "
+
+
+BACKENDS = {
+    "sqlite": SqliteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or write_connection().vendor, ContainsSearchBackend)()
+
+
+def search(queryset, value):
+    terms = search_terms(value)
+    if not terms:
+        return queryset
+    return get_backend().filter(queryset, terms)
+
+
+class SearchOrderingMixin:
+    # Ranked results are paginated by (rank, id) instead of (created_at, id).
+    search_param = "search"
+    search_ordering = (RANK, "id")
+
+    def get_keyset_ordering(self):
+        values = self.get_cursor_params().get(self.search_param) or [""]
+        if search_terms(values[-1]):
+            return self.search_ordering
+        return super().get_keyset_ordering()
@@ -0,0 +1,163 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.utils import timezone
+
+from task_manager.auth.models import CachedUser, UserStr
+from task_manager.labels.models import LabelModel
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks import activity, counters, search
+from task_manager.tasks.cache import CHOICES, TASK_LIST, USERS, bump_version
+from task_manager.tasks.models import TaskCounter, TaskModel
+
+TASK_LIST_SOURCES = (TaskModel, StatusModel, LabelModel, User, UserStr, CachedUser)
+CHOICE_SOURCES = (StatusModel, LabelModel, User, UserStr, CachedUser)
+COUNTED_FIELDS = ("status_id", "executor_id")
+
+
+def invalidate_task_list(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which the list never shows.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    bump_version(TASK_LIST)
+
+
+def invalidate_task_list_on_labels(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_version(TASK_LIST)
+
+
+def invalidate_users(sender, update_fields=None, **kwargs):
+    # Also drops the cached user records (request.user, author and executor
+    # names), including the session hash after a password change.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    bump_version(USERS)
+
+
+def invalidate_choices(sender, update_fields=None, **kwargs):
+    # Task rows and the filter form show status, label and user names.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    bump_version(CHOICES)
+
+
+def touch_tasks_on_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    # Label changes don't save the task, but its detail page ETag relies on
+    # modified_at.
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        tasks = TaskModel.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        tasks = instance.taskmodel_set.all()
+    else:
+        tasks = TaskModel.objects.filter(pk__in=pk_set)
+    tasks.update(modified_at=timezone.now())
+
+
+def remember_counted_fields(sender, instance, **kwargs):
+    # Fixtures save with an explicit pk, so don't rely on _state.adding.
+    instance._counted = None
+    if instance.pk is None:
+        return
+    # The values from_db() or the last save recorded, unless one was deferred.
+    loaded = instance.__dict__.get("_loaded", {})
+    if all(attname in loaded for attname in COUNTED_FIELDS):
+        instance._counted = tuple(loaded[attname] for attname in COUNTED_FIELDS)
+        return
+    instance._counted = (
+        TaskModel.objects.filter(pk=instance.pk).values_list(*COUNTED_FIELDS).first()
+    )
+
+
+def count_saved_task(sender, instance, **kwargs):
+    deltas = counters.task_deltas([(instance.status_id, instance.executor_id)])
+    previous = instance.__dict__.pop("_counted", None)
+    if previous:
+        deltas.subtract(counters.task_deltas([previous]))
+    counters.apply(deltas)
+
+
+def remember_deleted_task(sender, instance, **kwargs):
+    # The row and its labels are gone by post_delete; only the pk is cheap to
+    # rely on (the delete view defers status and executor).
+    instance._counted = counters.snapshot([instance.pk])
+
+
+def count_deleted_task(sender, instance, **kwargs):
+    deltas = instance.__dict__.pop("_counted", None)
+    if deltas:
+        counters.apply({key: -delta for key, delta in deltas.items()})
+
+
+def existing_label_rows(instance, reverse, pk_set):
+    # pk_set of a remove lists what was asked for, not what actually existed.
+    own, other = "taskmodel_id", "labelmodel_id"
+    if reverse:
+        own, other = other, own
+    rows = TaskModel.labels.through.objects.filter(**{own: instance.pk})
+    if pk_set is not None:
+        rows = rows.filter(**{f"{other}__in": pk_set})
+    return list(rows.values_list("labelmodel_id", flat=True))
+
+
+def count_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        instance._removed_labels = existing_label_rows(instance, reverse, pk_set)
+    elif action in ("post_remove", "post_clear"):
+        removed = instance.__dict__.pop("_removed_labels", ())
+        counters.apply(counters.label_deltas(removed, -1))
+    elif action == "post_add":
+        # pk_set only holds the rows that were actually inserted.
+        added = [instance.pk] * len(pk_set) if reverse else pk_set
+        counters.apply(counters.label_deltas(added))
+
+
+def index_saved_task(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {"name", "description"} & set(update_fields):
+        return
+    search.get_backend().index([instance.pk])
+
+
+def unindex_deleted_task(sender, instance, **kwargs):
+    search.get_backend().remove([instance.pk])
+
+
+def drop_counters(sender, instance, **kwargs):
+    kind = {
+        StatusModel: TaskCounter.STATUS,
+        LabelModel: TaskCounter.LABEL,
+    }.get(sender, TaskCounter.EXECUTOR)
+    TaskCounter.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+for model in TASK_LIST_SOURCES:
+    post_save.connect(invalidate_task_list, sender=model)
+    post_delete.connect(invalidate_task_list, sender=model)
+for model in (User, UserStr, CachedUser):
+    post_save.connect(invalidate_users, sender=model)
+    post_delete.connect(invalidate_users, sender=model)
+for model in CHOICE_SOURCES:
+    post_save.connect(invalidate_choices, sender=model)
+    post_delete.connect(invalidate_choices, sender=model)
+m2m_changed.connect(invalidate_task_list_on_labels, sender=TaskModel.labels.through)
+m2m_changed.connect(touch_tasks_on_labels, sender=TaskModel.labels.through)
+pre_save.connect(remember_counted_fields, sender=TaskModel)
+post_save.connect(count_saved_task, sender=TaskModel)
+pre_delete.connect(remember_deleted_task, sender=TaskModel)
+post_delete.connect(count_deleted_task, sender=TaskModel)
+post_save.connect(activity.log_saved_task, sender=TaskModel)
+post_delete.connect(activity.log_deleted_task, sender=TaskModel)
+# Before count_labels, which drops the removed labels it remembered.
+m2m_changed.connect(activity.log_labels, sender=TaskModel.labels.through)
+m2m_changed.connect(count_labels, sender=TaskModel.labels.through)
+post_save.connect(index_saved_task, sender=TaskModel)
+post_delete.connect(unindex_deleted_task, sender=TaskModel)
+for model in (StatusModel, LabelModel, User, UserStr, CachedUser):
+    post_delete.connect(drop_counters, sender=model)
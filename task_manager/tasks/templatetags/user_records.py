@@ -0,0 +1,15 @@
+from django import template
+
+from task_manager.auth import records
+
+register = template.Library()
+
+
+@register.filter
+def display_name(user_id):
+    """Full name of a user by id, from the cached user records.
+
+    Views warm the records of a whole page with records.get_many() first.
+    """
+    record = records.get(user_id)
+    return record.full_name if record else ""
@@ -1,14 +1,28 @@
+import asyncio
+from asgiref.sync import sync_to_async
 from django.test import TestCase, Client
 from django.urls import reverse_lazy
 from django.contrib.messages import get_messages
 from django.utils.translation import gettext_lazy as _
 from django import test
+from django.conf import settings
+from io import StringIO
+import json
+import tempfile
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 
-from task_manager.tasks.models import TaskModel
+from task_manager.tasks import activity, counters
+from task_manager.tasks.cache import TASK_LIST, bump_version
+from task_manager.tasks.importer import TaskImporter
+from task_manager.tasks.models import TaskActivity, TaskCounter, TaskModel
+from task_manager.tasks.views import ShowTaskCounters, UpdateTask
 from task_manager.statuses.models import StatusModel
 from task_manager.labels.models import LabelModel
-from task_manager.utils import SomeFuncsForTestsMixin
+from task_manager.utils import AsyncViewMixin, SomeFuncsForTestsMixin
 
 
 @test.modify_settings(
@@ -101,6 +115,46 @@ class TestView(TestCase, SomeFuncsForTestsMixin):
         self.assertTrue(TaskModel.objects.get(name="new_test_name"))
         self.assertFalse(TaskModel.objects.filter(labels=self.label_2))
 
+    def test_update_task_conflict(self):
+        self.login_user(self.user_1)
+        url = reverse_lazy("update_task", kwargs={"pk": self.task.pk})
+        form = {
+            "name": "mine",
+            "description": "description",
+            "executor": self.user_2.pk,
+            "status": self.status.pk,
+            "version": self.task.version,
+        }
+        TaskModel.objects.get(pk=self.task.pk).save_versioned()
+
+        response = self.client.post(url, form)
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(str(list(response.context["messages"])[0]), UpdateTask.conflict_message)
+        self.assertIn(
+            (_("Name"), self.task.name, "mine"), response.context["conflicts"]
+        )
+        self.assertEquals(TaskModel.objects.get(pk=self.task.pk).name, self.task.name)
+        self.assertEquals(response.context["form"]["version"].value(), 2)
+
+        response = self.client.post(url, {**form, "version": 2})
+        self.assertRedirects(response, self.all_tasks_url)
+        self.assertEquals(
+            TaskModel.objects.values_list("name", "version").get(pk=self.task.pk),
+            ("mine", 3),
+        )
+
+    def test_plain_save_keeps_the_version(self):
+        stale = TaskModel.objects.get(pk=self.task.pk)
+        TaskModel.objects.get(pk=self.task.pk).save_versioned()
+        stale.name = "internal"
+        stale.save()
+
+        self.assertEquals(
+            TaskModel.objects.values_list("name", "version").get(pk=self.task.pk),
+            ("internal", 2),
+        )
+
     def test_delete_task_GET_owner(self):
         self.login_user(self.user_1)
         response = self.client.get(
@@ -150,3 +204,1010 @@ class TestView(TestCase, SomeFuncsForTestsMixin):
         self.assertEquals(
             str(message[0]), _("A task can only be deleted by its author.")
         )
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestKeysetPagination(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.status_1 = StatusModel.objects.get(pk=1)
+        self.status_2 = StatusModel.objects.get(pk=2)
+        for number in range(24):
+            TaskModel.objects.create(
+                name=f"task {number}",
+                status=self.status_1 if number % 2 else self.status_2,
+                author_id=self.user.pk,
+                executor_id=self.user.pk,
+            )
+        self.all_tasks_url = reverse_lazy("all_tasks")
+        self.login_user(self.user)
+
+    def walk(self, response):
+        ids = [task.pk for task in response.context["page_obj"]]
+        while response.context["page_obj"].has_next():
+            cursor = response.context["page_obj"].next_cursor
+            response = self.client.get(self.all_tasks_url, {"cursor": cursor})
+            ids.extend(task.pk for task in response.context["page_obj"])
+        return ids, response
+
+    def test_pages_cover_all_tasks_once(self):
+        response = self.client.get(self.all_tasks_url, {"page_size": 10})
+        ids, last = self.walk(response)
+
+        expected = list(
+            TaskModel.objects.order_by("created_at", "id").values_list("id", flat=True)
+        )
+        self.assertEquals(ids, expected)
+        self.assertEquals(len(last.context["page_obj"]), 5)
+
+    def test_previous_cursor_returns_previous_page(self):
+        first = self.client.get(self.all_tasks_url, {"page_size": 10})
+        second = self.client.get(
+            self.all_tasks_url, {"cursor": first.context["page_obj"].next_cursor}
+        )
+        back = self.client.get(
+            self.all_tasks_url, {"cursor": second.context["page_obj"].previous_cursor}
+        )
+
+        self.assertEquals(
+            [task.pk for task in back.context["page_obj"]],
+            [task.pk for task in first.context["page_obj"]],
+        )
+        self.assertFalse(back.context["page_obj"].has_previous())
+
+    def test_cursor_carries_filter(self):
+        response = self.client.get(
+            self.all_tasks_url, {"status": self.status_1.pk, "page_size": 5}
+        )
+        ids, last = self.walk(response)
+
+        self.assertEquals(
+            sorted(ids),
+            sorted(TaskModel.objects.filter(status=self.status_1).values_list("id", flat=True)),
+        )
+        self.assertEquals(last.context["filter"].data.get("status"), str(self.status_1.pk))
+
+    def test_export_link_keeps_filter_on_later_pages(self):
+        response = self.client.get(
+            self.all_tasks_url, {"status": self.status_1.pk, "page_size": 5}
+        )
+        cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(self.all_tasks_url, {"cursor": cursor})
+
+        self.assertEquals(
+            response.context["export_url"],
+            f"{reverse_lazy('export_tasks')}?status={self.status_1.pk}",
+        )
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.all_tasks_url, {"page_size": 10_000})
+
+        self.assertEquals(response.context["page_obj"].page_size, 100)
+        self.assertContains(response, "100")
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.all_tasks_url, {"cursor": "garbage"})
+
+        self.assertEquals(response.status_code, 200)
+        self.assertFalse(response.context["page_obj"].has_previous())
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestQueryCount(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user_1 = User.objects.get(pk=1)
+        self.user_2 = User.objects.get(pk=2)
+        self.status = StatusModel.objects.get(pk=1)
+        self.labels = list(LabelModel.objects.all())
+        self.login_user(self.user_1)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEquals(response.status_code, 200)
+        return len(context)
+
+    def add_tasks(self, count):
+        for number in range(count):
+            task = TaskModel.objects.create(
+                name=f"task {number}",
+                status=self.status,
+                author_id=self.user_1.pk,
+                executor_id=self.user_2.pk,
+            )
+            task.labels.set(self.labels)
+
+    def test_task_list_query_count_is_constant(self):
+        url = reverse_lazy("all_tasks")
+        queries = self.count_queries(url)
+        self.add_tasks(15)
+
+        self.assertEquals(self.count_queries(url), queries)
+
+    def test_task_detail_query_count_is_constant(self):
+        queries = self.count_queries(reverse_lazy("show_task", kwargs={"pk": 1}))
+        self.add_tasks(1)
+        task = TaskModel.objects.latest("id")
+
+        self.assertEquals(
+            self.count_queries(reverse_lazy("show_task", kwargs={"pk": task.pk})),
+            queries,
+        )
+
+
+class TestExplainTaskFilters(TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def test_every_filter_combination_is_explained(self):
+        out = StringIO()
+        call_command("explain_task_filters", stdout=out)
+        lines = out.getvalue().splitlines()
+
+        self.assertEquals(len(lines), 16)
+        self.assertTrue(lines[0].startswith("no filters: index"))
+        self.assertIn("status: index (tasks_status_created_idx)", lines)
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestTaskListCache(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = Client()
+        self.user_1 = User.objects.get(pk=1)
+        self.user_2 = User.objects.get(pk=2)
+        self.task = TaskModel.objects.get(pk=1)
+        self.all_tasks_url = reverse_lazy("all_tasks")
+
+    def task_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.all_tasks_url, params or {})
+        self.assertEquals(response.status_code, 200)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if '"tasks_taskmodel"."name"' in query["sql"]
+        ]
+
+    def test_repeated_request_skips_task_query(self):
+        self.login_user(self.user_1)
+
+        self.assertTrue(self.task_queries({"status": 1}))
+        self.assertFalse(self.task_queries({"status": 1}))
+        self.assertTrue(self.task_queries({"status": 2}))
+
+    def test_cache_is_per_user(self):
+        self.login_user(self.user_1)
+        self.task_queries()
+        self.login_user(self.user_2)
+
+        self.assertTrue(self.task_queries())
+
+    def test_task_change_invalidates(self):
+        self.login_user(self.user_1)
+        self.task_queries()
+        self.task.name = "renamed task"
+        self.task.save()
+
+        self.assertContains(self.client.get(self.all_tasks_url), "renamed task")
+
+    def test_related_changes_invalidate(self):
+        self.login_user(self.user_1)
+        self.task_queries()
+        self.task.labels.clear()
+        self.assertTrue(self.task_queries())
+        StatusModel.objects.create(name="new status")
+        self.assertTrue(self.task_queries())
+
+    def test_last_login_does_not_invalidate(self):
+        self.login_user(self.user_1)
+        self.task_queries()
+        self.login_user(self.user_1)
+
+        self.assertFalse(self.task_queries())
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+            file_cache = {"BACKEND": backend, "LOCATION": location}
+            with self.settings(CACHES={**settings.CACHES, "default": file_cache}):
+                self.login_user(self.user_1)
+                self.assertTrue(self.task_queries())
+                self.assertFalse(self.task_queries())
+                self.task.save()
+                self.assertTrue(self.task_queries())
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestFragmentCache(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.login_user(self.user)
+        self.all_tasks_url = reverse_lazy("all_tasks")
+
+    def rename_quietly(self, name):
+        # No signal and no new modified_at: only the task table is dropped.
+        TaskModel.objects.filter(pk=1).update(name=name)
+        bump_version(TASK_LIST)
+
+    def test_rows_are_keyed_by_modification(self):
+        self.client.get(self.all_tasks_url)
+        self.rename_quietly("quietly renamed")
+
+        self.assertNotContains(self.client.get(self.all_tasks_url), "quietly renamed")
+
+        TaskModel.objects.get(pk=1).save()
+        self.assertContains(self.client.get(self.all_tasks_url), "quietly renamed")
+
+    def test_rows_follow_renamed_choices(self):
+        self.client.get(self.all_tasks_url)
+        StatusModel.objects.filter(pk=1).update(name="renamed status")
+        StatusModel.objects.get(pk=1).save()
+
+        self.assertContains(self.client.get(self.all_tasks_url), "renamed status")
+
+    def test_filter_form_is_keyed_by_choices_and_query(self):
+        self.client.get(self.all_tasks_url, {"status": 1})
+        StatusModel.objects.filter(pk=1).update(name="quiet status")
+        bump_version(TASK_LIST)
+        renamed = '<option value="1" selected>quiet status</option>'
+
+        response = self.client.get(self.all_tasks_url, {"status": [1, ""]})
+        self.assertNotContains(response, renamed)
+        response = self.client.get(
+            self.all_tasks_url, {"status": 1, "self_task": "on"}
+        )
+        self.assertContains(response, renamed)
+        StatusModel.objects.get(pk=1).save()
+        response = self.client.get(self.all_tasks_url, {"status": 1})
+        self.assertContains(response, renamed)
+
+    def test_navbar_is_keyed_by_username(self):
+        self.client.get(reverse_lazy("home"))
+        self.user.username = "renamed_user"
+        self.user.save()
+        self.login_user(self.user)
+
+        self.assertContains(self.client.get(reverse_lazy("home")), "renamed_user")
+
+    @test.override_settings(FRAGMENT_CACHE=False)
+    def test_disabled(self):
+        self.client.get(self.all_tasks_url)
+        self.rename_quietly("quietly renamed")
+
+        self.assertContains(self.client.get(self.all_tasks_url), "quietly renamed")
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestConditionalGet(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.task = TaskModel.objects.get(pk=1)
+        self.label = LabelModel.objects.get(pk=2)
+        self.all_tasks_url = reverse_lazy("all_tasks")
+        self.task_url = reverse_lazy("show_task", kwargs={"pk": self.task.pk})
+        self.login_user(self.user)
+
+    def revalidate(self, url):
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        heavy = [
+            query
+            for query in context.captured_queries
+            if '"tasks_taskmodel"."name"' in query["sql"]
+        ]
+        return response, heavy
+
+    def test_task_list_not_modified(self):
+        response, heavy = self.revalidate(self.all_tasks_url)
+
+        self.assertEquals(response.status_code, 304)
+        self.assertFalse(heavy)
+
+    def test_task_detail_not_modified(self):
+        response, heavy = self.revalidate(self.task_url)
+
+        self.assertEquals(response.status_code, 304)
+        self.assertFalse(heavy)
+
+    def test_task_detail_modified_by_labels(self):
+        etag = self.client.get(self.task_url)["ETag"]
+        self.task.labels.set([self.label])
+        response = self.client.get(self.task_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+        self.assertContains(response, self.label.name)
+
+    def test_login_again_refreshes_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.get(reverse_lazy("login"))
+        credentials = {"username": self.user.username, "password": self.password}
+
+        def login():
+            token = client.cookies["csrftoken"].value
+            client.post(reverse_lazy("login"), {**credentials, "csrfmiddlewaretoken": token})
+            # Shows the flash message, which pages with one never answer 304.
+            client.get(reverse_lazy("home"))
+
+        login()
+        etag = client.get(reverse_lazy("all_statuses"))["ETag"]
+        login()
+        response = client.get(reverse_lazy("all_statuses"), HTTP_IF_NONE_MATCH=etag)
+        deleted = client.post(
+            reverse_lazy("bulk_delete_statuses"),
+            {"ids": [2], "csrfmiddlewaretoken": response.context["csrf_token"]},
+        )
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(deleted.status_code, 302)
+
+    def test_missing_task(self):
+        response = self.client.get(reverse_lazy("show_task", kwargs={"pk": 999}))
+
+        self.assertEquals(response.status_code, 404)
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestExport(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.status = StatusModel.objects.get(pk=2)
+        labels = list(LabelModel.objects.all())
+        for number in range(9):
+            task = TaskModel.objects.create(
+                name=f"task {number}",
+                status=self.status,
+                author_id=self.user.pk,
+                executor_id=self.user.pk,
+            )
+            task.labels.set(labels)
+
+    def test_export_view_streams_csv(self):
+        self.login_user(self.user)
+        response = self.client.get(reverse_lazy("export_tasks"), {"status": self.status.pk})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEquals(response["Content-Type"], "text/csv")
+        self.assertEquals(len(lines), 10)
+        self.assertTrue(lines[1].endswith("label1;label2"))
+
+    def test_export_view_rejects_invalid_filter(self):
+        self.login_user(self.user)
+        response = self.client.get(reverse_lazy("export_tasks"), {"status": "nope"})
+
+        self.assertEquals(response.status_code, 400)
+        self.assertIn("status", response.json()["errors"])
+
+    def test_labels_are_loaded_per_chunk(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command("export_tasks", format="ndjson", chunk_size=4, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEquals(len(rows), 10)
+        self.assertEquals(rows[0]["labels"], ["label1"])
+        self.assertEquals(rows[-1]["labels"], ["label1", "label2"])
+        # One task query plus one labels query for each of the 3 chunks.
+        self.assertEquals(len(context), 4)
+
+    def test_export_command_filters(self):
+        out = StringIO()
+        call_command("export_tasks", status=1, author=self.user.pk, stdout=out)
+
+        self.assertEquals(len(out.getvalue().splitlines()), 2)
+
+
+class TestImport(TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+    ]
+
+    def import_file(self, content, suffix, **options):
+        with tempfile.NamedTemporaryFile("w", suffix=suffix) as file:
+            file.write(content)
+            file.flush()
+            out, err = StringIO(), StringIO()
+            call_command("import_tasks", file.name, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv_creates_missing_statuses_and_labels(self):
+        rows = "".join(
+            f"task {number},,status1,testuserfirst,testusersecond,label1;new label\n"
+            for number in range(30)
+        )
+        content = "name,description,status,author,executor,labels\n" + rows
+        content += "broken,,new status,testuserfirst,nobody,\n"
+        content += "other,,new status,,testuserfirst,\n"
+
+        with CaptureQueriesContext(connection) as context:
+            out, err = self.import_file(content, ".csv", author="testusersecond", batch_size=10)
+
+        self.assertIn("31 tasks imported", out)
+        self.assertIn("1 statuses and 1 labels created", out)
+        self.assertIn("line 32: executor: unknown user 'nobody'", err)
+        self.assertEquals(TaskModel.objects.count(), 31)
+        self.assertEquals(
+            TaskModel.objects.get(name="other").author.username, "testusersecond"
+        )
+        self.assertEquals(
+            set(TaskModel.objects.get(name="task 0").labels.values_list("name", flat=True)),
+            {"label1", "new label"},
+        )
+        # Queries grow with the number of batches, not with the number of rows.
+        self.assertLess(len(context), 40)
+
+    def test_names_created_concurrently_are_not_counted(self):
+        importer = TaskImporter()
+        StatusModel.objects.create(name="new status")
+        row = {
+            "name": "one",
+            "status": "new status",
+            "author": "testuserfirst",
+            "executor": "testuserfirst",
+            "labels": ["new label"],
+        }
+
+        created = importer.run([(2, row)])
+
+        self.assertEquals(created, {"tasks": 1, "statuses": 0, "labels": 1})
+
+    def test_import_ndjson_round_trips_export(self):
+        out, err = self.import_file(
+            '{"name": "one", "status": "status2", "author": "testuserfirst", '
+            '"executor": "testuserfirst", "labels": ["label2"]}\n'
+            "\n"
+            "not json\n",
+            ".ndjson",
+        )
+        self.assertIn("line 3: ", err)
+        out = StringIO()
+        call_command("export_tasks", format="ndjson", stdout=out)
+        exported = out.getvalue()
+        TaskModel.objects.all().delete()
+
+        out, err = self.import_file(exported, ".ndjson")
+
+        self.assertIn("1 tasks imported", out)
+        task = TaskModel.objects.get()
+        self.assertEquals(task.status.name, "status2")
+        self.assertEquals(list(task.labels.values_list("name", flat=True)), ["label2"])
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestTaskCounters(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+
+    def stored(self):
+        return {
+            (kind, pk): count
+            for kind, pk, count in TaskCounter.objects.filter(count__gt=0).values_list(
+                "kind", "object_id", "count"
+            )
+        }
+
+    def assertCountersMatch(self):
+        expected = {
+            (counter.kind, counter.object_id): counter.count
+            for counter in counters.rebuild()
+        }
+        self.assertEquals(self.stored(), expected)
+
+    def test_counters_follow_views(self):
+        self.login_user(self.user)
+        self.assertEquals(self.stored(), {("status", 1): 1, ("executor", 1): 1, ("label", 1): 1})
+        data = {"name": "new", "status": 2, "executor": 2, "labels": [1, 2]}
+        self.client.post(reverse_lazy("create_task"), data)
+        task = TaskModel.objects.get(name="new")
+        self.client.post(
+            reverse_lazy("update_task", kwargs={"pk": 1}),
+            {"name": "asd", "status": 2, "executor": 2, "labels": [2]},
+        )
+        self.assertEquals(
+            self.stored(),
+            {("status", 2): 2, ("executor", 2): 2, ("label", 1): 1, ("label", 2): 2},
+        )
+        self.client.post(reverse_lazy("delete_task", kwargs={"pk": task.pk}))
+        LabelModel.objects.get(pk=1).taskmodel_set.add(1)
+
+        self.assertEquals(
+            self.stored(), {("status", 2): 1, ("executor", 2): 1, ("label", 1): 1, ("label", 2): 1}
+        )
+        self.assertCountersMatch()
+
+    def test_counters_follow_bulk_writes(self):
+        self.login_user(self.user)
+        self.client.post(
+            reverse_lazy("api_tasks_bulk"),
+            {"tasks": [{"name": "a", "status": 1, "executor": 2, "labels": [1, 2]}] * 3},
+            content_type="application/json",
+        )
+        self.client.patch(
+            reverse_lazy("api_tasks_bulk"),
+            {"tasks": [{"id": 1, "status": 2, "labels": [2]}]},
+            content_type="application/json",
+        )
+
+        self.assertEquals(self.stored()[("label", 2)], 4)
+        self.assertCountersMatch()
+
+    def test_save_of_a_loaded_task_does_not_reread_it(self):
+        task = TaskModel.objects.get(pk=1)
+        task.status_id = 2
+        with CaptureQueriesContext(connection) as context:
+            task.save()
+        task.executor_id = 2
+        task.save()
+
+        self.assertFalse(
+            [query for query in context if query["sql"].startswith("SELECT")]
+        )
+        self.assertEquals(self.stored(), {("status", 2): 1, ("executor", 2): 1, ("label", 1): 1})
+        self.assertCountersMatch()
+
+    def test_rebuild_command_fixes_drift(self):
+        TaskCounter.objects.filter(kind="status").update(count=10)
+        out = StringIO()
+
+        call_command("rebuild_task_counters", stdout=out)
+
+        self.assertIn("status 1: 10 -> 1", out.getvalue())
+        self.assertEquals(self.stored()[("status", 1)], 1)
+
+    def test_summary_is_cached_until_tasks_change(self):
+        self.login_user(self.user)
+        self.client.get(reverse_lazy("task_counters"))
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse_lazy("task_counters"))
+        TaskModel.objects.get(pk=1).delete()
+        response = self.client.get(reverse_lazy("task_counters"))
+
+        self.assertFalse(
+            [query for query in context if '"tasks_taskcounter"' in query["sql"]]
+        )
+        self.assertNotContains(response, "status1")
+
+    def test_counters_view_reads_counter_table(self):
+        self.login_user(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("task_counters"))
+
+        self.assertContains(response, "status1")
+        self.assertFalse(
+            [query for query in context if '"tasks_taskmodel"' in query["sql"]]
+        )
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestTaskActivity(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.login_user(self.user)
+
+    def update(self):
+        return self.client.post(
+            reverse_lazy("update_task", kwargs={"pk": 1}),
+            {"name": "new", "description": "asd", "status": 2, "executor": 1, "labels": [2]},
+        )
+
+    def test_update_is_logged_once_at_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update()
+            self.assertFalse(TaskActivity.objects.exists())
+
+        event = TaskActivity.objects.get()
+        self.assertEquals((event.task_id, event.actor_id), (1, self.user.pk))
+        self.assertEquals(event.action, TaskActivity.UPDATED)
+        self.assertEquals(
+            event.changes,
+            {
+                "name": ["asd", "new"],
+                "status": [1, 2],
+                "labels": {"added": [2], "removed": [1]},
+            },
+        )
+
+    async def test_middleware_sets_the_actor_in_async_mode(self):
+        request = test.RequestFactory().get("/")
+        request.user = self.user
+
+        async def get_response(request):
+            return activity.get_actor_id()
+
+        middleware = activity.ActivityMiddleware(get_response)
+
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        self.assertEquals(await middleware(request), self.user.pk)
+        self.assertIsNone(activity.get_actor_id())
+
+    def test_create_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse_lazy("create_task"),
+                {"name": "other", "status": 1, "executor": 2, "labels": [1, 2]},
+            )
+        task = TaskModel.objects.get(name="other")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse_lazy("delete_task", kwargs={"pk": task.pk}))
+
+        created, deleted = TaskActivity.objects.filter(task=task).order_by("id")
+        self.assertEquals(created.action, TaskActivity.CREATED)
+        self.assertEquals(created.changes["executor"], [None, 2])
+        self.assertEquals(created.changes["labels"], {"added": [1, 2], "removed": []})
+        self.assertEquals(deleted.action, TaskActivity.DELETED)
+
+    def test_bulk_update_is_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse_lazy("api_tasks_bulk"),
+                {"tasks": [{"id": 1, "executor": 2, "labels": [1, 2]}]},
+                content_type="application/json",
+            )
+
+        self.assertEquals(
+            TaskActivity.objects.get(task_id=1).changes,
+            {"executor": [1, 2], "labels": {"added": [2], "removed": []}},
+        )
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    TaskModel.objects.get(pk=1).labels.clear()
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                TaskModel.objects.filter(pk=1).first().labels.add(2)
+
+        self.assertEquals(
+            TaskActivity.objects.get().changes, {"labels": {"added": [2], "removed": []}}
+        )
+
+    def test_timeline_on_task_page(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("show_task", kwargs={"pk": 1}))
+
+        self.assertContains(response, "status1 &rarr; status2")
+        self.assertContains(response, "label1 &rarr; label2")
+        timeline = [query for query in context if '"tasks_taskactivity"' in query["sql"]]
+        self.assertIn('ORDER BY "tasks_taskactivity"."timestamp" DESC', timeline[-1]["sql"])
+
+    @test.override_settings(ACTIVITY_FLUSH="timer")
+    def test_timer_flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update()
+        self.assertFalse(TaskActivity.objects.exists())
+        self.assertIsNotNone(activity.BUFFER.timer)
+
+        activity.BUFFER.flush()
+
+        self.assertEquals(TaskActivity.objects.count(), 1)
+        self.assertIsNone(activity.BUFFER.timer)
+
+    def test_full_buffer_is_written_at_once(self):
+        buffer = activity.ActivityBuffer(size=2, interval=60)
+        buffer.add([TaskActivity(task_id=1, action=TaskActivity.DELETED)])
+        self.assertFalse(TaskActivity.objects.exists())
+
+        buffer.add([TaskActivity(task_id=1, action=TaskActivity.DELETED)])
+
+        self.assertEquals(TaskActivity.objects.count(), 2)
+        self.assertIsNone(buffer.timer)
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestTaskSearch(TestCase, SomeFuncsForTestsMixin):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.login_user(self.user)
+
+    def create(self, name, description="", status=1):
+        return TaskModel.objects.create(
+            name=name,
+            description=description,
+            status_id=status,
+            author_id=1,
+            executor_id=1,
+        )
+
+    def found(self, **params):
+        response = self.client.get(reverse_lazy("all_tasks"), params)
+        return [task.name for task in response.context["page_obj"]]
+
+    def test_search_ranks_and_combines_with_filters(self):
+        self.create("deploy report", "about the server")
+        self.create("write notes", "prepare the deploy")
+        self.create("deploy backup", status=2)
+
+        found = self.found(search="deploy")
+        # Name matches outrank description matches.
+        self.assertEquals(set(found[:2]), {"deploy report", "deploy backup"})
+        self.assertEquals(found[2], "write notes")
+        self.assertEquals(self.found(search="deploy", status=2), ["deploy backup"])
+        self.assertEquals(self.found(search="depl serv"), ["deploy report"])
+        self.assertEquals(self.found(search="nothing"), [])
+
+    def test_search_pages_follow_rank(self):
+        for number in range(3):
+            self.create(f"deploy {number}")
+            self.create(f"note {number}", "deploy")
+
+        response = self.client.get(
+            reverse_lazy("all_tasks"), {"search": "deploy", "page_size": 2}
+        )
+        names = [task.name for task in response.context["page_obj"]]
+        while response.context["page_obj"].has_next():
+            response = self.client.get(
+                reverse_lazy("all_tasks"),
+                {"cursor": response.context["page_obj"].next_cursor},
+            )
+            names += [task.name for task in response.context["page_obj"]]
+
+        self.assertEquals(len(names), 6)
+        self.assertEquals(
+            sorted(names[:3]), [f"deploy {number}" for number in range(3)]
+        )
+        self.assertEquals(sorted(names[3:]), [f"note {number}" for number in range(3)])
+
+    def test_index_follows_writes(self):
+        task = self.create("old name")
+        task.name = "new name"
+        task.save()
+        self.assertEquals(self.found(search="old"), [])
+        self.assertEquals(self.found(search="new"), ["new name"])
+
+        task.delete()
+        self.assertEquals(self.found(search="new"), [])
+
+        self.client.post(
+            reverse_lazy("api_tasks_bulk"),
+            {"tasks": [{"name": "from api", "status": 1, "executor": 1}]},
+            content_type="application/json",
+        )
+        response = self.client.get(reverse_lazy("api_tasks"), {"search": "api"})
+        self.assertEquals(
+            [task["name"] for task in response.json()["results"]], ["from api"]
+        )
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM tasks_search")
+        self.assertEquals(self.found(search="asd"), [])
+        out = StringIO()
+
+        call_command("rebuild_task_search", stdout=out)
+
+        self.assertIn("1 tasks indexed", out.getvalue())
+        self.assertEquals(self.found(search="asd"), ["asd"])
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+@test.override_settings(ROOT_URLCONF="task_manager.async_urls")
+class TestAsyncViews(TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.get(pk=1)
+        self.async_client.force_login(self.user)
+        for number in range(25):
+            TaskModel.objects.create(
+                name=f"async {number}", status_id=1, author_id=1, executor_id=2
+            )
+
+    async def test_task_list_pages_and_filters(self):
+        response = await self.async_client.get(reverse_lazy("all_tasks"))
+        page = response.context["page_obj"]
+        names = [task.name for task in page]
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(names[:2], ["asd", "async 0"])
+        self.assertEquals(len(names), 20)
+        self.assertTrue(page.has_next())
+
+        response = await self.async_client.get(
+            reverse_lazy("all_tasks"), {"cursor": page.next_cursor}
+        )
+        self.assertEquals(len(response.context["page_obj"]), 6)
+
+        response = await self.async_client.get(
+            reverse_lazy("all_tasks"), {"executor": 1, "search": "asd"}
+        )
+        self.assertEquals([task.name for task in response.context["page_obj"]], ["asd"])
+
+    async def test_task_detail(self):
+        response = await self.async_client.get(
+            reverse_lazy("show_task", kwargs={"pk": 1})
+        )
+
+        self.assertContains(response, "label1")
+        self.assertTrue(response.has_header("ETag"))
+
+        response = await self.async_client.get(
+            reverse_lazy("show_task", kwargs={"pk": 1}),
+            # AsyncClient takes raw header names.
+            **{"If-None-Match": response["ETag"]},
+        )
+        self.assertEquals(response.status_code, 304)
+
+        response = await self.async_client.get(
+            reverse_lazy("show_task", kwargs={"pk": 999})
+        )
+        self.assertEquals(response.status_code, 404)
+
+    async def test_lists(self):
+        for name, text in (
+            ("all_statuses", "status1"),
+            ("all_labels", "label2"),
+            ("all_users", "testusersecond"),
+        ):
+            response = await self.async_client.get(reverse_lazy(name))
+            self.assertContains(response, text)
+            self.assertTrue(response.has_header("Last-Modified") or name == "all_users")
+
+    async def test_view_without_async_response_falls_back_to_sync_get(self):
+        class AsyncShowTaskCounters(AsyncViewMixin, ShowTaskCounters):
+            pass
+
+        request = test.AsyncRequestFactory().get(reverse_lazy("task_counters"))
+        request.user = self.user
+        response = await AsyncShowTaskCounters.as_view()(request)
+        await sync_to_async(response.render)()
+
+        self.assertContains(response, "status1")
+
+    async def test_login_required(self):
+        client = test.AsyncClient()
+
+        response = await client.get(reverse_lazy("all_tasks"))
+
+        self.assertEquals(response.status_code, 302)
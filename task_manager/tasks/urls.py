@@ -6,6 +6,8 @@ urlpatterns = [
     path("", views.ShowAllTasks.as_view(), name="all_tasks"),
     path("<int:pk>", views.ShowTask.as_view(), name="show_task"),
     path("create/", views.CreateTask.as_view(), name="create_task"),
+    path("counters/", views.ShowTaskCounters.as_view(), name="task_counters"),
+    path("export/", views.ExportTasks.as_view(), name="export_tasks"),
     path("<int:pk>/update/", views.UpdateTask.as_view(), name="update_task"),
     path("<int:pk>/delete/>", views.DeleteTask.as_view(), name="delete_task"),
 ]
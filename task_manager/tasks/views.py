@@ -1,35 +1,244 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
 from django.views.generic import (
     CreateView,
     UpdateView,
     DetailView,
     DeleteView,
+    TemplateView,
 )
 from django.contrib.messages.views import SuccessMessageMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django_filters.views import FilterView
 
+from task_manager.auth import records
+from task_manager.tasks import activity
+from task_manager.tasks.cache import (
+    CHOICES,
+    TASK_LIST,
+    USERS,
+    get_or_render,
+    get_version,
+    normalise_params,
+    task_list_key,
+)
+from task_manager.tasks.counters import TaskCountersMixin
+from task_manager.tasks.export import CONTENT_TYPES, export
 from task_manager.tasks.forms import TaskForm
 from task_manager.tasks.filters import TaskFilter
-from task_manager.tasks.models import TaskModel
-from task_manager.utils import CustomLoginRequiredMixin
+from task_manager.tasks.models import (
+    TaskActivity,
+    TaskModel,
+    VersionConflict,
+)
+from task_manager.tasks.pagination import KeysetPaginationMixin
+from task_manager.tasks.search import SearchOrderingMixin
+from task_manager.utils import (
+    AsyncViewMixin,
+    CachedObjectMixin,
+    ConditionalGetMixin,
+    CustomLoginRequiredMixin,
+    ReplicaReadMixin,
+)
+
+
+def detail_stamp(pk):
+    # Everything the task page shows, down to the newest timeline entry; the
+    # log may be written after the task itself (ACTIVITY_FLUSH = "timer").
+    last_activity = (
+        TaskActivity.objects.filter(task=OuterRef("pk"))
+        .order_by("-timestamp")
+        .values("timestamp")[:1]
+    )
+    return (
+        TaskModel.objects.filter(pk=pk)
+        .values_list("modified_at", "status__modified_at")
+        .annotate(
+            Count("labels"),
+            Max("labels__modified_at"),
+            last_activity=Subquery(last_activity),
+        )
+    )
 
 
-class ShowAllTasks(CustomLoginRequiredMixin, FilterView):
+def warm_user_records(tasks):
+    # One query for the author and executor names of every task on the page.
+    records.get_many(
+        [task.author_id for task in tasks] + [task.executor_id for task in tasks]
+    )
+
+
+class ShowAllTasks(
+    CustomLoginRequiredMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    TaskCountersMixin,
+    SearchOrderingMixin,
+    KeysetPaginationMixin,
+    FilterView,
+):
     model = TaskModel
     template_name = "tasks/PageWithTasks.html"
     login_url = reverse_lazy("login")
     filterset_class = TaskFilter
+    table_template_name = "tasks/TaskTable.html"
+
+    def get_queryset(self):
+        return TaskModel.objects.for_list()
+
+    def get_list_stamp(self):
+        # Read from the same database as the page. A replica that is behind
+        # the primary gives an older stamp, so the table it renders is never
+        # cached for readers of an up-to-date database.
+        if not hasattr(self, "list_stamp"):
+            stamp = TaskModel.objects.aggregate(
+                count=Count("id"), last=Max("modified_at")
+            )
+            self.list_stamp = (stamp["count"], stamp["last"])
+        return self.list_stamp
+
+    def get_validators(self):
+        # The version counter covers renamed statuses, labels and users; the
+        # aggregate catches writes that bypass signals.
+        return (*self.get_list_stamp(), get_version(TASK_LIST)), None
+
+    def get_filter_params(self):
+        return {
+            name: values
+            for name, values in self.get_cursor_params().items()
+            if name in self.filterset_class.base_filters
+        }
+
+    def get_table_params(self):
+        params = self.get_filter_params()
+        if self.get_cursor() is not None:
+            params[self.cursor_kwarg] = [self.request.GET[self.cursor_kwarg]]
+        params[self.page_size_kwarg] = [str(self.get_paginate_by(None))]
+        return params
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Vary the cached filter form and task rows, see the templates.
+        context["choices_version"] = get_version(CHOICES)
+        context["filter_query"] = normalise_params(self.get_filter_params())
+        # From page 2 on the filters travel inside the cursor, not the URL.
+        context["export_url"] = f"{reverse('export_tasks')}?{context['filter_query']}"
+        key = task_list_key(
+            self.request.user.pk,
+            get_language(),
+            self.get_table_params(),
+            self.get_list_stamp(),
+        )
+        context["task_table"] = get_or_render(key, lambda: self.render_table(context))
+        return context
+
+    def render_table(self, context):
+        warm_user_records(context["object_list"])
+        return render_to_string(self.table_template_name, context, self.request)
+
+
+class AsyncShowAllTasks(AsyncViewMixin, ShowAllTasks):
+    async def aget_validators(self):
+        stamp = await TaskModel.objects.aaggregate(
+            count=Count("id"), last=Max("modified_at")
+        )
+        self.list_stamp = (stamp["count"], stamp["last"])
+        version = await sync_to_async(get_version)(TASK_LIST)
+        return (*self.list_stamp, version), None
+
+    def paginate_queryset(self, queryset, page_size):
+        # The page was loaded by aget_response().
+        return self.page.paginator, self.page, self.page, True
+
+    async def aget_response(self):
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        # Choice filters validate against the database.
+        valid = await sync_to_async(self.filterset.is_valid)()
+        if not self.filterset.is_bound or valid or not self.get_strict():
+            self.object_list = self.filterset.qs
+        else:
+            self.object_list = self.filterset.queryset.none()
+        page_size = self.get_paginate_by(self.object_list)
+        self.page = super().paginate_queryset(self.object_list, page_size)[1]
+        await self.page.aload()
+        # Counters, the cached table and the filter widgets stay synchronous.
+        context = await sync_to_async(self.get_context_data)(
+            filter=self.filterset, object_list=self.object_list
+        )
+        return self.render_to_response(context)
+
+
+class ShowTaskCounters(CustomLoginRequiredMixin, TaskCountersMixin, TemplateView):
+    template_name = "tasks/CountersPage.html"
+    login_url = reverse_lazy("login")
+
+
+class ExportTasks(CustomLoginRequiredMixin, View):
+    login_url = reverse_lazy("login")
+    chunk_size = 2000
+
+    def get(self, request):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in CONTENT_TYPES:
+            fmt = "csv"
+        filterset = TaskFilter(
+            request.GET, queryset=TaskModel.objects.all(), request=request
+        )
+        if not filterset.is_valid():
+            return JsonResponse({"errors": filterset.errors.get_json_data()}, status=400)
+        response = StreamingHttpResponse(
+            export(filterset.qs, fmt, self.chunk_size), content_type=CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="tasks.{fmt}"'
+        return response
 
 
-class ShowTask(CustomLoginRequiredMixin, DetailView):
+class ShowTask(
+    CustomLoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, DetailView
+):
     model = TaskModel
     context_object_name = "task"
     template_name = "tasks/Task.html"
     login_url = reverse_lazy("login")
 
+    def get_queryset(self):
+        return TaskModel.objects.for_detail()
+
+    def get_context_data(self, **kwargs):
+        warm_user_records([self.object])
+        kwargs.setdefault("timeline", activity.timeline(self.object.pk))
+        return super().get_context_data(**kwargs)
+
+    def get_validators(self):
+        stamp = detail_stamp(self.kwargs["pk"]).first()
+        if stamp is None:
+            return None
+        return (*stamp, get_version(USERS)), None
+
+
+class AsyncShowTask(AsyncViewMixin, ShowTask):
+    async def aget_validators(self):
+        stamp = await detail_stamp(self.kwargs["pk"]).afirst()
+        if stamp is None:
+            return None
+        return (*stamp, await sync_to_async(get_version)(USERS)), None
+
+    async def aget_response(self):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs["pk"])
+        except TaskModel.DoesNotExist:
+            raise Http404
+        context = await sync_to_async(self.get_context_data)(object=self.object)
+        return self.render_to_response(context)
+
 
 class CreateTask(CustomLoginRequiredMixin, SuccessMessageMixin, CreateView):
     form_class = TaskForm
@@ -41,7 +250,9 @@ class CreateTask(CustomLoginRequiredMixin, SuccessMessageMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        # The task and its labels end up in a single activity log entry.
+        with transaction.atomic():
+            return super().form_valid(form)
 
 
 class UpdateTask(CustomLoginRequiredMixin, SuccessMessageMixin, UpdateView):
@@ -52,17 +263,51 @@ class UpdateTask(CustomLoginRequiredMixin, SuccessMessageMixin, UpdateView):
     login_url = reverse_lazy("login")
     success_url = reverse_lazy("all_tasks")
     success_message = _("Task updated")
+    conflict_message = _(
+        "Someone else changed this task while you were editing it. "
+        "Check their changes below and save again."
+    )
 
+    def get_queryset(self):
+        return TaskModel.objects.for_update()
 
-class DeleteTask(CustomLoginRequiredMixin, SuccessMessageMixin, DeleteView):
+    def form_valid(self, form):
+        # The task and its labels are saved together or not at all.
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except VersionConflict:
+            return self.conflict(form)
+
+    def conflict(self, form):
+        self.object = self.get_object()
+        conflicts = form.conflicts(self.object)
+        # Saving the form again overwrites the changes it was shown.
+        data = form.data.copy()
+        data[form.add_prefix("version")] = self.object.version
+        form = self.get_form_class()(
+            **{**self.get_form_kwargs(), "data": data, "instance": self.object}
+        )
+        messages.add_message(self.request, messages.ERROR, self.conflict_message)
+        return self.render_to_response(
+            self.get_context_data(form=form, conflicts=conflicts)
+        )
+
+
+class DeleteTask(
+    CustomLoginRequiredMixin, CachedObjectMixin, SuccessMessageMixin, DeleteView
+):
     model = TaskModel
     success_url = reverse_lazy("all_tasks")
     template_name = "tasks/DeletePage.html"
     success_message = _("Task deleted")
     login_url = reverse_lazy("login")
 
+    def get_queryset(self):
+        return TaskModel.objects.for_delete()
+
     def dispatch(self, request, *args, **kwargs):
-        if request.user.pk == self.get_object().author.pk:
+        if request.user.pk == self.get_object().author_id:
             return super(DeleteTask, self).dispatch(request, *args, **kwargs)
         else:
             messages.add_message(
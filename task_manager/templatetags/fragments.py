@@ -0,0 +1,44 @@
+from django import template
+from django.conf import settings
+
+from task_manager.tasks.cache import fragment_key, get_or_render
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not settings.FRAGMENT_CACHE:
+            return self.nodelist.render(context)
+        parts = [var.resolve(context) for var in self.vary_on]
+        return get_or_render(
+            fragment_key(self.name, parts),
+            lambda: self.nodelist.render(context),
+            settings.FRAGMENT_CACHE_TIMEOUT,
+        )
+
+
+@register.tag
+def fragment(parser, token):
+    """Cache the enclosed template for FRAGMENT_CACHE_TIMEOUT seconds.
+
+    {% fragment name value ... %}...{% endfragment %} keeps one copy per
+    combination of values, which must cover everything the fragment shows:
+    the language, and a version or stamp of the rows it renders. Fragments
+    must not contain a CSRF token.
+    """
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"{bits[0]!r} tag requires at least a fragment name."
+        )
+    return FragmentNode(
+        nodelist, bits[1], [parser.compile_filter(bit) for bit in bits[2:]]
+    )
@@ -0,0 +1,689 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+
+import dj_database_url
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+from django import test
+
+from task_manager.bench import Bench, compare, generate, session_store
+from task_manager.labels.models import LabelModel
+from task_manager.db.pool import ConnectionPool, PoolTimeout
+from task_manager.db import routers
+from task_manager.db.routers import ReadOnlyRouter, ReplicaRouter
+from task_manager.metrics import CONNECTIONS, REQUESTS
+from task_manager.sessions import SessionStore
+from task_manager.statuses.models import StatusModel
+from task_manager.tasks.models import TaskCounter, TaskModel
+from task_manager.utils import SomeFuncsForTestsMixin
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestAutocomplete(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        for name in ("alpha", "alpine", "beta"):
+            LabelModel.objects.create(name=name)
+        self.labels_url = reverse_lazy("autocomplete", kwargs={"source": "labels"})
+
+    def test_prefix_search(self):
+        self.login_user(self.user)
+        response = self.client.get(self.labels_url, {"q": "AL"})
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(
+            [item["text"] for item in response.json()["results"]], ["alpha", "alpine"]
+        )
+        self.assertFalse(response.json()["more"])
+
+    def test_new_names_are_found_at_once(self):
+        self.login_user(self.user)
+        self.client.get(self.labels_url, {"q": "al"})
+        LabelModel.objects.create(name="always")
+
+        response = self.client.get(self.labels_url, {"q": "al"})
+
+        self.assertEquals(
+            [item["text"] for item in response.json()["results"]],
+            ["alpha", "alpine", "always"],
+        )
+
+    def test_limit(self):
+        self.login_user(self.user)
+        response = self.client.get(self.labels_url, {"q": "al", "limit": 1})
+
+        self.assertEquals(len(response.json()["results"]), 1)
+        self.assertTrue(response.json()["more"])
+
+    def test_unknown_source(self):
+        self.login_user(self.user)
+        response = self.client.get(
+            reverse_lazy("autocomplete", kwargs={"source": "passwords"})
+        )
+
+        self.assertEquals(response.status_code, 404)
+
+    def test_anonymous_is_redirected(self):
+        response = self.client.get(self.labels_url)
+
+        self.assertEquals(response.status_code, 302)
+
+    def test_forms_render_only_selected_choices(self):
+        self.login_user(self.user)
+        create_page = self.client.get(reverse_lazy("create_task"))
+        update_page = self.client.get(reverse_lazy("update_task", kwargs={"pk": 1}))
+        tasks_page = self.client.get(reverse_lazy("all_tasks"))
+
+        self.assertNotContains(create_page, "alpine")
+        self.assertNotContains(tasks_page, "alpine")
+        self.assertContains(update_page, 'data-autocomplete-url="/autocomplete/labels/"')
+        self.assertContains(update_page, '<option value="1" selected>')
+
+    def test_choices_are_still_validated(self):
+        self.login_user(self.user)
+        response = self.client.post(
+            reverse_lazy("create_task"),
+            {
+                "name": "task",
+                "status": StatusModel.objects.get(pk=1).pk,
+                "executor": 999,
+            },
+        )
+
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response.context["form"].has_error("executor"))
+        self.assertFalse(TaskModel.objects.filter(name="task").exists())
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+@test.override_settings(
+    INSTRUMENTATION=True,
+    INSTRUMENTATION_BUDGETS={"show_task": {"queries": 1}},
+    TEMPLATES=[
+        {
+            **settings.TEMPLATES[0],
+            "BACKEND": "task_manager.instrumentation.DjangoTemplates",
+        }
+    ],
+)
+class TestInstrumentation(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    def setUp(self) -> None:
+        REQUESTS.reset()
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.login_user(self.user)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse_lazy("all_tasks"))
+        self.client.get(reverse_lazy("all_tasks"), {"status": 1})
+        self.user.is_staff = True
+        self.user.save()
+
+        views = self.client.get(reverse_lazy("metrics")).json()["views"]
+
+        stats = views["all_tasks"]
+        self.assertEquals(stats["queries"]["count"], 2)
+        self.assertGreater(stats["queries"]["max"], 0)
+        self.assertGreater(stats["template_ms"]["sum"], 0)
+        self.assertGreater(stats["response_bytes"]["mean"], 1000)
+        self.assertLessEqual(stats["sql_ms"]["sum"], stats["total_ms"]["sum"])
+
+    @test.override_settings(ROOT_URLCONF="task_manager.async_urls")
+    async def test_async_requests_are_recorded(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        await self.async_client.get(reverse_lazy("all_tasks"))
+
+        stats = REQUESTS.snapshot()["all_tasks"]
+        self.assertEquals(stats["queries"]["count"], 1)
+        self.assertGreater(stats["queries"]["max"], 0)
+        self.assertGreater(stats["template_ms"]["sum"], 0)
+
+    def test_budget_overrun_is_logged(self):
+        with self.assertLogs("task_manager.instrumentation", "WARNING") as logs:
+            self.client.get(reverse_lazy("show_task", kwargs={"pk": 1}))
+
+        self.assertIn("show_task over budget", logs.output[0])
+
+    def test_metrics_are_staff_only(self):
+        response = self.client.get(reverse_lazy("metrics"))
+
+        self.assertEquals(response.status_code, 403)
+
+    @test.override_settings(INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        self.client.get(reverse_lazy("all_tasks"))
+
+        self.assertEquals(REQUESTS.snapshot(), {})
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestBench(TestCase):
+    def test_scenarios_run_against_generated_data(self):
+        sizes = {"users": 3, "statuses": 2, "labels": 4, "tasks": 30, "fan_out": 2}
+        data = generate(sizes)
+        bench = Bench(data, repeat=2, warmup=0)
+
+        scenarios = bench.run(only=["task_list[status", "task_detail", "task_delete"])
+
+        self.assertEquals(len(data["tasks"]), 30)
+        self.assertIn("task_list[status+executor]", scenarios)
+        self.assertIn("task_delete", scenarios)
+        self.assertGreater(scenarios["task_detail"]["queries"], 0)
+        self.assertGreater(scenarios["task_detail"]["template_p50_ms"], 0)
+        self.assertLessEqual(
+            scenarios["task_detail"]["p50_ms"], scenarios["task_detail"]["max_ms"]
+        )
+
+    def test_compare_flags_regressions(self):
+        baseline = {"scenarios": {"a": {"p50_ms": 10.0, "queries": 5}}}
+        fine = {"scenarios": {"a": {"p50_ms": 12.0, "queries": 5}}}
+        slower = {"scenarios": {"a": {"p50_ms": 20.0, "queries": 6}}}
+
+        self.assertEquals(compare(fine, baseline), [])
+        self.assertEquals(len(compare(slower, baseline)), 2)
+
+
+def session_queries(context):
+    return [
+        query for query in context.captured_queries if "django_session" in query["sql"]
+    ]
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+@test.override_settings(SESSION_ENGINE="task_manager.sessions")
+class TestSessions(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/users.json",
+    ]
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+
+    def test_authenticated_requests_skip_the_session_table(self):
+        self.login_user(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertEquals(response.status_code, 200)
+        self.assertFalse(session_queries(context))
+
+    def test_logout_is_written_through(self):
+        self.login_user(self.user)
+        self.client.get(reverse_lazy("logout"))
+        response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertRedirects(response, "/login/?next=/statuses/")
+        self.assertFalse(Session.objects.exists())
+
+    def test_deleted_session_is_not_served_from_the_cache(self):
+        store = SessionStore()
+        store["key"] = "value"
+        store.save()
+        SessionStore(store.session_key).load()
+        # Another worker logs the session out.
+        SessionStore(store.session_key).delete()
+
+        self.assertEquals(SessionStore(store.session_key).load(), {})
+        self.assertEquals(settings.SESSION_CACHE_ALIAS, "default")
+
+    def test_unchanged_session_is_not_saved(self):
+        store = SessionStore()
+        store["key"] = "value"
+        store.save()
+        same = SessionStore(store.session_key)
+        same["key"] = "value"
+        with CaptureQueriesContext(connection) as context:
+            same.save()
+
+        self.assertTrue(same.modified)
+        self.assertFalse(context.captured_queries)
+
+    def test_changed_session_survives_a_cache_miss(self):
+        store = SessionStore()
+        store["key"] = "value"
+        store.save()
+        store["key"] = "other"
+        store.save()
+        store._cache.delete(store.cache_key)
+
+        self.assertEquals(SessionStore(store.session_key)["key"], "other")
+
+    def test_flash_messages_do_not_touch_the_session(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy("all_statuses"), follow=True)
+
+        self.assertEquals(len(response.context["messages"]), 1)
+        self.assertFalse(session_queries(context))
+        self.assertNotIn("sessionid", response.cookies)
+
+    def test_bench_against_database_sessions(self):
+        data = generate({"users": 2, "statuses": 2, "labels": 2, "tasks": 5, "fan_out": 1})
+        queries = {}
+        for store in ("db", "cached"):
+            with session_store(store):
+                scenarios = Bench(data, repeat=2, warmup=1).run(only=["user_list"])
+            queries[store] = scenarios["user_list"]["queries"]
+
+        self.assertEquals(queries["cached"], queries["db"] - 1)
+
+
+def memory_connection():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+class TestConnectionPool(TestCase):
+    def setUp(self) -> None:
+        CONNECTIONS.reset()
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(memory_connection, size=1, overflow=0, name="reuse")
+        first = pool.checkout()
+        pool.checkin(first)
+
+        self.assertIs(pool.checkout(), first)
+        self.assertEquals(CONNECTIONS.snapshot()["reuse"]["checkout_wait_ms"]["count"], 2)
+
+    def test_overflow_is_bounded_and_closed_on_return(self):
+        pool = ConnectionPool(memory_connection, size=1, overflow=1, timeout=0.05)
+        first, second = pool.checkout(), pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+
+        self.assertEquals(pool.open_count, 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            second.execute("SELECT 1")
+
+    def test_checkout_waits_for_a_returned_connection(self):
+        pool = ConnectionPool(memory_connection, size=1, overflow=0, timeout=5)
+        held = pool.checkout()
+        timer = threading.Timer(0.05, pool.checkin, [held])
+        timer.start()
+
+        self.assertIs(pool.checkout(), held)
+        timer.join()
+
+    def test_old_and_broken_connections_are_replaced(self):
+        old = ConnectionPool(memory_connection, max_lifetime=-1)
+        broken = ConnectionPool(memory_connection, check=lambda connection: False)
+        for pool in (old, broken):
+            first = pool.checkout()
+            pool.checkin(first)
+            self.assertIsNot(pool.checkout(), first)
+            self.assertEquals(pool.open_count, 1)
+
+    def test_tuned_sqlite_runs_pragmas(self):
+        from task_manager.db.backends.sqlite3.base import DatabaseWrapper
+
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper(
+                {
+                    **connection.settings_dict,
+                    "NAME": os.path.join(directory, "tuned.sqlite3"),
+                    "PRAGMAS": {"journal_mode": "WAL", "busy_timeout": 1234},
+                },
+                alias="tuned",
+            )
+            with wrapper.cursor() as cursor:
+                mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+                timeout = cursor.execute("PRAGMA busy_timeout").fetchone()[0]
+            wrapper.close()
+
+        self.assertEquals((mode, timeout), ("wal", 1234))
+
+    @unittest.skipUnless(
+        os.getenv("POOL_TEST_DATABASE_URL"), "needs a PostgreSQL database"
+    )
+    def test_postgres_connections_return_to_the_pool(self):
+        from task_manager.db.backends.postgresql.base import DatabaseWrapper
+
+        settings_dict = {
+            **connection.settings_dict,
+            **dj_database_url.parse(os.environ["POOL_TEST_DATABASE_URL"]),
+            "CONN_MAX_AGE": 0,
+            "POOL": {"SIZE": 1, "OVERFLOW": 0, "MAX_LIFETIME": 60, "TIMEOUT": 1},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias="pool_test")
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            first = cursor.fetchone()[0]
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            second = cursor.fetchone()[0]
+        wrapper.close()
+
+        self.assertEquals(first, second)
+
+
+class ProfileRouter(ReadOnlyRouter):
+    write_alias = "profile"
+    read_alias = "profile_readonly"
+
+
+@contextmanager
+def sqlite_production_profile(path):
+    """The SQLITE_PRODUCTION setup on a database file, under its own aliases."""
+    tuned = {
+        **connection.settings_dict,
+        "ENGINE": "task_manager.db.backends.sqlite3",
+        "NAME": path,
+        "PRAGMAS": settings.SQLITE_PRODUCTION_PRAGMAS,
+        "TRANSACTION_MODE": "IMMEDIATE",
+    }
+    connections.settings["profile"] = tuned
+    connections.settings["profile_readonly"] = {
+        **tuned,
+        "PRAGMAS": {**settings.SQLITE_PRODUCTION_PRAGMAS, "query_only": "ON"},
+    }
+    try:
+        with test.override_settings(DATABASE_ROUTERS=[ProfileRouter()]):
+            call_command("migrate", database="profile", verbosity=0)
+            yield
+    finally:
+        for alias in ("profile", "profile_readonly"):
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestSqliteProductionProfile(TransactionTestCase):
+    threads = 8
+    tasks_per_thread = 10
+
+    def create_tasks(self, user, status):
+        client = Client()
+        client.force_login(user)
+        codes = []
+        try:
+            for number in range(self.tasks_per_thread):
+                response = client.post(
+                    reverse_lazy("create_task"),
+                    {"name": f"task {number}", "status": status.pk, "executor": user.pk},
+                )
+                codes.append(response.status_code)
+        finally:
+            connections.close_all()
+        return codes
+
+    def test_concurrent_task_creation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with sqlite_production_profile(os.path.join(directory, "db.sqlite3")):
+                status = StatusModel.objects.create(name="status")
+                users = [
+                    User.objects.create(username=f"writer{number}")
+                    for number in range(self.threads)
+                ]
+                results = []
+                workers = [
+                    threading.Thread(
+                        target=lambda user=user: results.append(
+                            self.create_tasks(user, status)
+                        )
+                    )
+                    for user in users
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                created = TaskModel.objects.count()
+                counted = TaskCounter.objects.get(
+                    kind=TaskCounter.STATUS, object_id=status.pk
+                ).count
+                mode = connections["profile"].cursor().execute(
+                    "PRAGMA journal_mode"
+                ).fetchone()[0]
+                read_db = TaskModel.objects.all().db
+
+        expected = self.threads * self.tasks_per_thread
+        self.assertEquals(
+            [code for codes in results for code in codes], [302] * expected
+        )
+        self.assertEquals((created, counted), (expected, expected))
+        self.assertEquals((mode, read_db), ("wal", "profile_readonly"))
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+class TestParallelTaskUpdates(TransactionTestCase):
+    threads = 8
+
+    def update_task(self, client, task, number, start):
+        start.wait()
+        try:
+            return client.post(
+                reverse_lazy("update_task", kwargs={"pk": task.pk}),
+                {
+                    "name": f"edit {number}",
+                    "status": task.status_id,
+                    "executor": task.executor_id,
+                    "version": task.version,
+                },
+            ).status_code
+        finally:
+            connections.close_all()
+
+    def test_one_of_concurrent_edits_wins(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with sqlite_production_profile(os.path.join(directory, "db.sqlite3")):
+                user = User.objects.create(username="editor")
+                status = StatusModel.objects.create(name="status")
+                task = TaskModel.objects.create(
+                    name="task", status=status, author=user, executor=user
+                )
+                clients = [Client() for _ in range(self.threads)]
+                for client in clients:
+                    client.force_login(user)
+                start = threading.Barrier(self.threads)
+                codes = {}
+                workers = [
+                    threading.Thread(
+                        target=lambda number=number: codes.__setitem__(
+                            number,
+                            self.update_task(clients[number], task, number, start),
+                        )
+                    )
+                    for number in range(self.threads)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                saved = TaskModel.objects.values_list("name", "version").get()
+
+        winners = [number for number, code in codes.items() if code == 302]
+        self.assertEquals(len(winners), 1)
+        self.assertEquals(sorted(codes.values()), [200] * (self.threads - 1) + [302])
+        self.assertEquals(saved, (f"edit {winners[0]}", 2))
+
+
+@test.modify_settings(
+    MIDDLEWARE={
+        "remove": [
+            "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+        ]
+    }
+)
+@test.override_settings(
+    DATABASE_REPLICAS=["replica"], DATABASE_ROUTERS=[ReplicaRouter()]
+)
+class TestReplicaRouter(SomeFuncsForTestsMixin, TestCase):
+    fixtures = [
+        "task_manager/fixtures/labels.json",
+        "task_manager/fixtures/statuses.json",
+        "task_manager/fixtures/users.json",
+        "task_manager/fixtures/tasks.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second SQLite file stands in for the replica; it only ever holds
+        # what the tests write there, never the fixtures.
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings["replica"] = {
+            **connection.settings_dict,
+            "NAME": os.path.join(cls.directory.name, "replica.sqlite3"),
+        }
+        # ReplicaRouter keeps migrations off replicas.
+        with test.override_settings(DATABASE_ROUTERS=[]):
+            call_command("migrate", database="replica", verbosity=0)
+        # bulk_create skips the signals that keep counters on the primary.
+        StatusModel.objects.using("replica").bulk_create(
+            [StatusModel(name="replica status")]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        cache.clear()
+        routers.DOWN.clear()
+        self.client = Client()
+        self.user = User.objects.get(pk=1)
+        self.login_user(self.user)
+
+    def status_names(self, response):
+        return [status.name for status in response.context["object_list"]]
+
+    def test_lists_read_from_replica(self):
+        response = self.client.get(reverse_lazy("all_statuses"))
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(self.status_names(response), ["replica status"])
+
+    @test.override_settings(ROOT_URLCONF="task_manager.async_urls")
+    async def test_async_lists_read_from_replica(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        response = await self.async_client.get(reverse_lazy("all_statuses"))
+
+        self.assertEquals(self.status_names(response), ["replica status"])
+
+    @test.override_settings(ROOT_URLCONF="task_manager.async_urls")
+    async def test_async_lists_pinned_to_primary(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        self.async_client.cookies["pin_primary"] = "1"
+
+        response = await self.async_client.get(reverse_lazy("all_statuses"))
+
+        self.assertNotIn("replica status", self.status_names(response))
+
+    def test_other_views_read_from_primary(self):
+        response = self.client.get(
+            reverse_lazy("update_status", kwargs={"pk": 1})
+        )
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_pinned_to_primary_after_write(self):
+        response = self.client.post(
+            reverse_lazy("create_task"),
+            {"name": "fresh task", "status": 1, "executor": 1},
+            follow=True,
+        )
+
+        self.assertEquals(response.redirect_chain[-1][0], reverse_lazy("all_tasks"))
+        self.assertIn(
+            "fresh task", [task.name for task in response.context["object_list"]]
+        )
+        self.assertFalse(TaskModel.objects.using("replica").exists())
+
+    def test_table_from_lagging_replica_is_not_cached_for_primary(self):
+        # The replica has none of the primary's tasks yet.
+        stale = self.client.get(reverse_lazy("all_tasks"))
+        self.client.cookies["pin_primary"] = "1"
+        fresh = self.client.get(reverse_lazy("all_tasks"))
+
+        self.assertNotIn("asd", stale.context["task_table"])
+        self.assertIn("asd", fresh.context["task_table"])
+
+    @test.override_settings(DATABASE_REPLICAS=["missing"])
+    def test_unavailable_replica_falls_back_to_primary(self):
+        connections.settings["missing"] = {
+            **connection.settings_dict,
+            "NAME": os.path.join(self.directory.name, "absent", "db.sqlite3"),
+        }
+        try:
+            with self.assertLogs("task_manager.db", "WARNING"):
+                response = self.client.get(reverse_lazy("all_statuses"))
+        finally:
+            del connections["missing"]
+            del connections.settings["missing"]
+
+        self.assertEquals(response.status_code, 200)
+        self.assertNotIn("replica status", self.status_names(response))
+        self.assertIn("missing", routers.DOWN)
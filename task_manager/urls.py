@@ -31,6 +31,14 @@ urlpatterns = [
     path("statuses/", include("task_manager.statuses.urls")),
     path("labels/", include("task_manager.labels.urls")),
     path("tasks/", include("task_manager.tasks.urls")),
+    path("api/v1/", include("task_manager.api.urls")),
+    path("notifications/", include("task_manager.notifications.urls")),
+    path(
+        "autocomplete/<str:source>/",
+        views.AutocompleteView.as_view(),
+        name="autocomplete",
+    ),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
     path("i18n/", include("django.conf.urls.i18n"), name="set_language"),
 ]
 
@@ -1,8 +1,35 @@
+import asyncio
+import hashlib
+import inspect
+import operator
+from calendar import timegm
+from functools import reduce
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.views import redirect_to_login
+from django.db import transaction
+from django.db.models import Exists, OuterRef, ProtectedError
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect
-from django.utils.translation import gettext
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language, gettext
+from django.views.decorators.http import condition
+from django.views.generic import View
+
+from task_manager.db.routers import pick_replica, replica_reads
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6, as locked for Django 4.1
+    iscoroutinefunction = asyncio.iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
 
 
 class CustomLoginRequiredMixin(LoginRequiredMixin):
@@ -37,5 +64,243 @@ class SomeFuncsForTestsMixin:
 
 
 class CustomUserPassesTestMixin(UserPassesTestMixin):
+    # Users may only touch their own record; the url already names it, so
+    # the check needs no query.
     def test_func(self):
-        return self.get_object().pk == self.request.user.pk
+        return self.kwargs.get(self.pk_url_kwarg) == self.request.user.pk
+
+
+class CachedObjectMixin:
+    # dispatch() checks and the generic get()/post() share one fetch.
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+
+def annotate_in_use(queryset, protected_by):
+    # protected_by: (model, field) pairs whose rows pointing at an object
+    # keep it from being deleted; all of them are checked by one EXISTS each
+    # inside the same query.
+    return queryset.annotate(
+        in_use=reduce(
+            operator.or_,
+            (
+                Exists(model.objects.filter(**{field: OuterRef("pk")}))
+                for model, field in protected_by
+            ),
+        )
+    )
+
+
+def lock_unused(model, pks, protected_by):
+    # Run right before deleting, in the same transaction: the locked rows can
+    # no longer gain references. Foreign keys would raise ProtectedError, but
+    # M2M through rows (labels) are deleted along with the object.
+    unused = set(
+        model.objects.select_for_update().filter(pk__in=pks).values_list("pk", flat=True)
+    )
+    for related, field in protected_by:
+        unused -= set(
+            related.objects.filter(**{f"{field}__in": unused}).values_list(field, flat=True)
+        )
+    return unused
+
+
+class ProtectedDeleteMixin(CachedObjectMixin):
+    protected_by = ()
+    protected_message = None
+
+    def get_queryset(self):
+        return annotate_in_use(super().get_queryset(), self.protected_by)
+
+    def protected(self):
+        messages.add_message(self.request, messages.ERROR, self.protected_message)
+        return redirect(self.success_url)
+
+    def post(self, request, *args, **kwargs):
+        if self.get_object().in_use:
+            return self.protected()
+        return super().post(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        # A task may have been attached since the in_use check.
+        with transaction.atomic():
+            if not lock_unused(self.model, [self.object.pk], self.protected_by):
+                return self.protected()
+            try:
+                return super().form_valid(form)
+            except ProtectedError:
+                return self.protected()
+
+
+class BulkDeleteView(CustomLoginRequiredMixin, View):
+    """Delete the objects posted as "ids" that nothing refers to.
+
+    Usage of every selected object is checked with a single query; objects
+    in use are kept and listed in an error message.
+    """
+
+    http_method_names = ["post"]
+    model = None
+    protected_by = ()
+    success_url = None
+    deleted_message = None
+    protected_message = None
+
+    def post(self, request, *args, **kwargs):
+        ids = [pk for pk in request.POST.getlist("ids") if pk.isdigit()]
+        rows = annotate_in_use(
+            self.model.objects.filter(pk__in=ids), self.protected_by
+        ).values_list("pk", "name", "in_use")
+        free = {pk: name for pk, name, in_use in rows if not in_use}
+        used = [name for pk, name, in_use in rows if in_use]
+        if free:
+            count = self.delete_free(free, used)
+            if count:
+                messages.add_message(
+                    request, messages.SUCCESS, self.deleted_message % {"count": count}
+                )
+        if used:
+            messages.add_message(
+                request,
+                messages.ERROR,
+                self.protected_message % {"names": ", ".join(sorted(used))},
+            )
+        return redirect(self.success_url)
+
+    def delete_free(self, free, used):
+        # Objects that something started using after the check join used.
+        with transaction.atomic():
+            unused = lock_unused(self.model, list(free), self.protected_by)
+            used.extend(name for pk, name in free.items() if pk not in unused)
+            try:
+                deleted = self.model.objects.filter(pk__in=unused).delete()[1]
+            except ProtectedError:
+                deleted = {}
+                used.extend(free[pk] for pk in unused)
+        return deleted.get(self.model._meta.label, 0)
+
+
+class ConditionalGetMixin:
+    # Views return (fingerprint parts, last modified datetime or None) from
+    # get_validators(); both must come from cheap aggregate queries so a 304
+    # is answered before the page's own queries run.
+    def get_validators(self):
+        return None
+
+    def get_etag(self, parts):
+        request = self.request
+        # Pages carry a CSRF token (language switch, bulk delete forms), which
+        # changes when logging in rotates the secret. get_token() makes sure
+        # there is one before the page renders it.
+        get_token(request)
+        fingerprint = ":".join(
+            str(part)
+            for part in (
+                *parts,
+                request.user.pk,
+                get_language(),
+                request.get_full_path(),
+                request.META["CSRF_COOKIE"],
+            )
+        )
+        return hashlib.md5(fingerprint.encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        # Pending flash messages are rendered into the page, never answer 304.
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        parts, last_modified = validators
+        etag = self.get_etag(parts)
+        conditional = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )
+        return conditional(super().get)(request, *args, **kwargs)
+
+
+async def aget_user(request):
+    # request.user lazily reads the session and the user row with the sync
+    # ORM; resolve it once in a thread so later accesses are plain attributes.
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+class AsyncViewMixin:
+    # Async GET for a view built on ConditionalGetMixin: subclasses implement
+    # aget_validators() and aget_response() with the async ORM API and reuse
+    # the sync view for everything else (context, templates, permissions).
+    # Without them the sync view answers from a thread.
+    async def dispatch(self, request, *args, **kwargs):
+        await aget_user(request)
+        response = super().dispatch(request, *args, **kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    async def aget_validators(self):
+        return None
+
+    async def aget_response(self):
+        return await sync_to_async(super().get)(self.request, *self.args, **self.kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        validators = None
+        if not len(messages.get_messages(request)):
+            validators = await self.aget_validators()
+        if validators is None:
+            return await self.aget_response()
+        parts, last_modified = validators
+        etag = quote_etag(self.get_etag(parts))
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = await self.aget_response()
+            if timestamp and not response.has_header("Last-Modified"):
+                response.headers["Last-Modified"] = http_date(timestamp)
+            response.headers.setdefault("ETag", etag)
+        return response
+
+
+class AsyncListViewMixin(AsyncViewMixin):
+    async def aget_response(self):
+        self.object_list = [obj async for obj in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+class ReplicaReadMixin:
+    # Read-only pages query a replica when DATABASE_REPLICAS is set, unless
+    # the client wrote recently (PrimaryPinMiddleware). Template responses
+    # are rendered before leaving, their lazy querysets included.
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or getattr(
+            request, "pinned_to_primary", False
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.dispatch_on_replica(request, *args, **kwargs)
+        # Sessions and users are read from the primary.
+        request.user.is_authenticated
+        with replica_reads(pick_replica()):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+    async def dispatch_on_replica(self, request, *args, **kwargs):
+        # AsyncViewMixin has already loaded the user.
+        with replica_reads(await sync_to_async(pick_replica)()):
+            response = super().dispatch(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+            if hasattr(response, "render"):
+                await sync_to_async(response.render)()
+        return response
@@ -1,5 +1,50 @@
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.utils.translation import gettext as _
+from django.views import View
 from django.views.generic.base import TemplateView
 
+from task_manager.autocomplete import SOURCES, search
+from task_manager.metrics import CONNECTIONS, REQUESTS
+from task_manager.tasks.counters import TaskCountersMixin
+from task_manager.utils import CustomLoginRequiredMixin
 
-class HomePageView(TemplateView):
+
+class HomePageView(TaskCountersMixin, TemplateView):
     template_name = "task_manager/HomePage.html"
+
+
+class MetricsView(View):
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"detail": _("Staff only.")}, status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        return JsonResponse(
+            {
+                "enabled": settings.INSTRUMENTATION,
+                "views": REQUESTS.snapshot(),
+                "pools": CONNECTIONS.snapshot(),
+            }
+        )
+
+    def post(self, request):
+        REQUESTS.reset()
+        CONNECTIONS.reset()
+        return JsonResponse(
+            {"enabled": settings.INSTRUMENTATION, "views": {}, "pools": {}}
+        )
+
+
+class AutocompleteView(CustomLoginRequiredMixin, View):
+    def get(self, request, source):
+        if source not in SOURCES:
+            raise Http404
+        try:
+            limit = int(request.GET.get("limit", settings.AUTOCOMPLETE_RESULTS))
+        except ValueError:
+            limit = settings.AUTOCOMPLETE_RESULTS
+        limit = max(1, min(limit, settings.AUTOCOMPLETE_MAX_RESULTS))
+        term = request.GET.get("q", "").strip()[:50]
+        return JsonResponse(search(source, term, limit))
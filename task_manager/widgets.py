@@ -0,0 +1,49 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteMixin:
+    # Renders only the selected options; the rest are fetched from the
+    # autocomplete endpoint as the user types. Validation still runs against
+    # the field's full queryset.
+    def __init__(self, source, attrs=None):
+        self.source = source
+        super().__init__(attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = reverse(
+            "autocomplete", kwargs={"source": self.source}
+        )
+        return attrs
+
+    def selected_choices(self, value):
+        iterator = self.choices
+        field = getattr(iterator, "field", None)
+        choices = []
+        if field is not None and field.empty_label is not None:
+            choices.append(("", field.empty_label))
+        values = [item for item in value if item not in ("", None)]
+        if not values or field is None:
+            return choices
+        try:
+            selected = list(iterator.queryset.filter(pk__in=values))
+        except (TypeError, ValueError):
+            return choices
+        return choices + [iterator.choice(obj) for obj in selected]
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        self.choices = self.selected_choices(value)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass